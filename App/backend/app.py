@@ -1,8 +1,14 @@
 """
 Enhanced Flask backend for RL Futures Trading System with security features.
+
+Importing this module has no side effects: ``create_app(config)`` builds the
+application, and per-process subsystems (log files and their writer
+threads) start on the first request in each process, which keeps the
+layout safe for gunicorn's ``preload_app``. NumPy-backed modules are
+imported by the views that use them unless ``PRELOAD_MODULES`` is set.
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, current_app, jsonify, request, stream_with_context
 from security import (
     require_validation, 
     rate_limit, 
@@ -11,89 +17,152 @@ from security import (
     InputValidator,
     SecurityError
 )
+import importlib
+import json
 import logging
 import os
-import time
-from health import get_health_status, get_detailed_health, record_request
-from metrics import increment_request_counter, record_request_duration, export_prometheus_metrics
-from logging_config import setup_logging, log_request, log_security_event
-
-# Configure logging
-setup_logging(
-    log_level=os.environ.get('LOG_LEVEL', 'INFO'),
-    log_file=os.environ.get('LOG_FILE', 'logs/app.log'),
-    enable_console=True,
-    enable_file=True,
-    enable_security_logging=True
+import threading
+from compression import compress_response
+from config_schema import get_default_config, validate_config, ConfigValidationError
+from health import get_health_status, get_detailed_health
+from metrics import (
+    export_prometheus_metrics,
+    increment_file_upload_counter,
+    record_file_upload_size
 )
+from request_metrics import MeteredRequest, RequestMetricsMiddleware
+from response_cache import cached_response, response_cache
+from training_progress import sse_stream, training_progress
+from logging_config import setup_logging
+
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-
-# Request monitoring middleware
-@app.before_request
-def before_request():
-    """Record request start time and basic info"""
-    request.start_time = time.time()
-    request.request_id = f"req_{int(time.time() * 1000)}"
-
-@app.after_request
-def after_request(response):
-    """Record request metrics and logging"""
-    if hasattr(request, 'start_time'):
-        duration = time.time() - request.start_time
-        request_id = getattr(request, 'request_id', 'unknown')
-        
-        # Record metrics
-        increment_request_counter(request.method, request.endpoint, response.status_code)
-        record_request_duration(request.method, request.endpoint, duration)
-        
-        # Log request
-        log_request(
-            request_id=request_id,
-            method=request.method,
-            endpoint=request.endpoint,
-            status_code=response.status_code,
-            response_time=duration,
-            ip_address=request.remote_addr,
-            user_agent=request.headers.get('User-Agent')
+# Modules imported by views on first use; preloading them in a gunicorn
+# master lets every worker share the pages instead of importing NumPy again
+DATA_MODULES = (
+    'backtest', 'bar_data', 'checkpoint_store', 'columnar', 'data_preview', 'data_quality',
+    'dataset_cache', 'inference', 'resampling',
+)
+
+def _env_flag(name: str, default: str = 'false') -> bool:
+    return os.environ.get(name, default).lower() == 'true'
+
+def default_config() -> dict:
+    """Application settings, read from the environment when the app is created"""
+    return {
+        'MAX_CONTENT_LENGTH': 16 * 1024 * 1024,  # 16MB max file size
+        'SECRET_KEY': os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production'),
+        'SETUP_LOGGING': True,
+        'LOG_LEVEL': os.environ.get('LOG_LEVEL', 'INFO'),
+        'LOG_FILE': os.environ.get('LOG_FILE', 'logs/app.log'),
+        'LOG_QUEUE_FILE_WRITES': _env_flag('LOG_QUEUE_FILE_WRITES'),
+        'PRELOAD_MODULES': _env_flag('PRELOAD_MODULES'),
+        'COMPRESS_RESPONSES': _env_flag('COMPRESS_RESPONSES', 'true'),
+        'STREAMING_RESPONSES': _env_flag('STREAMING_RESPONSES', 'true'),
+    }
+
+# Routes and error handlers are collected here and attached to every app
+# built by create_app, keeping the view function names as endpoint names
+_routes = []
+_error_handlers = []
+
+def route(rule: str, **options):
+    def decorator(view):
+        _routes.append((rule, view, options))
+        return view
+    return decorator
+
+def errorhandler(code: int):
+    def decorator(handler):
+        _error_handlers.append((code, handler))
+        return handler
+    return decorator
+
+_logging_ready = False
+_logging_lock = threading.Lock()
+
+def _reset_after_fork():
+    global _logging_ready
+    _logging_ready = False
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def _ensure_logging(config):
+    """Set up logging once per process, on its first request"""
+    global _logging_ready
+    if _logging_ready or not config['SETUP_LOGGING']:
+        return
+    with _logging_lock:
+        if _logging_ready:
+            return
+        setup_logging(
+            log_level=config['LOG_LEVEL'],
+            log_file=config['LOG_FILE'],
+            enable_console=True,
+            enable_file=True,
+            enable_security_logging=True,
+            queue_file_writes=config['LOG_QUEUE_FILE_WRITES']
         )
-        
-        # Log security events for failed requests
-        if response.status_code >= 400:
-            log_security_event(
-                message=f"Request failed: {request.method} {request.endpoint}",
-                level="WARNING",
-                ip_address=request.remote_addr,
-                user_agent=request.headers.get('User-Agent'),
-                endpoint=request.endpoint,
-                risk_level="medium" if response.status_code >= 500 else "low"
-            )
+        _logging_ready = True
+
+def create_app(config: dict = None) -> Flask:
+    """Build the Flask application.
     
-    return response
+    ``config`` overrides ``default_config()``. Nothing here opens files or
+    starts threads, so the app can be built in a gunicorn master and
+    forked.
+    """
+    app = Flask(__name__)
+    app.config.update(default_config())
+    app.config.update(config or {})
+    
+    # Request timing, metrics and access logs run at the WSGI layer
+    app.request_class = MeteredRequest
+    app.wsgi_app = RequestMetricsMiddleware(app.wsgi_app, before=lambda: _ensure_logging(app.config))
+    if app.config['COMPRESS_RESPONSES']:
+        app.after_request(compress)
+    
+    # Apply security middleware
+    security_middleware(app)
+    
+    for rule, view, options in _routes:
+        app.add_url_rule(rule, view_func=view, **options)
+    for code, handler in _error_handlers:
+        app.register_error_handler(code, handler)
+    
+    if app.config['PRELOAD_MODULES']:
+        for module in DATA_MODULES:
+            importlib.import_module(module)
+    return app
 
-# Apply security middleware
-security_middleware()
+def __getattr__(name):
+    # ``from app import app`` and ``app:app`` build a default app on first access
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Configuration
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
+def compress(response):
+    """Compress large responses for clients that accept it"""
+    compress_response(response, request.headers.get('Accept-Encoding'))
+    return response
 
-@app.route('/health', methods=['GET'])
+@route('/health', methods=['GET'])
 @rate_limit(max_requests=100, window=60)
 def health():
     """Enhanced health check endpoint with comprehensive monitoring."""
     health_data = get_health_status()
     return jsonify(health_data), 200
 
-@app.route('/health/detailed', methods=['GET'])
+@route('/health/detailed', methods=['GET'])
 @rate_limit(max_requests=50, window=60)
 def detailed_health():
     """Detailed health check endpoint with system information."""
     health_data = get_detailed_health()
     return jsonify(health_data), 200
 
-@app.route('/metrics', methods=['GET'])
+@route('/metrics', methods=['GET'])
 @rate_limit(max_requests=100, window=60)
 def metrics():
     """Prometheus metrics endpoint."""
@@ -104,7 +173,7 @@ def metrics():
         logger.error(f"Failed to export metrics: {e}")
         return jsonify({'error': 'Failed to export metrics'}), 500
 
-@app.route('/metrics/summary', methods=['GET'])
+@route('/metrics/summary', methods=['GET'])
 @rate_limit(max_requests=50, window=60)
 def metrics_summary():
     """Human-readable metrics summary endpoint."""
@@ -116,8 +185,9 @@ def metrics_summary():
         logger.error(f"Failed to get metrics summary: {e}")
         return jsonify({'error': 'Failed to get metrics summary'}), 500
 
-@app.route('/', methods=['GET'])
+@route('/', methods=['GET'])
 @rate_limit(max_requests=100, window=60)
+@cached_response()
 def index():
     """Main endpoint with rate limiting."""
     return jsonify({
@@ -130,80 +200,107 @@ def index():
         }
     }), 200
 
-@app.route('/api/upload', methods=['POST'])
+@route('/api/upload', methods=['POST'])
 @rate_limit(max_requests=10, window=60)  # Stricter rate limit for file uploads
-@require_validation(['filename', 'data'])
+@require_validation(['filename', 'data'], allow_files=True)
 def upload_file():
-    """File upload endpoint with validation and sanitization."""
+    """File upload endpoint with validation, deduplication and caching.
+    
+    Accepts either a multipart ``file`` field (CSV or .xlsx) or JSON with
+    ``filename`` and ``data`` (CSV text or a list of row objects). Content is
+    hashed before parsing, so re-uploading the same data returns the cached
+    result.
+    """
+    from bar_data import DataFormatError, get_file_type, parse_csv_text, parse_row_dicts, parse_upload_stream
+    from dataset_cache import dataset_cache, hash_rows, hash_stream, hash_text
     try:
-        data = request.get_json()
+        if 'file' in request.files:
+            upload = request.files['file']
+            file_type = get_file_type(upload.filename)
+            filename = InputValidator.sanitize_filename(upload.filename)
+            dataset_id, size = hash_stream(upload.stream)
+            upload.stream.seek(0)
+            parse = lambda: parse_upload_stream(upload.stream, file_type)
+            options = _parse_form_options(request.form)
+        else:
+            data = request.get_json()
+            
+            # Validate and sanitize input
+            filename = InputValidator.sanitize_filename(data['filename'])
+            file_data = data['data']
+            
+            # Additional validation for file data
+            if not isinstance(file_data, (str, list)):
+                raise SecurityError("Invalid file data format")
+            
+            if isinstance(file_data, str):
+                file_type = 'csv'
+                dataset_id, size = hash_text(file_data)
+                parse = lambda: parse_csv_text(file_data)
+            else:
+                file_type = 'rows'
+                dataset_id, size = hash_rows(file_data)
+                parse = lambda: parse_row_dicts(file_data)
+            options = data
         
-        # Validate and sanitize input
-        filename = InputValidator.sanitize_filename(data['filename'])
-        file_data = data['data']
+        indicator_config, session_start = _upload_settings(options)
+        summary, cached = dataset_cache.ingest(dataset_id, parse, indicator_config, session_start)
+        if not cached:
+            response_cache.invalidate(dataset_id)
         
-        # Additional validation for file data
-        if not isinstance(file_data, (str, list)):
-            raise SecurityError("Invalid file data format")
+        increment_file_upload_counter(True, file_type)
+        record_file_upload_size(file_type, size)
         
-        # Process the file data (placeholder for actual processing)
         processed_data = {
             'filename': filename,
-            'size': len(str(file_data)),
-            'status': 'processed'
+            'size': size,
+            'status': 'processed',
+            'cached': cached,
+            **summary
         }
         
-        logger.info(f"File uploaded successfully: {filename}")
+        logger.info(f"File uploaded successfully: {filename} ({dataset_id}, cached={cached})")
         return jsonify(processed_data), 200
         
-    except SecurityError as e:
+    except (SecurityError, DataFormatError) as e:
         logger.warning(f"Upload validation failed: {str(e)}")
         return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Upload processing error: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@app.route('/api/config', methods=['GET', 'POST'])
+def _parse_form_options(form) -> dict:
+    """Decode JSON-encoded settings sent alongside a multipart upload"""
+    options = {}
+    for section in ('data_indicators', 'day_mastery'):
+        if section in form:
+            try:
+                options[section] = json.loads(form[section])
+            except ValueError:
+                raise SecurityError(f"Invalid {section} settings")
+    return options
+
+def _upload_settings(options: dict):
+    """Resolve the indicator config and session start for an upload"""
+    overrides = {
+        section: options[section]
+        for section in ('data_indicators', 'day_mastery')
+        if section in options
+    }
+    validated = validate_config(overrides) if overrides else {}
+    defaults = get_default_config()
+    indicator_config = {**defaults['data_indicators'], **validated.get('data_indicators', {})}
+    session_start = validated.get('day_mastery', {}).get(
+        'start_time', defaults['day_mastery']['start_time'])
+    return indicator_config, session_start
+
+@route('/api/config', methods=['GET', 'POST'])
 @rate_limit(max_requests=50, window=60)
+@cached_response()
 def config_endpoint():
     """Configuration endpoint with different methods."""
     if request.method == 'GET':
-        return jsonify({
-            'trading_params': {
-                'initial_balance': 1000,
-                'daily_profit_target': 500,
-                'daily_max_loss_limit': 500,
-                'commissions': 2.5,
-                'margin_required_per_contract': 1000,
-                'slippage': 0.5,
-                'contract_value': 5
-            },
-            'ppo_settings': {
-                'learning_rate': 0.0003,
-                'n_steps': 2048,
-                'batch_size': 64,
-                'gamma': 0.99,
-                'gae_lambda': 0.95,
-                'clip_range': 0.2,
-                'ent_coef': 0.01,
-                'vf_coef': 0.5
-            },
-            'day_mastery': {
-                'min_episodes_to_run': 100,
-                'required_success_rate': 0.95,
-                'performance_plateau_episodes': 50,
-                'start_time': '17:00',
-                'end_time': '16:00+1'
-            },
-            'data_indicators': {
-                'observation_history_length': 1440,
-                'ema1_period': 13,
-                'ema2_period': 55,
-                'bollinger_bands_period': 20,
-                'atr_period': 14,
-                'macd_period': 26
-            }
-        }), 200
+        return jsonify(get_default_config()), 200
     
     elif request.method == 'POST':
         try:
@@ -211,17 +308,21 @@ def config_endpoint():
             if not data:
                 raise SecurityError("No configuration data provided")
             
-            # Validate and sanitize configuration data
-            sanitized_data = sanitize_input(data)
+            # Validate configuration data against the schema
+            validated_data = validate_config(data)
             
             # Process configuration (placeholder)
-            logger.info(f"Configuration updated: {sanitized_data}")
+            logger.info(f"Configuration updated: {validated_data}")
+            response_cache.invalidate()
             
             return jsonify({
                 'message': 'Configuration updated successfully',
-                'data': sanitized_data
+                'data': validated_data
             }), 200
             
+        except ConfigValidationError as e:
+            logger.warning(f"Configuration validation failed: {e.errors}")
+            return jsonify({'error': str(e), 'details': e.errors}), 400
         except SecurityError as e:
             logger.warning(f"Configuration validation failed: {str(e)}")
             return jsonify({'error': str(e)}), 400
@@ -229,7 +330,7 @@ def config_endpoint():
             logger.error(f"Configuration processing error: {str(e)}")
             return jsonify({'error': 'Internal server error'}), 500
 
-@app.route('/api/validate', methods=['POST'])
+@route('/api/validate', methods=['POST'])
 @rate_limit(max_requests=100, window=60)
 @require_validation(['data'])
 def validate_data():
@@ -261,22 +362,299 @@ def validate_data():
         logger.error(f"Validation processing error: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@app.errorhandler(404)
+@route('/api/datasets/<dataset_id>/validate', methods=['GET'])
+@rate_limit(max_requests=50, window=60)
+@cached_response(dataset_arg='dataset_id')
+def validate_dataset(dataset_id):
+    """Run the vectorized data quality checks over an uploaded dataset."""
+    from data_quality import QualityThresholds, validate_bars
+    from dataset_cache import dataset_cache
+    try:
+        dataset_id = InputValidator.validate_dataset_id(dataset_id)
+        defaults = get_default_config()
+        atr_period = int(InputValidator.validate_numeric(
+            request.args.get('atr_period', defaults['data_indicators']['atr_period']), 1, 10000))
+        outlier_atr_multiple = InputValidator.validate_numeric(
+            request.args.get('outlier_atr_multiple', 10.0), 0.1, 1000)
+        
+        dataset = dataset_cache.get_dataset(dataset_id, defaults['day_mastery']['start_time'])
+        if dataset is None:
+            return jsonify({'error': 'Dataset not found'}), 404
+        bars, day_index = dataset
+        
+        atr = dataset_cache.indicators.get_column(dataset_id, bars, 'atr', {'period': atr_period})
+        thresholds = QualityThresholds(atr_period=atr_period, outlier_atr_multiple=outlier_atr_multiple)
+        report = validate_bars(bars, day_index, thresholds, atr=atr)
+        
+        return jsonify({'dataset_id': dataset_id, **report}), 200
+        
+    except SecurityError as e:
+        logger.warning(f"Dataset validation failed: {str(e)}")
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Dataset validation error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@route('/api/datasets/<dataset_id>/rows', methods=['GET'])
+@rate_limit(max_requests=100, window=60)
+@cached_response(dataset_arg='dataset_id')
+def dataset_rows(dataset_id):
+    """Serve a page of bars from an uploaded dataset, optionally resampled, as JSON or columnar binary."""
+    from data_preview import MAX_PAGE_ROWS, page_rows
+    from dataset_cache import dataset_cache
+    from resampling import parse_timeframe
+    try:
+        dataset_id = InputValidator.validate_dataset_id(dataset_id)
+        offset = int(InputValidator.validate_numeric(request.args.get('offset', 0), 0))
+        limit = int(InputValidator.validate_numeric(request.args.get('limit', 100), 1, MAX_PAGE_ROWS))
+        
+        columnar = _wants_columnar()
+        
+        timeframe = request.args.get('timeframe')
+        if timeframe is not None:
+            try:
+                parse_timeframe(timeframe)
+            except ValueError as e:
+                raise SecurityError(str(e))
+        
+        bars = dataset_cache.get_bars(dataset_id)
+        if bars is None:
+            return jsonify({'error': 'Dataset not found'}), 404
+        if timeframe is not None:
+            session_start = get_default_config()['day_mastery']['start_time']
+            bars = dataset_cache.ensure_timeframe(dataset_id, bars, timeframe, session_start)
+        
+        return _data_response({
+            'dataset_id': dataset_id,
+            'timeframe': timeframe,
+            **page_rows(bars, offset, limit, columnar)
+        }, 'rows', columnar)
+        
+    except SecurityError as e:
+        logger.warning(f"Dataset rows request failed: {str(e)}")
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Dataset rows error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@route('/api/datasets/<dataset_id>/series', methods=['GET'])
+@rate_limit(max_requests=100, window=60)
+@cached_response(dataset_arg='dataset_id')
+def dataset_series(dataset_id):
+    """Serve a downsampled series sized to the requested pixel width, as JSON or columnar binary."""
+    from data_preview import MAX_SERIES_WIDTH, lttb_series, minmax_series
+    from dataset_cache import dataset_cache
+    try:
+        dataset_id = InputValidator.validate_dataset_id(dataset_id)
+        width = int(InputValidator.validate_numeric(request.args.get('width', 1000), 1, MAX_SERIES_WIDTH))
+        start = int(InputValidator.validate_numeric(request.args.get('start', 0), 0))
+        end = request.args.get('end')
+        end = int(InputValidator.validate_numeric(end, 0)) if end is not None else None
+        method = request.args.get('method', 'minmax')
+        if method not in ('minmax', 'lttb'):
+            raise SecurityError("method must be 'minmax' or 'lttb'")
+        columnar = _wants_columnar()
+        
+        bars = dataset_cache.get_bars(dataset_id)
+        if bars is None:
+            return jsonify({'error': 'Dataset not found'}), 404
+        pyramid = dataset_cache.ensure_pyramid(dataset_id, bars)
+        
+        downsample = lttb_series if method == 'lttb' else minmax_series
+        return _data_response({'dataset_id': dataset_id, **downsample(bars, pyramid, width, start, end, columnar)},
+                              'series', columnar)
+        
+    except SecurityError as e:
+        logger.warning(f"Dataset series request failed: {str(e)}")
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Dataset series error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+def _wants_columnar() -> bool:
+    """Whether a data view should answer in the binary columnar format.
+    
+    ``?format=json|columnar`` wins; otherwise the Accept header decides,
+    with JSON preferred when both are equally acceptable.
+    """
+    from columnar import COLUMNAR_MIMETYPE
+    requested = request.args.get('format')
+    if requested is not None:
+        if requested not in ('json', 'columnar'):
+            raise SecurityError("format must be 'json' or 'columnar'")
+        return requested == 'columnar'
+    return request.accept_mimetypes.best_match(['application/json', COLUMNAR_MIMETYPE]) == COLUMNAR_MIMETYPE
+
+def _data_response(payload: dict, columns_key: str, columnar: bool):
+    """jsonify a payload, or send its ``columns_key`` arrays as columnar binary with the rest as metadata"""
+    if not columnar:
+        return jsonify(payload), 200
+    from columnar import columnar_response
+    columns = payload.pop(columns_key)
+    return columnar_response(columns, payload)
+
+def _period_list(value, name):
+    """Parse a list of periods or a {start, stop, step} range"""
+    from backtest import MAX_COMBINATIONS
+    if isinstance(value, dict):
+        start = int(InputValidator.validate_numeric(value.get('start'), 1, 10000))
+        stop = int(InputValidator.validate_numeric(value.get('stop'), start + 1, 10001))
+        step = int(InputValidator.validate_numeric(value.get('step', 1), 1, 10000))
+        value = list(range(start, stop, step))
+    if not isinstance(value, list) or not value or len(value) > MAX_COMBINATIONS:
+        raise SecurityError(f"{name} must be a non-empty list or range of periods")
+    return [int(InputValidator.validate_numeric(period, 1, 10000)) for period in value]
+
+@route('/api/datasets/<dataset_id>/backtest', methods=['POST'])
+@rate_limit(max_requests=20, window=60)
+def dataset_backtest(dataset_id):
+    """Score a sweep of EMA crossover baselines against an uploaded dataset.
+    
+    Accepts ``ema1_periods`` and ``ema2_periods`` (lists or start/stop/step
+    ranges), optional ``trading_params`` overrides and ``top``, the number
+    of best combinations to return per-day tables for.
+    """
+    from backtest import check_ema_budget, crossover_backtest, crossover_grid, summarize
+    from dataset_cache import dataset_cache
+    try:
+        dataset_id = InputValidator.validate_dataset_id(dataset_id)
+        data = request.get_json(silent=True) or {}
+        defaults = get_default_config()
+        
+        fast_periods = _period_list(data.get('ema1_periods', [defaults['data_indicators']['ema1_period']]), 'ema1_periods')
+        slow_periods = _period_list(data.get('ema2_periods', [defaults['data_indicators']['ema2_period']]), 'ema2_periods')
+        top = int(InputValidator.validate_numeric(data.get('top', 10), 0, 100))
+        overrides = validate_config({'trading_params': data.get('trading_params', {})})
+        trading_params = {**defaults['trading_params'], **overrides['trading_params']}
+        
+        try:
+            combos = crossover_grid(fast_periods, slow_periods)
+        except ValueError as e:
+            raise SecurityError(str(e))
+        if len(combos) == 0:
+            raise SecurityError("No combinations with ema1_period < ema2_period")
+        
+        dataset = dataset_cache.get_dataset(dataset_id, defaults['day_mastery']['start_time'])
+        if dataset is None:
+            return jsonify({'error': 'Dataset not found'}), 404
+        bars, day_index = dataset
+        
+        periods = set(combos.ravel().tolist())
+        try:
+            check_ema_budget(len(periods), len(bars))
+        except ValueError as e:
+            raise SecurityError(str(e))
+        ema_columns = {
+            int(period): dataset_cache.indicators.get_column(dataset_id, bars, 'ema', {'period': int(period)})
+            for period in periods
+        }
+        result = crossover_backtest(bars, day_index, ema_columns, combos, trading_params)
+        
+        return jsonify({'dataset_id': dataset_id, **summarize(result, top)}), 200
+        
+    except ConfigValidationError as e:
+        logger.warning(f"Backtest parameters rejected: {e.errors}")
+        return jsonify({'error': str(e), 'details': e.errors}), 400
+    except SecurityError as e:
+        logger.warning(f"Backtest request failed: {str(e)}")
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Backtest error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@route('/api/checkpoints', methods=['GET'])
+@rate_limit(max_requests=100, window=60)
+def list_checkpoints():
+    """List stored model checkpoints with the latest and best ids."""
+    from checkpoint_store import checkpoint_store
+    try:
+        return jsonify({
+            'checkpoints': checkpoint_store.list(),
+            'latest': checkpoint_store.latest(),
+            'best': checkpoint_store.best()
+        }), 200
+    except Exception as e:
+        logger.error(f"Checkpoint listing error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@route('/api/inference/act', methods=['POST'])
+@rate_limit(max_requests=6000, window=60)
+@require_validation(['bar'])
+def inference_act():
+    """Choose an action for one new bar using the loaded policy.
+    
+    Expects ``bar`` (high, low, close) and the ``state`` returned by the
+    previous call for the same instrument (omit it for the first bar).
+    """
+    from inference import get_inference_service
+    try:
+        data = request.get_json()
+        bar = data['bar']
+        if not isinstance(bar, dict):
+            raise SecurityError("bar must be an object")
+        prices = {
+            field: InputValidator.validate_numeric(bar.get(field), 0, 1e9)
+            for field in ('high', 'low', 'close')
+        }
+        
+        try:
+            service = get_inference_service()
+        except LookupError:
+            return jsonify({'error': 'No trained policy available'}), 503
+        
+        try:
+            result = service.act(prices, data.get('state'))
+        except ValueError as e:
+            raise SecurityError(str(e))
+        return jsonify(result), 200
+        
+    except SecurityError as e:
+        logger.warning(f"Inference request failed: {str(e)}")
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Inference error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@route('/api/training/stream', methods=['GET'])
+@rate_limit(max_requests=30, window=60)
+def training_stream():
+    """Stream per-iteration training metrics as Server-Sent Events.
+    
+    One long-lived connection replaces polling; the rate limit only applies
+    to opening streams. Slow clients skip old frames rather than stalling
+    the trainer.
+    """
+    if not current_app.config['STREAMING_RESPONSES']:
+        # A sync worker would be held for the whole stream and killed at its timeout
+        return jsonify({'error': 'Training stream requires threaded workers'}), 503
+    
+    try:
+        subscription = training_progress.subscribe()
+    except RuntimeError as e:
+        logger.warning(f"Training stream rejected: {str(e)}")
+        return jsonify({'error': str(e)}), 503
+    
+    response = Response(stream_with_context(sse_stream(subscription)), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
     return jsonify({'error': 'Endpoint not found'}), 404
 
-@app.errorhandler(405)
+@errorhandler(405)
 def method_not_allowed(error):
     """Handle 405 errors."""
     return jsonify({'error': 'Method not allowed'}), 405
 
-@app.errorhandler(413)
+@errorhandler(413)
 def payload_too_large(error):
     """Handle 413 errors (file too large)."""
     return jsonify({'error': 'File too large'}), 413
 
-@app.errorhandler(500)
+@errorhandler(500)
 def internal_error(error):
     """Handle 500 errors."""
     logger.error(f"Internal server error: {error}")
@@ -286,7 +664,7 @@ if __name__ == '__main__':
     # Production settings
     debug_mode = os.environ.get('FLASK_DEBUG', 'false').lower() == 'true'
     
-    app.run(
+    create_app().run(
         host='0.0.0.0', 
         port=8000,
         debug=debug_mode,
@@ -0,0 +1,216 @@
+"""
+Vectorized Backtesting for RL Futures Trading System
+Scores batches of rule-based baselines (EMA crossovers) as parameters x bars arrays
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping
+
+import numpy as np
+
+from bar_data import BarData, DayIndex
+
+MAX_COMBINATIONS = 2000
+# Every distinct EMA period is a full-length float64 column held for the run
+MAX_EMA_COLUMN_BYTES = 512 * 1024 * 1024
+TRADING_DAYS_PER_YEAR = 252
+
+@dataclass
+class BacktestResult:
+    """Per-combination, per-day tables from a backtest run (combos x days)"""
+    combos: np.ndarray
+    day_labels: List[str]
+    pnl: np.ndarray
+    drawdown: np.ndarray
+    trades: np.ndarray
+    wins: np.ndarray
+    stopped: np.ndarray
+    seconds: float
+    combo_bars: int
+
+    @property
+    def hit_rate(self) -> np.ndarray:
+        """Fraction of winning trades per day; NaN on days without trades"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.trades > 0, self.wins / np.maximum(self.trades, 1), np.nan)
+
+    @property
+    def combo_bars_per_sec(self) -> float:
+        return self.combo_bars / self.seconds if self.seconds > 0 else 0.0
+
+def crossover_grid(fast_periods: Iterable[int], slow_periods: Iterable[int]) -> np.ndarray:
+    """All (fast, slow) period pairs with fast < slow, as a K x 2 int array"""
+    fast = np.unique(np.asarray(list(fast_periods), dtype=np.int64))
+    slow = np.unique(np.asarray(list(slow_periods), dtype=np.int64))
+    pairs = np.stack(np.meshgrid(fast, slow, indexing='ij'), axis=-1).reshape(-1, 2)
+    pairs = pairs[pairs[:, 0] < pairs[:, 1]]
+    if len(pairs) > MAX_COMBINATIONS:
+        raise ValueError(f"Too many parameter combinations: {len(pairs)} > {MAX_COMBINATIONS}")
+    return pairs
+
+def check_ema_budget(periods: int, bars: int):
+    """Reject sweeps whose EMA columns would not fit in MAX_EMA_COLUMN_BYTES"""
+    needed = periods * bars * 8
+    if needed > MAX_EMA_COLUMN_BYTES:
+        raise ValueError(f"{periods} distinct EMA periods over {bars} bars need {needed // 2 ** 20} MiB; "
+                         f"the limit is {MAX_EMA_COLUMN_BYTES // 2 ** 20} MiB")
+
+def _day_positions(fast: np.ndarray, slow: np.ndarray) -> np.ndarray:
+    """Positions held during each bar of a day plus a closing flat column.
+
+    The crossover signal at a bar's close is held through the next bar; the
+    first bar of a day starts flat and everything is closed after the last.
+    """
+    combos, length = fast.shape
+    positions = np.zeros((combos, length + 1), dtype=np.int8)
+    # NaN differences compare False both ways and leave the position flat
+    with np.errstate(invalid='ignore'):
+        positions[:, 1:length] = (fast[:, :-1] > slow[:, :-1]).astype(np.int8) - (fast[:, :-1] < slow[:, :-1])
+    return positions
+
+def _day_pnl(positions: np.ndarray, point_moves: np.ndarray, cost_per_contract: float):
+    """Gross PnL per bar and trading costs charged at each bar's close"""
+    gross = positions[:, :-1] * point_moves
+    # Costs of moving from positions[t] to positions[t + 1] at the close of bar t
+    costs = np.abs(np.diff(positions, axis=1)).astype(np.float64) * cost_per_contract
+    return gross, costs
+
+def crossover_backtest(bars: BarData, day_index: DayIndex, ema_columns: Mapping[int, np.ndarray],
+                       combos: np.ndarray, trading_params: Dict[str, Any]) -> BacktestResult:
+    """Backtest EMA crossover combos over every trading day at once.
+
+    Each day is evaluated as a (combos x bars) array: long while the fast
+    EMA is above the slow one, short while below, flat at the session
+    boundaries. Commissions and slippage (in price points) are charged per
+    contract per side. A day stops trading once its running PnL reaches
+    ``daily_profit_target`` or ``-daily_max_loss_limit``.
+    """
+    started = time.perf_counter()
+    combos = np.asarray(combos, dtype=np.int64).reshape(-1, 2)
+    periods = np.unique(combos)
+    row_of = {int(period): row for row, period in enumerate(periods)}
+    fast_rows = np.array([row_of[int(p)] for p in combos[:, 0]], dtype=np.int64)
+    slow_rows = np.array([row_of[int(p)] for p in combos[:, 1]], dtype=np.int64)
+
+    contract_value = float(trading_params['contract_value'])
+    cost_per_contract = float(trading_params['commissions']) + float(trading_params['slippage']) * contract_value
+    profit_target = float(trading_params['daily_profit_target'])
+    loss_limit = float(trading_params['daily_max_loss_limit'])
+
+    n_combos, n_days = len(combos), len(day_index)
+    pnl = np.zeros((n_combos, n_days))
+    drawdown = np.zeros((n_combos, n_days))
+    trades = np.zeros((n_combos, n_days), dtype=np.int64)
+    wins = np.zeros((n_combos, n_days), dtype=np.int64)
+    stopped = np.zeros((n_combos, n_days), dtype=bool)
+    close = np.asarray(bars.close, dtype=np.float64)
+
+    for day in range(n_days):
+        window = day_index.day_slice(day)
+        length = window.stop - window.start
+        if length == 0:
+            continue
+
+        # Gather each distinct period once, then index per combo
+        emas = np.stack([np.asarray(ema_columns[int(p)][window]) for p in periods])
+        positions = _day_positions(emas[fast_rows], emas[slow_rows])
+
+        point_moves = np.zeros(length)
+        point_moves[1:] = np.nan_to_num(np.diff(close[window])) * contract_value
+
+        gross, costs = _day_pnl(positions, point_moves, cost_per_contract)
+        marked = np.cumsum(gross, axis=1) - np.cumsum(costs, axis=1) + costs
+
+        # Daily limits are checked on the mark before each close's trade;
+        # once either is crossed the position is closed and stays flat
+        hit = (marked >= profit_target) | (marked <= -loss_limit)
+        hit_any = hit.any(axis=1)
+        if hit_any.any():
+            first_hit = np.where(hit_any, hit.argmax(axis=1), length)
+            columns = np.arange(length + 1)
+            positions[columns[None, :] > first_hit[:, None]] = 0
+            gross, costs = _day_pnl(positions, point_moves, cost_per_contract)
+        stopped[:, day] = hit_any
+
+        running = np.cumsum(gross - costs, axis=1)
+        pnl[:, day] = running[:, -1]
+        peak = np.maximum(np.maximum.accumulate(running, axis=1), 0.0)
+        drawdown[:, day] = (peak - running).max(axis=1)
+
+        # Trades are runs of a constant non-zero position, each paying one
+        # entry and one exit cost per contract
+        run_start = np.ones(positions.shape, dtype=bool)
+        run_start[:, 1:] = positions[:, 1:] != positions[:, :-1]
+        flat_starts = np.flatnonzero(run_start)
+        held = np.zeros(positions.shape)
+        held[:, :-1] = gross
+        run_position = np.abs(positions.ravel()[flat_starts])
+        run_pnl = np.add.reduceat(held.ravel(), flat_starts) - 2 * cost_per_contract * run_position
+        is_trade = run_position != 0
+        run_combo = flat_starts // (length + 1)
+        trades[:, day] = np.bincount(run_combo[is_trade], minlength=n_combos)
+        wins[:, day] = np.bincount(run_combo[is_trade & (run_pnl > 0)], minlength=n_combos)
+
+    return BacktestResult(
+        combos=combos,
+        day_labels=day_index.day_labels(),
+        pnl=pnl,
+        drawdown=drawdown,
+        trades=trades,
+        wins=wins,
+        stopped=stopped,
+        seconds=time.perf_counter() - started,
+        combo_bars=n_combos * len(bars),
+    )
+
+def summarize(result: BacktestResult, top: int = 10) -> Dict[str, Any]:
+    """JSON-ready ranking of all combos plus per-day tables for the best ``top``"""
+    total = result.pnl.sum(axis=1)
+    equity = np.cumsum(result.pnl, axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), 0.0)
+    max_drawdown = (peak - equity).max(axis=1, initial=0.0)
+    daily_std = result.pnl.std(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sharpe = np.where(daily_std > 0,
+                          result.pnl.mean(axis=1) / daily_std * np.sqrt(TRADING_DAYS_PER_YEAR), 0.0)
+    total_trades = result.trades.sum(axis=1)
+    hit_rate = np.where(total_trades > 0, result.wins.sum(axis=1) / np.maximum(total_trades, 1), 0.0)
+
+    order = np.argsort(-total, kind='stable')
+    ranking = [
+        {
+            'ema1_period': int(result.combos[i, 0]),
+            'ema2_period': int(result.combos[i, 1]),
+            'total_pnl': round(float(total[i]), 2),
+            'max_drawdown': round(float(max_drawdown[i]), 2),
+            'sharpe': round(float(sharpe[i]), 3),
+            'trades': int(total_trades[i]),
+            'hit_rate': round(float(hit_rate[i]), 4),
+            'winning_days': int((result.pnl[i] > 0).sum()),
+            'stopped_days': int(result.stopped[i].sum()),
+        }
+        for i in order
+    ]
+
+    best = order[:max(0, top)]
+    hit_rate_table = result.hit_rate[best]
+    tables = {
+        'days': result.day_labels,
+        'combos': [[int(result.combos[i, 0]), int(result.combos[i, 1])] for i in best],
+        'pnl': np.round(result.pnl[best], 2).tolist(),
+        'drawdown': np.round(result.drawdown[best], 2).tolist(),
+        'hit_rate': np.where(np.isnan(hit_rate_table), None, np.round(hit_rate_table, 4)).tolist(),
+    }
+
+    return {
+        'combinations': len(result.combos),
+        'days': len(result.day_labels),
+        'ranking': ranking,
+        'per_day': tables,
+        'performance': {
+            'seconds': round(result.seconds, 4),
+            'combo_bars': result.combo_bars,
+            'combo_bars_per_sec': round(result.combo_bars_per_sec),
+        },
+    }
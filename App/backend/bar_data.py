@@ -0,0 +1,340 @@
+"""
+Bar Data Parsing for RL Futures Trading System
+Converts uploaded OHLCV data into typed NumPy column arrays and trading-day indexes
+"""
+
+import csv
+import io
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterable, List, Sequence
+
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Column aliases, in the same priority order the frontend uses
+COLUMN_ALIASES: Dict[str, Sequence[str]] = {
+    'time': ('time', 'Time', 'date', 'Date'),
+    'open': ('open', 'Open', 'open_price', 'openPrice'),
+    'high': ('high', 'High', 'high_price', 'highPrice'),
+    'low': ('low', 'Low', 'low_price', 'lowPrice'),
+    'close': ('close', 'Close', 'close_price', 'closePrice'),
+    'volume': ('volume', 'Volume', 'vol', 'Vol'),
+}
+
+REQUIRED_COLUMNS = ('time', 'open', 'high', 'low', 'close')
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Rows converted to arrays per chunk while parsing
+DEFAULT_CHUNK_ROWS = 100_000
+
+# Fallback formats for timestamps NumPy cannot parse directly
+_TIME_FORMATS = (
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    '%m/%d/%Y',
+    '%Y/%m/%d %H:%M:%S',
+    '%Y/%m/%d %H:%M',
+    '%Y%m%d %H%M%S',
+)
+
+SECONDS_PER_DAY = 86400
+
+class DataFormatError(ValueError):
+    """Raised when uploaded bar data cannot be parsed"""
+    pass
+
+@dataclass
+class BarData:
+    """OHLCV bars stored as contiguous column arrays.
+
+    Timestamps are int64 seconds since the epoch (exchange-local wall time,
+    no timezone); prices and volume are float64.
+    """
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns().values())
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Get all columns keyed by name"""
+        return {
+            'timestamp': self.timestamp,
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume,
+        }
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray]) -> 'BarData':
+        """Build bars from a column mapping"""
+        return cls(**{name: columns[name] for name in BAR_COLUMNS})
+
+    @classmethod
+    def concatenate(cls, chunks: List['BarData']) -> 'BarData':
+        """Join parsed chunks into one set of bars"""
+        if not chunks:
+            return cls.empty()
+        if len(chunks) == 1:
+            return chunks[0]
+        return cls(**{
+            name: np.concatenate([getattr(chunk, name) for chunk in chunks])
+            for name in BAR_COLUMNS
+        })
+
+    @classmethod
+    def empty(cls) -> 'BarData':
+        return cls(
+            timestamp=np.empty(0, dtype=np.int64),
+            **{name: np.empty(0, dtype=np.float64) for name in PRICE_COLUMNS}
+        )
+
+BAR_COLUMNS = ('timestamp',) + PRICE_COLUMNS
+
+@dataclass
+class DayIndex:
+    """Trading-day segmentation of a bar array.
+
+    Bars ``offsets[i]:offsets[i + 1]`` belong to trading day ``day_ids[i]``
+    (days since the epoch). A session that opens at ``session_start`` is
+    labelled with the date it closes on, following exchange convention.
+    """
+    day_ids: np.ndarray
+    offsets: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.day_ids)
+
+    def day_slice(self, position: int) -> slice:
+        """Get the bar slice for the day at a given position"""
+        return slice(int(self.offsets[position]), int(self.offsets[position + 1]))
+
+    def day_labels(self) -> List[str]:
+        """Get ISO dates for every trading day"""
+        return [str(day) for day in self.day_ids.astype('datetime64[D]')]
+
+def parse_session_time(value: str) -> int:
+    """Convert an 'HH:MM' session time (optionally '+1') to seconds after midnight"""
+    hours, minutes = value.split('+')[0].split(':')
+    return int(hours) * 3600 + int(minutes) * 60
+
+def trading_day_ids(timestamps: np.ndarray, session_start: str = '17:00') -> np.ndarray:
+    """Get the trading day (days since epoch) of every timestamp"""
+    start_seconds = parse_session_time(session_start)
+    shift = (SECONDS_PER_DAY - start_seconds) % SECONDS_PER_DAY
+    return (timestamps + shift) // SECONDS_PER_DAY
+
+def build_day_index(timestamps: np.ndarray, session_start: str = '17:00') -> DayIndex:
+    """Segment bars into trading days without per-bar Python work"""
+    if len(timestamps) == 0:
+        return DayIndex(np.empty(0, dtype=np.int64), np.zeros(1, dtype=np.int64))
+
+    day_ids = trading_day_ids(timestamps, session_start)
+    starts = np.flatnonzero(np.diff(day_ids)) + 1
+    offsets = np.concatenate(([0], starts, [len(timestamps)])).astype(np.int64)
+    return DayIndex(day_ids[offsets[:-1]].astype(np.int64), offsets)
+
+def resolve_columns(header: Sequence[Any]) -> Dict[str, int]:
+    """Map canonical column names to header positions using the aliases"""
+    positions = {}
+    for index, name in enumerate(header):
+        key = str(name).strip() if name is not None else ''
+        positions.setdefault(key, index)
+
+    resolved = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in positions:
+                resolved[column] = positions[alias]
+                break
+
+    missing = [column for column in REQUIRED_COLUMNS if column not in resolved]
+    if missing:
+        raise DataFormatError(f"Missing required columns: {', '.join(missing)}")
+
+    return resolved
+
+def _parse_time_fallback(value: Any) -> int:
+    """Parse a single timestamp NumPy could not handle"""
+    if isinstance(value, datetime):
+        return int(np.datetime64(value.replace(tzinfo=None), 's').astype(np.int64))
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+
+    text = str(value).strip()
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        for fmt in _TIME_FORMATS:
+            try:
+                parsed = datetime.strptime(text, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            raise DataFormatError(f"Unrecognized timestamp: {text!r}")
+
+    return int(np.datetime64(parsed.replace(tzinfo=None), 's').astype(np.int64))
+
+def parse_timestamps(values: Sequence[Any]) -> np.ndarray:
+    """Convert timestamp cells to int64 epoch seconds"""
+    try:
+        return np.array(values, dtype='datetime64[s]').astype(np.int64)
+    except (ValueError, TypeError):
+        return np.fromiter((_parse_time_fallback(v) for v in values), dtype=np.int64,
+                           count=len(values))
+
+def parse_prices(values: Sequence[Any]) -> np.ndarray:
+    """Convert price cells to float64, mapping blanks to NaN"""
+    try:
+        return np.array(values, dtype=np.float64)
+    except (ValueError, TypeError):
+        out = np.empty(len(values), dtype=np.float64)
+        for i, value in enumerate(values):
+            try:
+                out[i] = float(value)
+            except (ValueError, TypeError):
+                out[i] = np.nan
+        return out
+
+def rows_to_bars(rows: List[Sequence[Any]], columns: Dict[str, int]) -> BarData:
+    """Convert one chunk of positional rows to typed arrays"""
+    # Transpose once so every column is converted with a single NumPy call
+    cells = list(zip(*rows)) if rows else []
+    if not cells:
+        return BarData.empty()
+
+    def column(name: str) -> Sequence[Any]:
+        index = columns[name]
+        return cells[index] if index < len(cells) else (None,) * len(rows)
+
+    bars = {'timestamp': parse_timestamps(column('time'))}
+    for name in PRICE_COLUMNS:
+        if name in columns:
+            bars[name] = parse_prices(column(name))
+        else:
+            bars[name] = np.zeros(len(rows), dtype=np.float64)
+
+    return BarData.from_columns(bars)
+
+def bars_from_row_iter(header: Sequence[Any], rows: Iterable[Sequence[Any]],
+                       chunk_rows: int = DEFAULT_CHUNK_ROWS) -> BarData:
+    """Convert an iterator of positional rows into bars, one chunk at a time"""
+    columns = resolve_columns(header)
+    chunks = []
+    pending = []
+
+    for row in rows:
+        if not row or all(cell is None or cell == '' for cell in row):
+            continue
+        pending.append(row)
+        if len(pending) >= chunk_rows:
+            chunks.append(rows_to_bars(pending, columns))
+            pending = []
+
+    if pending:
+        chunks.append(rows_to_bars(pending, columns))
+
+    return BarData.concatenate(chunks)
+
+def parse_csv_stream(stream: Iterable[str], chunk_rows: int = DEFAULT_CHUNK_ROWS) -> BarData:
+    """Parse CSV text (a file object or iterable of lines) into bars"""
+    reader = csv.reader(stream)
+    try:
+        header = next(reader)
+    except StopIteration:
+        raise DataFormatError("File contains no data")
+
+    return bars_from_row_iter(header, reader, chunk_rows)
+
+def parse_csv_text(text: str) -> BarData:
+    """Parse CSV content already held in memory"""
+    return parse_csv_stream(io.StringIO(text))
+
+def parse_row_dicts(rows: List[Dict[str, Any]]) -> BarData:
+    """Parse a list of row objects as produced by the frontend parsers"""
+    if not rows:
+        raise DataFormatError("File contains no data")
+    if not all(isinstance(row, dict) for row in rows):
+        raise DataFormatError("Rows must be objects")
+
+    header = list(rows[0].keys())
+    columns = resolve_columns(header)
+    names = [header[columns[name]] for name in columns]
+    positional = ([row.get(name) for name in names] for row in rows)
+    return bars_from_row_iter(names, positional)
+
+def parse_excel_stream(stream: BinaryIO, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> BarData:
+    """Parse an .xlsx workbook without loading it into memory.
+
+    Worksheets are read in openpyxl's read-only streaming mode and rows are
+    converted to arrays ``chunk_rows`` at a time. Every worksheet whose
+    header row contains the required columns contributes bars, in order.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise DataFormatError("Excel uploads require the openpyxl package")
+
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        raise DataFormatError(f"Excel parsing failed: {e}")
+
+    try:
+        chunks = []
+        for worksheet in workbook.worksheets:
+            rows = worksheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                continue
+            try:
+                chunks.append(bars_from_row_iter(header, rows, chunk_rows))
+            except DataFormatError as e:
+                logger.info(f"Skipping worksheet {worksheet.title!r}: {e}")
+    finally:
+        workbook.close()
+
+    if not chunks:
+        raise DataFormatError("No worksheet contains the required columns: "
+                              f"{', '.join(REQUIRED_COLUMNS)}")
+
+    return BarData.concatenate(chunks)
+
+def get_file_type(filename: str) -> str:
+    """Get the upload file type from the client-supplied file name"""
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension in ('.csv', '.txt'):
+        return 'csv'
+    if extension in ('.xlsx', '.xlsm'):
+        return 'excel'
+    if extension == '.xls':
+        raise DataFormatError("Legacy .xls workbooks are not supported. Please save as .xlsx or CSV.")
+    raise DataFormatError("Unsupported file type. Please upload a CSV or Excel file.")
+
+def parse_upload_stream(stream: BinaryIO, file_type: str) -> BarData:
+    """Parse an uploaded binary stream of the given file type"""
+    if file_type == 'csv':
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        try:
+            return parse_csv_stream(text)
+        finally:
+            # Leave the underlying upload stream open for its owner
+            text.detach()
+    if file_type == 'excel':
+        return parse_excel_stream(stream)
+    raise DataFormatError(f"Unsupported file type: {file_type}")
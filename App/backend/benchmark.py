@@ -0,0 +1,331 @@
+"""
+Benchmark Suite for RL Futures Trading System
+Reproducible latency/throughput measurements per endpoint and payload size, with regression checks
+
+Usage:
+    python benchmark.py --target client --output results.json
+    python benchmark.py --target client,gunicorn --baseline benchmarks/baseline.json --threshold 0.25
+    python benchmark.py --target startup --baseline benchmarks/baseline.json
+
+Targets are the in-process Flask test client (application cost only), a
+local gunicorn instance (adds HTTP parsing and the network stack) and
+``startup``, which times cold starts in fresh interpreters. Requests
+are sent one at a time so runs are comparable; ``load_test.py`` covers
+concurrency. Exits with status 1 when a scenario regressed against the
+baseline by more than the threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from load_test import KeepAliveClient, percentiles, start_server, wait_until_ready
+
+KB = 1024
+MB = 1024 * 1024
+PAYLOAD_SIZES = {'1k': KB, '64k': 64 * KB, '1m': MB, '16m': 16 * MB}
+MAX_BODY_BYTES = 16 * MB - 4 * KB  # stay under the app's MAX_CONTENT_LENGTH
+BYTES_PER_RUN = 64 * MB
+MIN_ITERATIONS = 5
+MAX_ITERATIONS = 200
+WARMUP_ITERATIONS = 2
+DEFAULT_THRESHOLD = 0.25
+NOISE_FLOOR_MS = 0.5
+COMPARED_STATS = ('p50_ms', 'p95_ms')
+
+@dataclass
+class Scenario:
+    """One endpoint with one payload; ``body(i)`` builds the i-th request body"""
+    name: str
+    method: str
+    path: str
+    payload_bytes: int = 0
+    body: Optional[Callable[[int], bytes]] = None
+
+    @property
+    def iterations(self) -> int:
+        if not self.payload_bytes:
+            return MAX_ITERATIONS
+        return int(np.clip(BYTES_PER_RUN // self.payload_bytes, MIN_ITERATIONS, MAX_ITERATIONS))
+
+def _bar_rows(total_bytes: int, seed: int = 0) -> List[str]:
+    """Deterministic 1-minute CSV rows adding up to about ``total_bytes``"""
+    rng = np.random.default_rng(seed)
+    count = max(total_bytes // 56, 10)
+    close = np.round(4800 + np.cumsum(rng.normal(0, 0.5, count)) * 4) / 4
+    start = np.datetime64('2024-01-02T00:00')
+    times = (start + np.arange(count) * np.timedelta64(1, 'm')).astype(str)
+    return [f"{t.replace('T', ' ')}:00,{c:.2f},{c + 0.5:.2f},{c - 0.5:.2f},{c:.2f},{100 + i % 50}\n"
+            for i, (t, c) in enumerate(zip(times, close))]
+
+def upload_body(total_bytes: int) -> Callable[[int], bytes]:
+    """JSON CSV uploads that differ per iteration, so each one is parsed rather than served from cache"""
+    rows = _bar_rows(total_bytes)
+    # Each newline grows by a byte when JSON-escaped
+    encoded_sizes = np.cumsum([len(row) + 1 for row in rows])
+    rows = rows[:max(int(np.searchsorted(encoded_sizes, total_bytes - 128)), 2)]
+    header = 'time,open,high,low,close,volume\n'
+    first, rest = rows[0].rsplit(',', 1)[0], ''.join(rows[1:])
+
+    def body(iteration: int) -> bytes:
+        csv_text = f'{header}{first},{iteration}\n{rest}'
+        return json.dumps({'filename': f'bench_{iteration}.csv', 'data': csv_text}).encode()
+    return body
+
+def validate_body(total_bytes: int) -> Callable[[int], bytes]:
+    """A list of strings within the sanitizer's per-string and item limits"""
+    items = max(1, total_bytes // 200)
+    length = max(1, min(total_bytes // items - 4, 1000))
+    payload = json.dumps({'data': ['<b>x</b>&' * (length // 9) + 'y' * (length % 9)] * items}).encode()
+    return lambda iteration: payload
+
+def build_scenarios(sizes: List[str]) -> List[Scenario]:
+    config_update = json.dumps({'ppo_settings': {'learning_rate': 0.0003, 'gamma': 0.99}}).encode()
+    scenarios = [
+        Scenario('health', 'GET', '/health'),
+        Scenario('metrics', 'GET', '/metrics'),
+        Scenario('config_get', 'GET', '/api/config'),
+        Scenario('config_post', 'POST', '/api/config', len(config_update), lambda i: config_update),
+    ]
+    for size_name in sizes:
+        size = min(PAYLOAD_SIZES[size_name], MAX_BODY_BYTES)
+        for name, path, make_body in (('validate', '/api/validate', validate_body),
+                                      ('upload', '/api/upload', upload_body)):
+            body = make_body(size)
+            scenarios.append(Scenario(f'{name}_{size_name}', 'POST', path, len(body(0)), body))
+    return scenarios
+
+class ClientTarget:
+    """The app in this process via the Flask test client"""
+    name = 'client'
+
+    def __init__(self):
+        import app as appmod
+        from security import rate_limiter
+        self._rate_limiter = rate_limiter
+        self._rate_limiting = rate_limiter.enabled
+        rate_limiter.enabled = False
+        self.client = appmod.app.test_client()
+
+    def request(self, method: str, path: str, body: Optional[bytes]) -> int:
+        response = self.client.open(path, method=method, data=body,
+                                    content_type='application/json' if body is not None else None)
+        response.get_data()
+        return response.status_code
+
+    def close(self):
+        self._rate_limiter.enabled = self._rate_limiting
+
+class GunicornTarget:
+    """A local gunicorn server (gthread profile unless SERVING_MODE says otherwise)"""
+    name = 'gunicorn'
+
+    def __init__(self, port: int = 8766, mode: Optional[str] = None):
+        # A fresh dataset cache, so uploads are not cache hits from an earlier target
+        cache_dir = tempfile.mkdtemp(prefix='rlfts-bench-cache-')
+        self.server = start_server(mode or os.environ.get('SERVING_MODE', 'gthread'), port,
+                                   {'DATASET_CACHE_DIR': cache_dir})
+        base_url = f'http://127.0.0.1:{port}'
+        try:
+            wait_until_ready(base_url)
+        except TimeoutError:
+            self.close()
+            raise
+        self.client = KeepAliveClient('127.0.0.1', port)
+
+    def request(self, method: str, path: str, body: Optional[bytes]) -> int:
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        return self.client.request(method, path, body, headers)
+
+    def close(self):
+        if getattr(self, 'client', None) is not None:
+            self.client.close()
+        self.server.terminate()
+        self.server.wait(timeout=30)
+
+def run_scenario(target, scenario: Scenario, iterations: Optional[int] = None) -> Dict[str, Any]:
+    """Time sequential requests; request bodies are built outside the timed section"""
+    iterations = iterations or scenario.iterations
+    for i in range(WARMUP_ITERATIONS):
+        target.request(scenario.method, scenario.path, scenario.body(-1 - i) if scenario.body else None)
+
+    latencies, statuses = [], {}
+    for i in range(iterations):
+        body = scenario.body(i) if scenario.body else None
+        started = time.perf_counter()
+        status = target.request(scenario.method, scenario.path, body)
+        latencies.append(time.perf_counter() - started)
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    total = sum(latencies)
+    result = {
+        'path': scenario.path,
+        'method': scenario.method,
+        'payload_bytes': scenario.payload_bytes,
+        'requests': iterations,
+        'errors': sum(count for status, count in statuses.items() if int(status) >= 400),
+        'statuses': statuses,
+        'throughput_rps': round(iterations / total, 1) if total > 0 else 0.0,
+        **percentiles(latencies),
+    }
+    if scenario.payload_bytes:
+        result['mb_per_sec'] = round(scenario.payload_bytes * iterations / total / MB, 2)
+    return result
+
+STARTUP_RUNS = 10
+STARTUP_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import app as appmod
+imported = time.perf_counter()
+application = appmod.create_app()
+created = time.perf_counter()
+client = application.test_client()
+client.get('/api/config')
+first = time.perf_counter()
+client.get('/api/checkpoints')
+data = time.perf_counter()
+print(json.dumps({'import': imported - started, 'create_app': created - imported,
+                  'first_request': first - created, 'first_data_request': data - first}))
+"""
+
+def measure_startup(runs: int = STARTUP_RUNS) -> Dict[str, Dict[str, Any]]:
+    """Cold start in fresh interpreters: import, create_app, first plain and first NumPy-backed request.
+
+    ``process`` is the whole interpreter run as seen from outside, and
+    ``create_app_preload`` is create_app with PRELOAD_MODULES on, as in a
+    gunicorn master.
+    """
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    timings: Dict[str, List[float]] = {}
+    failures = 0
+    for preload in ('false', 'true'):
+        env = {**os.environ, 'PRELOAD_MODULES': preload, 'RATE_LIMIT_ENABLED': 'false'}
+        for _ in range(runs):
+            started = time.perf_counter()
+            completed = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT], cwd=backend_dir, env=env,
+                                       capture_output=True, text=True, timeout=120)
+            elapsed = time.perf_counter() - started
+            if completed.returncode != 0:
+                failures += 1
+                continue
+            phases = json.loads(completed.stdout.strip().splitlines()[-1])
+            if preload == 'true':
+                timings.setdefault('create_app_preload', []).append(phases['create_app'])
+                continue
+            timings.setdefault('process', []).append(elapsed)
+            for phase, seconds in phases.items():
+                timings.setdefault(phase, []).append(seconds)
+
+    return {
+        f'startup/{phase}': {'requests': len(values), 'errors': failures, **percentiles(values)}
+        for phase, values in timings.items()
+    }
+
+def run_benchmarks(targets: List[str], sizes: List[str], iterations: Optional[int] = None,
+                   port: int = 8766) -> Dict[str, Any]:
+    """Run every scenario against every target; results are keyed ``target/scenario``"""
+    scenarios = build_scenarios(sizes)
+    results = {}
+    for target_name in targets:
+        if target_name == 'startup':
+            results.update(measure_startup())
+            continue
+        target = ClientTarget() if target_name == 'client' else GunicornTarget(port)
+        try:
+            for scenario in scenarios:
+                results[f'{target.name}/{scenario.name}'] = run_scenario(target, scenario, iterations)
+        finally:
+            target.close()
+    return {'meta': environment_info(), 'results': results}
+
+def environment_info() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD,
+            stats=COMPARED_STATS, noise_floor: float = NOISE_FLOOR_MS) -> List[Dict[str, Any]]:
+    """Scenarios whose ``stats`` grew by more than ``threshold`` (and the noise floor)"""
+    regressions = []
+    for key, result in current['results'].items():
+        reference = baseline.get('results', {}).get(key)
+        if reference is None:
+            continue
+        for stat in stats:
+            before, after = reference.get(stat), result.get(stat)
+            if before is None or after is None:
+                continue
+            if after > before * (1 + threshold) and after - before > noise_floor:
+                regressions.append({'scenario': key, 'stat': stat, 'baseline': before, 'current': after,
+                                    'change': round(after / before - 1, 3) if before else None})
+    return regressions
+
+def print_results(report: Dict[str, Any]) -> None:
+    print(f"{'scenario':<28}{'n':>5}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'MB/s':>9}{'err':>5}")
+    for key, row in report['results'].items():
+        print(f"{key:<28}{row['requests']:>5}{row.get('throughput_rps', '-'):>10}{row['p50_ms']:>10}"
+              f"{row['p95_ms']:>10}{row['p99_ms']:>10}{row.get('mb_per_sec', '-'):>9}{row['errors']:>5}")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--target', default='client', help='comma-separated: client, gunicorn, startup')
+    parser.add_argument('--sizes', default=','.join(PAYLOAD_SIZES), help='payload sizes (1k,64k,1m,16m)')
+    parser.add_argument('--iterations', type=int, help='fixed iteration count for every scenario')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--baseline', help='results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed relative slowdown of p50/p95 (default 0.25)')
+    args = parser.parse_args(argv)
+
+    # Isolate the run: fresh dataset cache and logs, no rate limiting
+    workdir = tempfile.mkdtemp(prefix='rlfts-bench-')
+    os.environ.setdefault('DATASET_CACHE_DIR', os.path.join(workdir, 'cache'))
+    os.environ.setdefault('CHECKPOINT_DIR', os.path.join(workdir, 'checkpoints'))
+    os.environ.setdefault('LOG_FILE', os.path.join(workdir, 'logs', 'app.log'))
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ['RATE_LIMIT_ENABLED'] = 'false'
+
+    sizes = [size for size in args.sizes.split(',') if size]
+    unknown = set(sizes) - set(PAYLOAD_SIZES)
+    if unknown:
+        parser.error(f"unknown payload sizes: {', '.join(sorted(unknown))}")
+    report = run_benchmarks(args.target.split(','), sizes, args.iterations, args.port)
+    print_results(report)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression['scenario']} {regression['stat']}: "
+                  f"{regression['baseline']} -> {regression['current']} ms")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
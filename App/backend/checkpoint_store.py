@@ -0,0 +1,243 @@
+"""
+Model Checkpoint Store for RL Futures Trading System
+Flat binary array checkpoints with JSON manifests, memory-mapped warm starts and retention
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import logging
+
+from policy import Adam, MLPPolicy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_DIR = 'data/checkpoints'
+DEFAULT_KEEP_LAST = 5
+FORMAT_VERSION = 1
+ARRAY_ALIGNMENT = 64
+ARRAYS_FILE = 'arrays.bin'
+MANIFEST_FILE = 'manifest.json'
+
+class Checkpoint:
+    """A loaded checkpoint: its manifest plus arrays keyed by name"""
+
+    def __init__(self, manifest: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        self.manifest = manifest
+        self.arrays = arrays
+
+    @property
+    def checkpoint_id(self) -> str:
+        return self.manifest['id']
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        return self.manifest.get('config', {})
+
+    def group(self, prefix: str) -> Dict[str, np.ndarray]:
+        """Arrays under ``prefix/``, keyed by the rest of the name"""
+        start = len(prefix) + 1
+        return {name[start:]: array for name, array in self.arrays.items() if name.startswith(prefix + '/')}
+
+class CheckpointStore:
+    """Directory of checkpoints, one sub-directory per checkpoint.
+
+    Each checkpoint is ``arrays.bin`` (raw little-endian arrays at 64-byte
+    aligned offsets) and ``manifest.json`` (names, dtypes, shapes and
+    offsets plus config and metadata). Nothing is pickled. Loading memory-
+    maps the array file copy-on-write, so a warm start reads only the pages
+    it touches. After each save only the newest ``keep_last`` checkpoints
+    and the best-scoring checkpoint of every trading day are kept. "Newest"
+    means most recently saved, not highest step, so a run restarted at a
+    lower step keeps its new checkpoints.
+    """
+
+    def __init__(self, root: str = DEFAULT_CHECKPOINT_DIR, keep_last: int = DEFAULT_KEEP_LAST):
+        self.root = root
+        self.keep_last = keep_last
+        self._lock = threading.Lock()
+        self._last_created = 0.0
+
+    def save(self, arrays: Dict[str, np.ndarray], config: Dict[str, Any] = None, step: int = 0,
+             trading_day: Optional[str] = None, score: Optional[float] = None,
+             metadata: Dict[str, Any] = None) -> str:
+        """Write a checkpoint and apply the retention policy; returns its id"""
+        checkpoint_id = f'{step:012d}-{uuid.uuid4().hex[:8]}'
+        with self._lock:
+            # Strictly increasing, so saves within one clock tick keep their order
+            created = self._last_created = max(time.time(), self._last_created + 1e-6)
+        os.makedirs(self.root, exist_ok=True)
+        staging = os.path.join(self.root, f'.{checkpoint_id}.tmp')
+        os.makedirs(staging)
+
+        entries = {}
+        try:
+            with open(os.path.join(staging, ARRAYS_FILE), 'wb') as f:
+                for name, array in arrays.items():
+                    array = np.asarray(array)
+                    array = array.astype(array.dtype.newbyteorder('<'), copy=False)
+                    padding = -f.tell() % ARRAY_ALIGNMENT
+                    f.write(b'\0' * padding)
+                    entries[name] = {
+                        'dtype': array.dtype.str,
+                        'shape': list(array.shape),
+                        'offset': f.tell(),
+                        'nbytes': array.nbytes,
+                    }
+                    f.write(np.ascontiguousarray(array).tobytes())
+
+            manifest = {
+                'format_version': FORMAT_VERSION,
+                'id': checkpoint_id,
+                'step': step,
+                'created': created,
+                'trading_day': trading_day,
+                'score': score,
+                'config': config or {},
+                'metadata': metadata or {},
+                'arrays': entries,
+            }
+            with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+                json.dump(manifest, f, indent=2)
+            os.rename(staging, self._path(checkpoint_id))
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        logger.info(f"Saved checkpoint {checkpoint_id} (step={step}, day={trading_day}, score={score})")
+        self.prune()
+        return checkpoint_id
+
+    def load(self, checkpoint_id: str, mmap: bool = True) -> Checkpoint:
+        """Load a checkpoint; arrays are copy-on-write memory maps unless ``mmap`` is False"""
+        manifest = self._read_manifest(checkpoint_id)
+        if manifest is None:
+            raise FileNotFoundError(f"Checkpoint not found: {checkpoint_id}")
+        if manifest.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported checkpoint format: {manifest.get('format_version')}")
+
+        path = os.path.join(self._path(checkpoint_id), ARRAYS_FILE)
+        if mmap and os.path.getsize(path) > 0:
+            raw = np.memmap(path, dtype=np.uint8, mode='c')
+        else:
+            raw = np.fromfile(path, dtype=np.uint8)
+
+        arrays = {}
+        for name, entry in manifest['arrays'].items():
+            start = entry['offset']
+            data = raw[start:start + entry['nbytes']]
+            arrays[name] = data.view(np.dtype(entry['dtype'])).reshape(entry['shape'])
+        return Checkpoint(manifest, arrays)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Manifests of all checkpoints (without array tables), oldest saved first"""
+        manifests = []
+        for checkpoint_id in self._checkpoint_ids():
+            manifest = self._read_manifest(checkpoint_id)
+            if manifest is not None:
+                manifests.append({key: value for key, value in manifest.items() if key != 'arrays'})
+        manifests.sort(key=lambda manifest: (manifest.get('created', 0), manifest['id']))
+        return manifests
+
+    def latest(self) -> Optional[str]:
+        """Id of the most recently saved checkpoint"""
+        manifests = self.list()
+        return manifests[-1]['id'] if manifests else None
+
+    def best(self, trading_day: Optional[str] = None) -> Optional[str]:
+        """Id of the best-scoring checkpoint, overall or for one trading day"""
+        candidates = [
+            manifest for manifest in self.list()
+            if manifest.get('score') is not None
+            and (trading_day is None or manifest.get('trading_day') == trading_day)
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda manifest: manifest['score'])['id']
+
+    def prune(self) -> List[str]:
+        """Remove checkpoints outside the retention policy; returns removed ids"""
+        with self._lock:
+            manifests = self.list()
+            keep = {manifest['id'] for manifest in manifests[-self.keep_last:]} if self.keep_last > 0 else set()
+
+            best_per_day: Dict[str, Dict[str, Any]] = {}
+            for manifest in manifests:
+                day, score = manifest.get('trading_day'), manifest.get('score')
+                if day is None or score is None:
+                    continue
+                if day not in best_per_day or score > best_per_day[day]['score']:
+                    best_per_day[day] = manifest
+            keep.update(manifest['id'] for manifest in best_per_day.values())
+
+            removed = [manifest['id'] for manifest in manifests if manifest['id'] not in keep]
+            for checkpoint_id in removed:
+                shutil.rmtree(self._path(checkpoint_id), ignore_errors=True)
+        if removed:
+            logger.info(f"Pruned {len(removed)} checkpoint(s)")
+        return removed
+
+    def _path(self, checkpoint_id: str) -> str:
+        return os.path.join(self.root, checkpoint_id)
+
+    def _checkpoint_ids(self) -> List[str]:
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return []
+        return sorted(name for name in names if not name.startswith('.')
+                      and os.path.exists(os.path.join(self.root, name, MANIFEST_FILE)))
+
+    def _read_manifest(self, checkpoint_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self._path(checkpoint_id), MANIFEST_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+def training_state(policy: MLPPolicy, optimizer: Optional[Adam] = None,
+                   extra: Dict[str, np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """Collect policy weights, optimizer moments and extra arrays under prefixed names"""
+    arrays = {f'policy/{name}': value for name, value in policy.params.items()}
+    if optimizer is not None:
+        arrays.update({f'adam_m/{name}': value for name, value in optimizer.m.items()})
+        arrays.update({f'adam_v/{name}': value for name, value in optimizer.v.items()})
+        arrays['adam/step_count'] = np.array([optimizer.step_count], dtype=np.int64)
+    arrays.update(extra or {})
+    return arrays
+
+def warm_start(checkpoint: Checkpoint, policy: MLPPolicy, optimizer: Optional[Adam] = None):
+    """Adopt a checkpoint's arrays as the live policy and optimizer state.
+
+    The copy-on-write memory maps are used directly, so nothing is read
+    from disk until training touches it, and updates never reach the file.
+    Layer shapes must match the policy.
+    """
+    weights = checkpoint.group('policy')
+    for name, current in policy.params.items():
+        if name not in weights or weights[name].shape != current.shape:
+            raise ValueError(f"Checkpoint does not match policy layer {name}")
+    # Replace entries rather than the dict: the optimizer shares it
+    for name in list(policy.params):
+        policy.params[name] = weights[name]
+
+    if optimizer is not None and 'adam/step_count' in checkpoint.arrays:
+        optimizer.m.update(checkpoint.group('adam_m'))
+        optimizer.v.update(checkpoint.group('adam_v'))
+        optimizer.step_count = int(checkpoint.arrays['adam/step_count'][0])
+
+# Global checkpoint store instance
+checkpoint_store = CheckpointStore(
+    os.environ.get('CHECKPOINT_DIR', DEFAULT_CHECKPOINT_DIR),
+    int(os.environ.get('CHECKPOINT_KEEP_LAST', DEFAULT_KEEP_LAST))
+)
+
+def get_checkpoint_store() -> CheckpointStore:
+    """Get the global checkpoint store"""
+    return checkpoint_store
@@ -0,0 +1,76 @@
+"""
+Columnar Binary Encoding for RL Futures Trading System
+Numeric API responses as raw little-endian typed arrays behind a small JSON header
+
+Layout::
+
+    b'RLCF' | uint32 LE header length | JSON header | column data
+
+The header is UTF-8 JSON padded with spaces to a multiple of 8 bytes:
+``{"version": 1, "meta": {...}, "columns": [{"name", "dtype", "length",
+"offset"}, ...]}``. Offsets count from the start of the column data and
+every column starts on an 8-byte boundary, so a browser can wrap each one
+in a ``Float64Array`` or ``BigInt64Array`` view without copying. Dtypes are
+NumPy type strings (``<f8``, ``<i8``, ...). NaN stays NaN.
+"""
+
+import json
+import struct
+from typing import Any, Dict, Tuple
+
+import numpy as np
+from flask import Response
+
+COLUMNAR_MIMETYPE = 'application/vnd.rlfutures.columnar'
+MAGIC = b'RLCF'
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+SUPPORTED_DTYPES = ('<f8', '<f4', '<i8', '<i4', '<u4', '|u1', '|i1', '|b1')
+
+def _padding(size: int) -> int:
+    return -size % ALIGNMENT
+
+def encode_columnar(columns: Dict[str, np.ndarray], meta: Dict[str, Any] = None) -> bytes:
+    """Encode named 1-D columns and JSON-safe metadata"""
+    arrays, entries, offset = [], [], 0
+    for name, values in columns.items():
+        array = np.asarray(values)
+        if array.ndim != 1:
+            raise ValueError(f"Column {name!r} must be 1-D")
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+        if array.dtype.str not in SUPPORTED_DTYPES:
+            raise ValueError(f"Column {name!r} has unsupported dtype {array.dtype.str}")
+        entries.append({'name': name, 'dtype': array.dtype.str, 'length': len(array), 'offset': offset})
+        arrays.append(array)
+        offset += array.nbytes + _padding(array.nbytes)
+
+    header = json.dumps({'version': FORMAT_VERSION, 'meta': meta or {}, 'columns': entries},
+                        separators=(',', ':')).encode('utf-8')
+    header += b' ' * _padding(len(header))
+
+    parts = [MAGIC, struct.pack('<I', len(header)), header]
+    for array in arrays:
+        parts.append(array.tobytes())
+        parts.append(b'\0' * _padding(array.nbytes))
+    return b''.join(parts)
+
+def decode_columnar(data: bytes) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Decode a columnar payload into (meta, columns); columns are read-only views"""
+    if data[:4] != MAGIC:
+        raise ValueError("Not a columnar payload")
+    header_length, = struct.unpack_from('<I', data, 4)
+    header = json.loads(data[8:8 + header_length])
+    if header['version'] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported columnar format version {header['version']}")
+
+    base = 8 + header_length
+    columns = {
+        entry['name']: np.frombuffer(data, dtype=np.dtype(entry['dtype']), count=entry['length'],
+                                     offset=base + entry['offset'])
+        for entry in header['columns']
+    }
+    return header['meta'], columns
+
+def columnar_response(columns: Dict[str, np.ndarray], meta: Dict[str, Any] = None,
+                      status: int = 200) -> Response:
+    return Response(encode_columnar(columns, meta), status=status, mimetype=COLUMNAR_MIMETYPE)
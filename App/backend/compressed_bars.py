@@ -0,0 +1,264 @@
+"""
+Compressed Bar Storage for RL Futures Trading System
+Chunked, delta/scaled-integer encoded bar files with a block index for random access
+"""
+
+import json
+import lzma
+import struct
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import logging
+
+from bar_data import BAR_COLUMNS, PRICE_COLUMNS, SECONDS_PER_DAY, BarData, parse_session_time
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'RLFB'
+FORMAT_VERSION = 1
+DEFAULT_BLOCK_ROWS = 4096
+MAX_DECIMALS = 8
+
+# Block index entry: file offset and size of the compressed block, row count
+# and the timestamp range covered (min/max, so unsorted data still works)
+INDEX_DTYPE = np.dtype([
+    ('offset', '<i8'),
+    ('length', '<i8'),
+    ('rows', '<i8'),
+    ('min_ts', '<i8'),
+    ('max_ts', '<i8'),
+])
+
+_FOOTER = struct.Struct('<q4s')
+_HEADER_PREFIX = struct.Struct('<4sHI')
+_COLUMN_HEADER = struct.Struct('<cBq')
+
+class CompressedFormatError(ValueError):
+    """Raised when a compressed bar file is malformed or unsupported"""
+    pass
+
+def _codec(name: str) -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    """Get (compress, decompress) functions for a codec name"""
+    if name == 'zlib':
+        return (lambda data: zlib.compress(data, 6)), zlib.decompress
+    if name == 'lzma':
+        return (lambda data: lzma.compress(data, preset=6)), lzma.decompress
+    if name == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise CompressedFormatError("The zstd codec requires the zstandard package")
+        return zstandard.ZstdCompressor(level=3).compress, zstandard.ZstdDecompressor().decompress
+    if name == 'lz4':
+        try:
+            import lz4.frame
+        except ImportError:
+            raise CompressedFormatError("The lz4 codec requires the lz4 package")
+        return lz4.frame.compress, lz4.frame.decompress
+    raise CompressedFormatError(f"Unknown codec: {name}")
+
+def available_codecs() -> List[str]:
+    """List the codecs usable in this environment, fastest decoders first"""
+    codecs = []
+    for name in ('lz4', 'zstd', 'zlib', 'lzma'):
+        try:
+            _codec(name)
+            codecs.append(name)
+        except CompressedFormatError:
+            pass
+    return codecs
+
+def detect_decimals(values: np.ndarray) -> Optional[int]:
+    """Smallest decimal scale at which every finite value is an exact integer.
+
+    Returns None when no scale up to MAX_DECIMALS round-trips exactly, in
+    which case the column is stored as raw float64.
+    """
+    finite = values[np.isfinite(values)]
+    if len(finite) == 0:
+        return 0
+    for decimals in range(MAX_DECIMALS + 1):
+        scale = 10.0 ** decimals
+        scaled = np.round(finite * scale)
+        if np.abs(scaled).max() >= 2 ** 53:
+            return None
+        if np.array_equal(scaled / scale, finite):
+            return decimals
+    return None
+
+def _smallest_int_dtype(values: np.ndarray) -> np.dtype:
+    if len(values) == 0:
+        return np.dtype('<i1')
+    low, high = values.min(), values.max()
+    for dtype in ('<i1', '<i2', '<i4'):
+        info = np.iinfo(dtype)
+        if low >= info.min and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype('<i8')
+
+def _encode_integers(values: np.ndarray) -> Tuple[bytes, bytes]:
+    """Delta-encode int64 values into (dtype code, payload)"""
+    deltas = np.diff(values, prepend=np.int64(0))
+    dtype = _smallest_int_dtype(deltas)
+    return dtype.str.encode('ascii'), deltas.astype(dtype).tobytes()
+
+def _encode_column(values: np.ndarray, decimals: Optional[int]) -> bytes:
+    """Encode one column of one block"""
+    values = np.asarray(values)
+    if values.dtype.kind == 'i':
+        code, payload = _encode_integers(values.astype(np.int64))
+        return _COLUMN_HEADER.pack(b'i', 0, len(payload)) + code + payload
+
+    nan_mask = np.isnan(values)
+    has_nan = bool(nan_mask.any())
+    mask_bytes = np.packbits(nan_mask).tobytes() if has_nan else b''
+
+    # Infinities have no scaled-integer form; such blocks keep raw floats
+    if decimals is None or np.isinf(values).any():
+        payload = np.ascontiguousarray(values, dtype='<f8').tobytes()
+        return _COLUMN_HEADER.pack(b'f', int(has_nan), len(payload)) + mask_bytes + payload
+
+    scaled = np.round(np.where(nan_mask, 0.0, values) * 10.0 ** decimals).astype(np.int64)
+    code, payload = _encode_integers(scaled)
+    return _COLUMN_HEADER.pack(b's', int(has_nan), len(payload)) + mask_bytes + code + payload
+
+def _decode_column(buffer: memoryview, position: int, rows: int,
+                   decimals: Optional[int]) -> Tuple[np.ndarray, int]:
+    """Decode one column of one block; returns the values and the next position"""
+    kind, has_nan, length = _COLUMN_HEADER.unpack_from(buffer, position)
+    position += _COLUMN_HEADER.size
+
+    nan_mask = None
+    if has_nan:
+        mask_length = (rows + 7) // 8
+        nan_mask = np.unpackbits(np.frombuffer(buffer, np.uint8, mask_length, position))[:rows].astype(bool)
+        position += mask_length
+
+    if kind == b'f':
+        values = np.frombuffer(buffer, '<f8', rows, position).copy()
+        return values, position + length
+
+    code = bytes(buffer[position:position + 3]).decode('ascii')
+    position += 3
+    deltas = np.frombuffer(buffer, code, rows, position)
+    integers = np.cumsum(deltas, dtype=np.int64)
+    position += length
+
+    if kind == b'i':
+        return integers, position
+
+    values = integers / 10.0 ** decimals
+    if nan_mask is not None:
+        values[nan_mask] = np.nan
+    return values, position
+
+def write_compressed(path: str, bars: BarData, codec: str = 'zlib',
+                     block_rows: int = DEFAULT_BLOCK_ROWS) -> Dict[str, Any]:
+    """Write bars to a compressed, block-indexed file.
+
+    Layout: header (magic, version, JSON metadata), compressed blocks, the
+    block index and a fixed-size footer pointing at the index. Returns the
+    metadata, including raw and compressed sizes.
+    """
+    compress, _ = _codec(codec)
+    decimals = {name: detect_decimals(np.asarray(getattr(bars, name))) for name in PRICE_COLUMNS}
+    metadata = {
+        'version': FORMAT_VERSION,
+        'codec': codec,
+        'rows': len(bars),
+        'block_rows': block_rows,
+        'decimals': decimals,
+    }
+    header_json = json.dumps(metadata).encode('utf-8')
+    index = np.zeros((len(bars) + block_rows - 1) // block_rows, dtype=INDEX_DTYPE)
+    timestamps = np.asarray(bars.timestamp)
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_json)))
+        f.write(header_json)
+
+        for block, start in enumerate(range(0, len(bars), block_rows)):
+            stop = min(start + block_rows, len(bars))
+            raw = b''.join(
+                _encode_column(getattr(bars, name)[start:stop], decimals.get(name))
+                for name in BAR_COLUMNS
+            )
+            compressed = compress(raw)
+            index[block] = (f.tell(), len(compressed), stop - start,
+                            timestamps[start:stop].min(), timestamps[start:stop].max())
+            f.write(compressed)
+
+        index_offset = f.tell()
+        f.write(index.tobytes())
+        f.write(_FOOTER.pack(index_offset, MAGIC))
+        compressed_bytes = f.tell()
+
+    metadata['raw_bytes'] = bars.nbytes
+    metadata['compressed_bytes'] = compressed_bytes
+    return metadata
+
+class CompressedBarReader:
+    """Random-access reader for files written by ``write_compressed``"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, header_length = _HEADER_PREFIX.unpack(f.read(_HEADER_PREFIX.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise CompressedFormatError(f"Unsupported bar file: {path}")
+            self.metadata = json.loads(f.read(header_length))
+
+            f.seek(-_FOOTER.size, 2)
+            index_offset, footer_magic = _FOOTER.unpack(f.read(_FOOTER.size))
+            if footer_magic != MAGIC:
+                raise CompressedFormatError(f"Truncated bar file: {path}")
+            f.seek(index_offset)
+            index_bytes = f.read()[:-_FOOTER.size]
+
+        self.index = np.frombuffer(index_bytes, dtype=INDEX_DTYPE)
+        self._decompress = _codec(self.metadata['codec'])[1]
+
+    def __len__(self) -> int:
+        return self.metadata['rows']
+
+    def read_blocks(self, blocks: np.ndarray) -> BarData:
+        """Decompress the given blocks, in order"""
+        chunks = []
+        decimals = self.metadata['decimals']
+        with open(self.path, 'rb') as f:
+            for block in blocks:
+                entry = self.index[block]
+                f.seek(int(entry['offset']))
+                rows = int(entry['rows'])
+                columns = {}
+                try:
+                    buffer = memoryview(self._decompress(f.read(int(entry['length']))))
+                    position = 0
+                    for name in BAR_COLUMNS:
+                        columns[name], position = _decode_column(buffer, position, rows, decimals.get(name))
+                except Exception as e:
+                    # Each codec raises its own error type (zlib.error, LZMAError, ...)
+                    raise CompressedFormatError(f"Corrupt block {int(block)} in {self.path}: {e}") from e
+                chunks.append(BarData.from_columns(columns))
+        return BarData.concatenate(chunks)
+
+    def read_all(self) -> BarData:
+        """Decompress the whole file"""
+        return self.read_blocks(np.arange(len(self.index)))
+
+    def read_range(self, start_ts: int, end_ts: int) -> BarData:
+        """Read bars with start_ts <= timestamp < end_ts, touching only overlapping blocks"""
+        overlapping = np.flatnonzero((self.index['min_ts'] < end_ts) & (self.index['max_ts'] >= start_ts))
+        bars = self.read_blocks(overlapping)
+        keep = (bars.timestamp >= start_ts) & (bars.timestamp < end_ts)
+        if keep.all():
+            return bars
+        return BarData.from_columns({name: values[keep] for name, values in bars.columns().items()})
+
+    def read_day(self, day_id: int, session_start: str = '17:00') -> BarData:
+        """Read one trading day (days since epoch, labelled as in DayIndex)"""
+        shift = (SECONDS_PER_DAY - parse_session_time(session_start)) % SECONDS_PER_DAY
+        session_open = int(day_id) * SECONDS_PER_DAY - shift
+        return self.read_range(session_open, session_open + SECONDS_PER_DAY)
@@ -0,0 +1,95 @@
+"""
+HTTP Compression for RL Futures Trading System
+Content-Encoding negotiation and gzip/deflate encoding of response bodies
+"""
+
+import struct
+import zlib
+from typing import Optional
+
+MIN_COMPRESS_BYTES = 1024
+# Bodies compressed once and reused (response cache) can afford a slower level
+# than bodies compressed on every request
+COMPRESS_LEVEL = 6
+RESPONSE_COMPRESS_LEVEL = 1
+
+# In order of preference when the client weights them equally
+SUPPORTED_CODINGS = ('gzip', 'deflate')
+
+# Already compressed, or must reach the client unbuffered
+SKIPPED_MIMETYPE_PREFIXES = ('text/event-stream', 'image/', 'application/gzip', 'application/zip')
+
+_GZIP_HEADER = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'
+_ZLIB_HEADER = b'\x78\x9c'
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick gzip or deflate from an Accept-Encoding header; None means identity"""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(','):
+        coding, *params = part.split(';')
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in SUPPORTED_CODINGS:
+        weight = weights.get(coding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+class CompressedBody:
+    """A body compressed once and framed as gzip or deflate on demand.
+
+    Both codings carry the same raw DEFLATE stream and differ only in a few
+    header and checksum bytes, so one compression pass serves either.
+    """
+
+    __slots__ = ('raw', 'length', 'crc32', 'adler32')
+
+    def __init__(self, body: bytes, level: int = COMPRESS_LEVEL):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self.raw = compressor.compress(body) + compressor.flush()
+        self.length = len(body)
+        self.crc32 = zlib.crc32(body)
+        self.adler32 = zlib.adler32(body)
+
+    def encode(self, coding: str) -> bytes:
+        if coding == 'gzip':
+            return _GZIP_HEADER + self.raw + struct.pack('<II', self.crc32, self.length & 0xFFFFFFFF)
+        if coding == 'deflate':
+            # HTTP "deflate" is the zlib format (RFC 1950), not a bare stream
+            return _ZLIB_HEADER + self.raw + struct.pack('>I', self.adler32)
+        raise ValueError(f"Unsupported content coding: {coding}")
+
+    def __len__(self) -> int:
+        return len(self.raw) + len(_GZIP_HEADER) + 8
+
+def compressible(response) -> bool:
+    """Whether a finished response may be compressed after the fact"""
+    return (response.status_code == 200
+            and not response.direct_passthrough
+            and not response.is_streamed
+            and 'Content-Encoding' not in response.headers
+            and not (response.mimetype or '').startswith(SKIPPED_MIMETYPE_PREFIXES))
+
+def compress_response(response, accept_encoding: Optional[str], min_bytes: int = MIN_COMPRESS_BYTES,
+                      level: int = RESPONSE_COMPRESS_LEVEL):
+    """Compress a response in place when the client accepts it and the body is large enough"""
+    if not compressible(response):
+        return response
+    response.vary.add('Accept-Encoding')
+    coding = negotiate_encoding(accept_encoding)
+    if coding is None or (response.calculate_content_length() or 0) < min_bytes:
+        return response
+    response.set_data(CompressedBody(response.get_data(), level).encode(coding))
+    response.headers['Content-Encoding'] = coding
+    return response
@@ -0,0 +1,217 @@
+"""
+Configuration Schema for RL Futures Trading System
+Defines the default trading configuration and a compiled validator for it
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from security import SecurityError
+
+# Session times are "HH:MM", optionally suffixed with "+1" for the next day
+_SESSION_TIME_PATTERN = re.compile(r'^([01]\d|2[0-3]):[0-5]\d(\+1)?$')
+
+DEFAULT_CONFIG: Dict[str, Dict[str, Any]] = {
+    'trading_params': {
+        'initial_balance': 1000,
+        'daily_profit_target': 500,
+        'daily_max_loss_limit': 500,
+        'commissions': 2.5,
+        'margin_required_per_contract': 1000,
+        'slippage': 0.5,
+        'contract_value': 5
+    },
+    'ppo_settings': {
+        'learning_rate': 0.0003,
+        'n_steps': 2048,
+        'batch_size': 64,
+        'gamma': 0.99,
+        'gae_lambda': 0.95,
+        'clip_range': 0.2,
+        'ent_coef': 0.01,
+        'vf_coef': 0.5
+    },
+    'day_mastery': {
+        'min_episodes_to_run': 100,
+        'required_success_rate': 0.95,
+        'performance_plateau_episodes': 50,
+        'start_time': '17:00',
+        'end_time': '16:00+1'
+    },
+    'data_indicators': {
+        'observation_history_length': 1440,
+        'ema1_period': 13,
+        'ema2_period': 55,
+        'bollinger_bands_period': 20,
+        'atr_period': 14,
+        'macd_period': 26
+    }
+}
+
+class ConfigValidationError(SecurityError):
+    """Raised when a configuration payload fails schema validation"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__(f"Invalid configuration: {len(errors)} error(s)")
+        self.errors = errors
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """Type and range constraints for a single configuration field"""
+    kind: type
+    min_val: Optional[float] = None
+    max_val: Optional[float] = None
+    min_exclusive: bool = False
+    pattern: Optional[re.Pattern] = None
+
+CONFIG_SCHEMA: Dict[str, Dict[str, FieldSpec]] = {
+    'trading_params': {
+        'initial_balance': FieldSpec(float, 0, 1e9, min_exclusive=True),
+        'daily_profit_target': FieldSpec(float, 0, 1e9, min_exclusive=True),
+        'daily_max_loss_limit': FieldSpec(float, 0, 1e9, min_exclusive=True),
+        'commissions': FieldSpec(float, 0, 1e4),
+        'margin_required_per_contract': FieldSpec(float, 0, 1e9, min_exclusive=True),
+        'slippage': FieldSpec(float, 0, 1e4),
+        'contract_value': FieldSpec(float, 0, 1e6, min_exclusive=True),
+    },
+    'ppo_settings': {
+        'learning_rate': FieldSpec(float, 0, 1, min_exclusive=True),
+        'n_steps': FieldSpec(int, 1, 1_000_000),
+        'batch_size': FieldSpec(int, 1, 1_000_000),
+        'gamma': FieldSpec(float, 0, 1),
+        'gae_lambda': FieldSpec(float, 0, 1),
+        'clip_range': FieldSpec(float, 0, 1, min_exclusive=True),
+        'ent_coef': FieldSpec(float, 0, 1),
+        'vf_coef': FieldSpec(float, 0, 10),
+    },
+    'day_mastery': {
+        'min_episodes_to_run': FieldSpec(int, 1, 1_000_000),
+        'required_success_rate': FieldSpec(float, 0, 1),
+        'performance_plateau_episodes': FieldSpec(int, 1, 1_000_000),
+        'start_time': FieldSpec(str, pattern=_SESSION_TIME_PATTERN),
+        'end_time': FieldSpec(str, pattern=_SESSION_TIME_PATTERN),
+    },
+    'data_indicators': {
+        'observation_history_length': FieldSpec(int, 1, 100_000),
+        'ema1_period': FieldSpec(int, 1, 10_000),
+        'ema2_period': FieldSpec(int, 1, 10_000),
+        'bollinger_bands_period': FieldSpec(int, 2, 10_000),
+        'atr_period': FieldSpec(int, 1, 10_000),
+        'macd_period': FieldSpec(int, 2, 10_000),
+    },
+}
+
+# A checker returns the coerced value and an error message (None when valid)
+Checker = Callable[[Any], Tuple[Any, Optional[str]]]
+
+def _compile_field(spec: FieldSpec) -> Checker:
+    """Build a checker function for a field spec"""
+    if spec.kind is str:
+        def check_str(value: Any) -> Tuple[Any, Optional[str]]:
+            if not isinstance(value, str):
+                return value, "must be a string"
+            if spec.pattern is not None and not spec.pattern.match(value):
+                return value, "has an invalid format"
+            return value, None
+        return check_str
+
+    low, high = spec.min_val, spec.max_val
+    integer = spec.kind is int
+
+    def check_number(value: Any) -> Tuple[Any, Optional[str]]:
+        # bool is a subclass of int but never a valid numeric setting
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return value, "must be a number"
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return value, "must be finite"
+            if integer:
+                if not value.is_integer():
+                    return value, "must be an integer"
+                value = int(value)
+        if low is not None:
+            if value < low or (spec.min_exclusive and value == low):
+                op = ">" if spec.min_exclusive else ">="
+                return value, f"must be {op} {low:g}"
+        if high is not None and value > high:
+            return value, f"must be <= {high:g}"
+        return value, None
+
+    return check_number
+
+class ConfigValidator:
+    """Validates configuration payloads against a schema compiled once"""
+
+    def __init__(self, schema: Dict[str, Dict[str, FieldSpec]]):
+        self._checkers = {
+            section: {name: _compile_field(spec) for name, spec in fields.items()}
+            for section, fields in schema.items()
+        }
+
+    def validate(self, payload: Any) -> Dict[str, Dict[str, Any]]:
+        """Validate a (possibly partial) configuration payload.
+
+        Every section and field is checked in a single pass and all
+        problems are reported together in a ConfigValidationError.
+        Returns the payload with integral values coerced to int.
+        """
+        if not isinstance(payload, dict):
+            raise ConfigValidationError(["configuration must be an object"])
+
+        errors = []
+        validated = {}
+
+        for section, fields in payload.items():
+            checkers = self._checkers.get(section)
+            if checkers is None:
+                errors.append(f"{section}: unknown section")
+                continue
+            if not isinstance(fields, dict):
+                errors.append(f"{section}: must be an object")
+                continue
+
+            validated_section = {}
+            for name, value in fields.items():
+                checker = checkers.get(name)
+                if checker is None:
+                    errors.append(f"{section}.{name}: unknown field")
+                    continue
+                value, error = checker(value)
+                if error:
+                    errors.append(f"{section}.{name}: {error}")
+                else:
+                    validated_section[name] = value
+            validated[section] = validated_section
+
+        errors.extend(self._check_relations(validated))
+
+        if errors:
+            raise ConfigValidationError(errors)
+
+        return validated
+
+    def _check_relations(self, validated: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Cross-field checks, applied against defaults for omitted fields"""
+        errors = []
+        ppo = {**DEFAULT_CONFIG['ppo_settings'], **validated.get('ppo_settings', {})}
+        indicators = {**DEFAULT_CONFIG['data_indicators'], **validated.get('data_indicators', {})}
+
+        if ppo['batch_size'] > ppo['n_steps']:
+            errors.append("ppo_settings.batch_size: must be <= n_steps")
+        if indicators['ema1_period'] >= indicators['ema2_period']:
+            errors.append("data_indicators.ema1_period: must be < ema2_period")
+
+        return errors
+
+# Global validator instance, compiled at import
+config_validator = ConfigValidator(CONFIG_SCHEMA)
+
+def validate_config(payload: Any) -> Dict[str, Dict[str, Any]]:
+    """Validate a configuration payload"""
+    return config_validator.validate(payload)
+
+def get_default_config() -> Dict[str, Dict[str, Any]]:
+    """Get the default configuration"""
+    return DEFAULT_CONFIG
@@ -0,0 +1,192 @@
+"""
+Data Preview for RL Futures Trading System
+Paginated row access and pixel-bounded downsampling over stored bar arrays
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from bar_data import BarData
+
+# Each pyramid level aggregates this many buckets of the level below
+PYRAMID_FACTOR = 4
+
+# Stop adding levels once a level has this few buckets
+PYRAMID_MIN_BUCKETS = 64
+
+PYRAMID_FIELDS = ('start', 'open', 'high', 'low', 'close')
+
+MAX_PAGE_ROWS = 5000
+MAX_SERIES_WIDTH = 10000
+
+Level = Dict[str, np.ndarray]
+
+def _json_floats(values: np.ndarray) -> List[Optional[float]]:
+    """Convert floats to a JSON-safe list (NaN becomes null)"""
+    values = np.asarray(values, dtype=np.float64)
+    if not np.isnan(values).any():
+        return values.tolist()
+    return np.where(np.isnan(values), None, values).tolist()
+
+def _json_times(timestamps: np.ndarray) -> List[str]:
+    return timestamps.astype('datetime64[s]').astype(str).tolist()
+
+def page_rows(bars: BarData, offset: int = 0, limit: int = 100, columnar: bool = False) -> Dict[str, Any]:
+    """Get a page of bars as JSON-ready columns.
+
+    With ``columnar`` the columns stay NumPy arrays and times are epoch
+    seconds, ready for the binary encoding.
+    """
+    total = len(bars)
+    offset = max(0, min(offset, total))
+    limit = max(0, min(limit, MAX_PAGE_ROWS))
+    window = slice(offset, min(offset + limit, total))
+
+    rows = {'time': bars.timestamp[window]}
+    for field in ('open', 'high', 'low', 'close', 'volume'):
+        rows[field] = getattr(bars, field)[window]
+    if not columnar:
+        rows = {'time': _json_times(rows['time']),
+                **{field: _json_floats(values) for field, values in rows.items() if field != 'time'}}
+
+    return {
+        'offset': offset,
+        'limit': limit,
+        'total': total,
+        'rows': rows,
+    }
+
+def _aggregate(level: Level, starts: np.ndarray) -> Level:
+    """Merge consecutive buckets of a level at the given start positions"""
+    # fmax/fmin skip NaN so a missing price does not blank a whole bucket
+    ends = np.append(starts[1:], len(level['close'])) - 1
+    return {
+        'start': level['start'][starts],
+        'open': level['open'][starts],
+        'high': np.fmax.reduceat(level['high'], starts),
+        'low': np.fmin.reduceat(level['low'], starts),
+        'close': level['close'][ends],
+    }
+
+def build_pyramid(bars: BarData) -> List[Level]:
+    """Precompute OHLC min/max levels, each PYRAMID_FACTOR times coarser.
+
+    Level ``k`` holds buckets of ``PYRAMID_FACTOR ** (k + 1)`` bars; the raw
+    bars act as level ``-1`` and are never copied.
+    """
+    current = {
+        'start': np.arange(len(bars), dtype=np.int64),
+        'open': np.asarray(bars.open),
+        'high': np.asarray(bars.high),
+        'low': np.asarray(bars.low),
+        'close': np.asarray(bars.close),
+    }
+    levels = []
+    while len(current['close']) > PYRAMID_MIN_BUCKETS:
+        starts = np.arange(0, len(current['close']), PYRAMID_FACTOR)
+        current = _aggregate(current, starts)
+        levels.append(current)
+    return levels
+
+def _select_level(bars: BarData, pyramid: List[Level], start: int, end: int, width: int) -> Level:
+    """Pick the coarsest level with at least ``width`` buckets in [start, end)"""
+    chosen = None
+    for depth, level in enumerate(pyramid):
+        bucket = PYRAMID_FACTOR ** (depth + 1)
+        first = start // bucket
+        last = -(-end // bucket)
+        if last - first < width:
+            break
+        chosen = {field: values[first:last] for field, values in level.items()}
+
+    if chosen is None:
+        chosen = {
+            'start': np.arange(start, end, dtype=np.int64),
+            'open': bars.open[start:end],
+            'high': bars.high[start:end],
+            'low': bars.low[start:end],
+            'close': bars.close[start:end],
+        }
+    return chosen
+
+def minmax_series(bars: BarData, pyramid: List[Level], width: int,
+                  start: int = 0, end: Optional[int] = None, columnar: bool = False) -> Dict[str, Any]:
+    """Downsample [start, end) to at most ``width`` OHLC buckets.
+
+    Work is proportional to the width: the chosen pyramid level has fewer
+    than ``PYRAMID_FACTOR * width`` buckets in range. Buckets at the range
+    edges may include a few bars just outside it.
+    """
+    end = len(bars) if end is None else min(end, len(bars))
+    start = max(0, min(start, end))
+    width = max(1, min(width, MAX_SERIES_WIDTH))
+    if end <= start:
+        return _series_response(bars, {field: np.empty(0) for field in PYRAMID_FIELDS}, 'minmax', columnar)
+
+    level = _select_level(bars, pyramid, start, end, width)
+    count = len(level['close'])
+    if count > width:
+        starts = np.unique(np.linspace(0, count, width, endpoint=False).astype(np.int64))
+        level = _aggregate(level, starts)
+
+    return _series_response(bars, level, 'minmax', columnar)
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets selection of ``threshold`` points"""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # First and last points are always kept; the rest are split into buckets
+    every = (n - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+
+    for bucket in range(threshold - 2):
+        lo = int(bucket * every) + 1
+        hi = int((bucket + 1) * every) + 1
+        next_hi = min(int((bucket + 2) * every) + 1, n)
+
+        # The third triangle vertex is the average of the next bucket
+        next_y = y[hi:next_hi]
+        avg_x = x[hi:next_hi].mean()
+        avg_y = np.nanmean(next_y) if not np.isnan(next_y).all() else y[previous]
+
+        area = np.abs(
+            (x[previous] - avg_x) * (y[lo:hi] - y[previous])
+            - (x[previous] - x[lo:hi]) * (avg_y - y[previous])
+        )
+        choice = lo if np.isnan(area).all() else lo + int(np.nanargmax(area))
+        selected[bucket + 1] = choice
+        previous = choice
+
+    return selected
+
+def lttb_series(bars: BarData, pyramid: List[Level], width: int,
+                start: int = 0, end: Optional[int] = None, columnar: bool = False) -> Dict[str, Any]:
+    """Downsample closes in [start, end) to ``width`` points with LTTB"""
+    end = len(bars) if end is None else min(end, len(bars))
+    start = max(0, min(start, end))
+    width = max(3, min(width, MAX_SERIES_WIDTH))
+    if end <= start:
+        return _series_response(bars, {'start': np.empty(0, dtype=np.int64), 'close': np.empty(0)}, 'lttb', columnar)
+
+    level = _select_level(bars, pyramid, start, end, width)
+    x = level['start'].astype(np.float64)
+    y = np.asarray(level['close'], dtype=np.float64)
+    chosen = lttb_indices(x, y, width)
+    return _series_response(bars, {'start': level['start'][chosen], 'close': y[chosen]}, 'lttb', columnar)
+
+def _series_response(bars: BarData, level: Level, method: str, columnar: bool = False) -> Dict[str, Any]:
+    starts = np.asarray(level['start'], dtype=np.int64)
+    fields = [field for field in ('open', 'high', 'low', 'close') if field in level]
+    if columnar:
+        series = {'index': starts, 'time': bars.timestamp[starts],
+                  **{field: np.asarray(level[field], dtype=np.float64) for field in fields}}
+    else:
+        series = {'index': starts.tolist(), 'time': _json_times(bars.timestamp[starts]),
+                  **{field: _json_floats(level[field]) for field in fields}}
+    return {'method': method, 'points': len(starts), 'series': series}
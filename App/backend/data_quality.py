@@ -0,0 +1,166 @@
+"""
+Data Quality Validation for RL Futures Trading System
+Vectorized OHLC consistency, timestamp and outlier checks with per-day reports
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from bar_data import BarData, DayIndex
+from indicators import atr as average_true_range
+
+# Checks that make a dataset unusable for training
+ERROR_CHECKS = (
+    'ohlc_inconsistent',
+    'missing_prices',
+    'non_positive_prices',
+    'non_monotonic_timestamps',
+    'duplicate_timestamps',
+)
+
+# Checks reported for information only
+WARNING_CHECKS = (
+    'gaps',
+    'outlier_jumps',
+)
+
+@dataclass(frozen=True)
+class QualityThresholds:
+    """Tunable limits for the data quality checks"""
+    expected_interval: int = 60
+    atr_period: int = 14
+    outlier_atr_multiple: float = 10.0
+    max_samples: int = 5
+
+def _forward_fill(values: np.ndarray) -> np.ndarray:
+    """Replace NaNs with the last valid value (leading NaNs take the first valid one)"""
+    valid = ~np.isnan(values)
+    if valid.all() or not valid.any():
+        return values
+    positions = np.where(valid, np.arange(len(values)), 0)
+    np.maximum.accumulate(positions, out=positions)
+    filled = values[positions]
+    filled[:np.argmax(valid)] = values[np.argmax(valid)]
+    return filled
+
+def _flag_checks(bars: BarData, day_starts: np.ndarray, thresholds: QualityThresholds,
+                 atr: Optional[np.ndarray]) -> Dict[str, Any]:
+    """Compute one boolean flag array per check plus missing-bar counts"""
+    n = len(bars)
+    o, h, l, c = bars.open, bars.high, bars.low, bars.close
+    flags = {}
+
+    with np.errstate(invalid='ignore'):
+        flags['missing_prices'] = np.isnan(o) | np.isnan(h) | np.isnan(l) | np.isnan(c)
+        # Comparisons against NaN are False, so missing prices are not double counted
+        flags['non_positive_prices'] = (o <= 0) | (h <= 0) | (l <= 0) | (c <= 0)
+        flags['ohlc_inconsistent'] = (h < l) | (o > h) | (o < l) | (c > h) | (c < l)
+
+    # Timestamp checks compare each bar with its predecessor
+    deltas = np.diff(bars.timestamp)
+    non_monotonic = np.zeros(n, dtype=bool)
+    duplicates = np.zeros(n, dtype=bool)
+    gaps = np.zeros(n, dtype=bool)
+    missing_bars = np.zeros(n, dtype=np.int64)
+    if n > 1:
+        non_monotonic[1:] = deltas < 0
+        duplicates[1:] = deltas == 0
+        # Session breaks are expected, so gaps are only counted within a day
+        gaps[1:] = (deltas > thresholds.expected_interval) & ~day_starts[1:]
+        missing_bars[1:] = np.where(gaps[1:], deltas // thresholds.expected_interval - 1, 0)
+    flags['non_monotonic_timestamps'] = non_monotonic
+    flags['duplicate_timestamps'] = duplicates
+    flags['gaps'] = gaps
+
+    # Outliers: close-to-close jumps larger than a multiple of the prior ATR.
+    # Missing prices carry the last known one forward; otherwise a single NaN
+    # would poison the smoothed ATR for every later bar and hide all jumps.
+    outliers = np.zeros(n, dtype=bool)
+    if n > 1:
+        if flags['missing_prices'].any():
+            h, l, c = _forward_fill(h), _forward_fill(l), _forward_fill(c)
+            atr = None
+        if atr is None:
+            atr = average_true_range(h, l, c, thresholds.atr_period)
+        with np.errstate(invalid='ignore'):
+            jumps = np.abs(np.diff(c))
+            prior_atr = atr[:-1]
+            outliers[1:] = (prior_atr > 0) & (jumps > thresholds.outlier_atr_multiple * prior_atr)
+    flags['outlier_jumps'] = outliers
+
+    return {'flags': flags, 'missing_bars': missing_bars}
+
+def validate_bars(bars: BarData, day_index: DayIndex,
+                  thresholds: QualityThresholds = QualityThresholds(),
+                  atr: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """Run every quality check over the whole bar arrays in one pass.
+
+    Returns overall counts, a few sample row numbers per failed check and a
+    compact summary per trading day. ``atr`` may be passed in to reuse a
+    cached indicator column.
+    """
+    n = len(bars)
+    checks = ERROR_CHECKS + WARNING_CHECKS
+    if n == 0:
+        return {
+            'valid': False,
+            'rows': 0,
+            'days': 0,
+            'summary': {**{check: 0 for check in checks}, 'missing_bars': 0},
+            'samples': {},
+            'per_day': [],
+        }
+
+    starts = day_index.offsets[:-1]
+    day_starts = np.zeros(n, dtype=bool)
+    day_starts[starts] = True
+
+    result = _flag_checks(bars, day_starts, thresholds, atr)
+    flags, missing_bars = result['flags'], result['missing_bars']
+
+    # Per-day counts via segmented sums over the day offsets
+    per_check_days = {
+        check: np.add.reduceat(flags[check].astype(np.int64), starts) for check in checks
+    }
+    missing_per_day = np.add.reduceat(missing_bars, starts)
+    bars_per_day = np.diff(day_index.offsets)
+
+    summary = {check: int(counts.sum()) for check, counts in per_check_days.items()}
+    summary['missing_bars'] = int(missing_per_day.sum())
+
+    # 1-based row numbers, matching the frontend validation messages
+    samples = {
+        check: (np.flatnonzero(flags[check])[:thresholds.max_samples] + 1).tolist()
+        for check in checks if summary[check]
+    }
+
+    first_ts = bars.timestamp[starts].astype('datetime64[s]')
+    last_ts = bars.timestamp[day_index.offsets[1:] - 1].astype('datetime64[s]')
+    labels = day_index.day_labels()
+    issue_matrix = np.stack([per_check_days[check] for check in checks], axis=1)
+
+    per_day: List[Dict[str, Any]] = []
+    for position in range(len(day_index)):
+        issues = {
+            check: int(count)
+            for check, count in zip(checks, issue_matrix[position]) if count
+        }
+        per_day.append({
+            'date': labels[position],
+            'bars': int(bars_per_day[position]),
+            'first': str(first_ts[position]),
+            'last': str(last_ts[position]),
+            'missing_bars': int(missing_per_day[position]),
+            'issues': issues,
+        })
+
+    return {
+        'valid': not any(summary[check] for check in ERROR_CHECKS),
+        'rows': n,
+        'days': len(day_index),
+        'summary': summary,
+        'samples': samples,
+        'per_day': per_day,
+    }
@@ -0,0 +1,440 @@
+"""
+Content-Addressed Dataset Cache for RL Futures Trading System
+Stores parsed bars, day indexes, preview pyramids and indicator columns by content hash
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import logging
+
+from bar_data import BAR_COLUMNS, BarData, DataFormatError, DayIndex, build_day_index
+from compressed_bars import CompressedBarReader, write_compressed
+from data_preview import PYRAMID_FIELDS, build_pyramid
+from resampling import parse_timeframe, resample
+from indicator_cache import DEFAULT_INDICATOR_MEMORY_BYTES, IndicatorCache
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+DEFAULT_CACHE_DIR = 'data/datasets'
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024 ** 3
+COMPRESSED_BARS_FILE = 'bars.rlfb'
+DEFAULT_DECOMPRESSED_MEMORY_BYTES = 256 * 1024 * 1024
+
+def _new_hasher():
+    return hashlib.blake2b(digest_size=20)
+
+def hash_stream(stream: BinaryIO, chunk_size: int = HASH_CHUNK_SIZE) -> Tuple[str, int]:
+    """Hash a binary stream incrementally; returns (hex digest, bytes read)"""
+    hasher = _new_hasher()
+    size = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        hasher.update(chunk)
+        size += len(chunk)
+    return hasher.hexdigest(), size
+
+def hash_text(text: str, chunk_size: int = HASH_CHUNK_SIZE) -> Tuple[str, int]:
+    """Hash text as UTF-8 without encoding it all at once"""
+    hasher = _new_hasher()
+    size = 0
+    for start in range(0, len(text), chunk_size):
+        chunk = text[start:start + chunk_size].encode('utf-8')
+        hasher.update(chunk)
+        size += len(chunk)
+    return hasher.hexdigest(), size
+
+def hash_rows(rows: List[Any]) -> Tuple[str, int]:
+    """Hash row objects using a canonical JSON encoding per row"""
+    hasher = _new_hasher()
+    size = 0
+    for row in rows:
+        chunk = json.dumps(row, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+        hasher.update(chunk)
+        hasher.update(b'\n')
+        size += len(chunk) + 1
+    return hasher.hexdigest(), size
+
+def _session_suffix(session_start: str) -> str:
+    """File-name-safe form of a session start time"""
+    return session_start.replace(':', '').replace('+', 'p')
+
+class DatasetCache:
+    """On-disk, content-addressed cache of parsed datasets.
+
+    Each dataset lives in ``<root>/<content hash>/`` as plain ``.npy`` files
+    that are memory-mapped on load. Whole datasets are evicted in
+    least-recently-used order once the directory exceeds ``max_bytes``.
+    Indicator columns are stored alongside the bars by ``self.indicators``.
+
+    With ``compression`` set to a codec name, new datasets store their bars
+    in the compressed block format instead, trading load time for disk space.
+    Decompressed datasets are kept in an in-process LRU bounded by
+    ``decompressed_memory_bytes``, so repeat reads decompress nothing;
+    single days are read through the block index.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+                 indicator_memory_bytes: int = DEFAULT_INDICATOR_MEMORY_BYTES,
+                 compression: Optional[str] = None,
+                 decompressed_memory_bytes: int = DEFAULT_DECOMPRESSED_MEMORY_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.decompressed_memory_bytes = decompressed_memory_bytes
+        self._decompressed: OrderedDict = OrderedDict()
+        self._decompressed_bytes = 0
+        self.indicators = IndicatorCache(self, indicator_memory_bytes)
+        self._entries: Optional[OrderedDict] = None
+        self._lock = threading.Lock()
+
+    def contains(self, dataset_id: str) -> bool:
+        """Check whether a dataset's bars are cached"""
+        return os.path.exists(os.path.join(self._dataset_dir(dataset_id), 'meta.json'))
+
+    def get_bars(self, dataset_id: str) -> Optional[BarData]:
+        """Load cached bars as read-only memory maps, or decompress them"""
+        if not self.contains(dataset_id):
+            return None
+        try:
+            compressed = self._compressed_reader(dataset_id)
+            if compressed is not None:
+                bars = self._get_decompressed(dataset_id, compressed)
+            else:
+                bars = BarData.from_columns({
+                    name: np.load(self.dataset_path(dataset_id, 'bars', f'{name}.npy'), mmap_mode='r')
+                    for name in BAR_COLUMNS
+                })
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cached dataset {dataset_id}: {e}")
+            self.remove(dataset_id)
+            return None
+        self._touch(dataset_id)
+        return bars
+
+    def get_day_bars(self, dataset_id: str, day_id: int, session_start: str = '17:00') -> Optional[BarData]:
+        """Load a single trading day without reading the rest of the dataset"""
+        if not self.contains(dataset_id):
+            return None
+        try:
+            compressed = self._compressed_reader(dataset_id)
+            if compressed is not None:
+                day = compressed.read_day(day_id, session_start)
+                self._touch(dataset_id)
+                return day
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cached dataset {dataset_id}: {e}")
+            self.remove(dataset_id)
+            return None
+
+        dataset = self.get_dataset(dataset_id, session_start)
+        if dataset is None:
+            return None
+        bars, day_index = dataset
+        position = np.searchsorted(day_index.day_ids, day_id)
+        if position == len(day_index) or day_index.day_ids[position] != day_id:
+            return BarData.empty()
+        window = day_index.day_slice(int(position))
+        return BarData.from_columns({name: values[window] for name, values in bars.columns().items()})
+
+    def _get_decompressed(self, dataset_id: str, reader: CompressedBarReader) -> BarData:
+        with self._lock:
+            bars = self._decompressed.get(dataset_id)
+            if bars is not None:
+                self._decompressed.move_to_end(dataset_id)
+                return bars
+
+        bars = reader.read_all()
+        # Shared between requests, like the memory-mapped bars
+        for values in bars.columns().values():
+            values.flags.writeable = False
+        with self._lock:
+            if dataset_id not in self._decompressed and bars.nbytes <= self.decompressed_memory_bytes:
+                self._decompressed[dataset_id] = bars
+                self._decompressed_bytes += bars.nbytes
+                while self._decompressed_bytes > self.decompressed_memory_bytes:
+                    _, evicted = self._decompressed.popitem(last=False)
+                    self._decompressed_bytes -= evicted.nbytes
+        return bars
+
+    def _forget_decompressed(self, dataset_id: str):
+        with self._lock:
+            bars = self._decompressed.pop(dataset_id, None)
+            if bars is not None:
+                self._decompressed_bytes -= bars.nbytes
+
+    def _compressed_reader(self, dataset_id: str) -> Optional[CompressedBarReader]:
+        path = self.dataset_path(dataset_id, COMPRESSED_BARS_FILE)
+        if not os.path.exists(path):
+            return None
+        return CompressedBarReader(path)
+
+    def put_bars(self, dataset_id: str, bars: BarData, metadata: Dict[str, Any] = None):
+        """Store parsed bars for a dataset"""
+        os.makedirs(self.root, exist_ok=True)
+        staging = os.path.join(self.root, f'.{dataset_id}.{uuid.uuid4().hex}.tmp')
+        os.makedirs(os.path.join(staging, 'bars'))
+        metadata = {'rows': len(bars), **(metadata or {})}
+        try:
+            if self.compression:
+                stored = write_compressed(os.path.join(staging, COMPRESSED_BARS_FILE), bars, self.compression)
+                metadata['compression'] = {
+                    'codec': stored['codec'],
+                    'raw_bytes': stored['raw_bytes'],
+                    'compressed_bytes': stored['compressed_bytes'],
+                }
+            else:
+                for name, column in bars.columns().items():
+                    np.save(os.path.join(staging, 'bars', f'{name}.npy'), np.ascontiguousarray(column))
+            with open(os.path.join(staging, 'meta.json'), 'w') as f:
+                json.dump(metadata, f)
+            os.rename(staging, self._dataset_dir(dataset_id))
+        except OSError:
+            # Another request stored the same content first
+            shutil.rmtree(staging, ignore_errors=True)
+            if not self.contains(dataset_id):
+                raise
+        self.refresh(dataset_id)
+
+    def get_metadata(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        """Get the metadata stored alongside a dataset"""
+        try:
+            with open(self.dataset_path(dataset_id, 'meta.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get_day_index(self, dataset_id: str, session_start: str) -> Optional[DayIndex]:
+        """Load a cached day index for a session start time"""
+        suffix = _session_suffix(session_start)
+        try:
+            day_ids = np.load(self.dataset_path(dataset_id, f'day_ids_{suffix}.npy'))
+            offsets = np.load(self.dataset_path(dataset_id, f'day_offsets_{suffix}.npy'))
+        except (OSError, ValueError):
+            return None
+        self._touch(dataset_id)
+        return DayIndex(day_ids, offsets)
+
+    def put_day_index(self, dataset_id: str, session_start: str, day_index: DayIndex):
+        """Store a day index for a session start time"""
+        suffix = _session_suffix(session_start)
+        self._save_array(dataset_id, f'day_offsets_{suffix}.npy', day_index.offsets)
+        self._save_array(dataset_id, f'day_ids_{suffix}.npy', day_index.day_ids)
+        self.refresh(dataset_id)
+
+    def ensure_day_index(self, dataset_id: str, bars: BarData, session_start: str) -> DayIndex:
+        """Load a day index, building and storing it on first use"""
+        day_index = self.get_day_index(dataset_id, session_start)
+        if day_index is None:
+            day_index = build_day_index(bars.timestamp, session_start)
+            self.put_day_index(dataset_id, session_start, day_index)
+        return day_index
+
+    def get_pyramid(self, dataset_id: str) -> Optional[List[Dict[str, np.ndarray]]]:
+        """Load the cached preview pyramid as memory maps"""
+        try:
+            with open(self.dataset_path(dataset_id, 'pyramid', 'levels.json')) as f:
+                depth = json.load(f)['levels']
+            pyramid = [
+                {
+                    field: np.load(self.dataset_path(dataset_id, 'pyramid', f'level{level}_{field}.npy'),
+                                   mmap_mode='r')
+                    for field in PYRAMID_FIELDS
+                }
+                for level in range(depth)
+            ]
+        except (OSError, ValueError, KeyError):
+            return None
+        self._touch(dataset_id)
+        return pyramid
+
+    def put_pyramid(self, dataset_id: str, pyramid: List[Dict[str, np.ndarray]]):
+        """Store a preview pyramid; the level count is written last"""
+        os.makedirs(self.dataset_path(dataset_id, 'pyramid'), exist_ok=True)
+        for level, arrays in enumerate(pyramid):
+            for field in PYRAMID_FIELDS:
+                self._save_array(dataset_id, os.path.join('pyramid', f'level{level}_{field}.npy'), arrays[field])
+        with open(self.dataset_path(dataset_id, 'pyramid', 'levels.json'), 'w') as f:
+            json.dump({'levels': len(pyramid)}, f)
+        self.refresh(dataset_id)
+
+    def ensure_pyramid(self, dataset_id: str, bars: BarData) -> List[Dict[str, np.ndarray]]:
+        """Load the preview pyramid, building and storing it on first use"""
+        pyramid = self.get_pyramid(dataset_id)
+        if pyramid is None:
+            pyramid = build_pyramid(bars)
+            self.put_pyramid(dataset_id, pyramid)
+        return pyramid
+
+    def get_timeframe(self, dataset_id: str, timeframe: str, session_start: str) -> Optional[BarData]:
+        """Load cached bars resampled to a timeframe"""
+        subdir = os.path.join('timeframes', f'{timeframe}_{_session_suffix(session_start)}')
+        try:
+            columns = {
+                name: np.load(self.dataset_path(dataset_id, subdir, f'{name}.npy'), mmap_mode='r')
+                for name in BAR_COLUMNS
+            }
+        except (OSError, ValueError):
+            return None
+        self._touch(dataset_id)
+        return BarData.from_columns(columns)
+
+    def ensure_timeframe(self, dataset_id: str, bars: BarData, timeframe: str,
+                         session_start: str = '17:00') -> BarData:
+        """Load bars resampled to a timeframe, resampling and storing on first use"""
+        # Validates the timeframe before it becomes part of a path
+        interval = parse_timeframe(timeframe)
+        resampled = self.get_timeframe(dataset_id, timeframe, session_start)
+        if resampled is None:
+            resampled = resample(bars, interval, session_start)
+            subdir = os.path.join('timeframes', f'{timeframe}_{_session_suffix(session_start)}')
+            os.makedirs(self.dataset_path(dataset_id, subdir), exist_ok=True)
+            # The timestamp column is written last and acts as the completion marker
+            for name in reversed(BAR_COLUMNS):
+                self._save_array(dataset_id, os.path.join(subdir, f'{name}.npy'), getattr(resampled, name))
+            self.refresh(dataset_id)
+        return resampled
+
+    def get_dataset(self, dataset_id: str, session_start: str = '17:00') -> Optional[Tuple[BarData, DayIndex]]:
+        """Load cached bars together with their day index"""
+        bars = self.get_bars(dataset_id)
+        if bars is None:
+            return None
+        return bars, self.ensure_day_index(dataset_id, bars, session_start)
+
+    def remove(self, dataset_id: str):
+        """Remove a dataset from the cache"""
+        shutil.rmtree(self._dataset_dir(dataset_id), ignore_errors=True)
+        self.indicators.invalidate(dataset_id)
+        self._forget_decompressed(dataset_id)
+        with self._lock:
+            entries = self._load_entries()
+            entries.pop(dataset_id, None)
+
+    def total_bytes(self) -> int:
+        """Get the total size of cached datasets"""
+        with self._lock:
+            return sum(self._load_entries().values())
+
+    def _dataset_dir(self, dataset_id: str) -> str:
+        return os.path.join(self.root, dataset_id)
+
+    def dataset_path(self, dataset_id: str, *parts: str) -> str:
+        """Get a path inside a dataset's cache directory"""
+        return os.path.join(self._dataset_dir(dataset_id), *parts)
+
+    def _save_array(self, dataset_id: str, relative_path: str, array: np.ndarray):
+        """Atomically write an array file into a dataset directory"""
+        final_path = self.dataset_path(dataset_id, relative_path)
+        tmp_path = f'{final_path}.{uuid.uuid4().hex}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(array))
+        os.replace(tmp_path, final_path)
+
+    def _directory_size(self, path: str) -> int:
+        total = 0
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                try:
+                    total += os.path.getsize(os.path.join(dirpath, filename))
+                except OSError:
+                    pass
+        return total
+
+    def _load_entries(self) -> OrderedDict:
+        """Build the LRU index from disk on first use (caller holds the lock)"""
+        if self._entries is None:
+            self._entries = OrderedDict()
+            if os.path.isdir(self.root):
+                found = []
+                for name in os.listdir(self.root):
+                    path = os.path.join(self.root, name)
+                    if name.startswith('.') or not os.path.isdir(path):
+                        continue
+                    found.append((os.path.getmtime(path), name, self._directory_size(path)))
+                for _, name, size in sorted(found):
+                    self._entries[name] = size
+        return self._entries
+
+    def _touch(self, dataset_id: str):
+        """Mark a dataset as recently used"""
+        with self._lock:
+            entries = self._load_entries()
+            if dataset_id in entries:
+                entries.move_to_end(dataset_id)
+        try:
+            os.utime(self._dataset_dir(dataset_id))
+        except OSError:
+            pass
+
+    def refresh(self, dataset_id: str):
+        """Refresh a dataset's size and evict old datasets over budget"""
+        size = self._directory_size(self._dataset_dir(dataset_id))
+        with self._lock:
+            entries = self._load_entries()
+            entries[dataset_id] = size
+            entries.move_to_end(dataset_id)
+            total = sum(entries.values())
+            evicted = []
+            while total > self.max_bytes and len(entries) > 1:
+                oldest, oldest_size = entries.popitem(last=False)
+                total -= oldest_size
+                evicted.append(oldest)
+
+        for oldest in evicted:
+            self.indicators.invalidate(oldest)
+            self._forget_decompressed(oldest)
+            shutil.rmtree(self._dataset_dir(oldest), ignore_errors=True)
+            logger.info(f"Evicted cached dataset {oldest}")
+
+    def ingest(self, dataset_id: str, parse: Callable[[], BarData],
+               indicator_config: Dict[str, Any], session_start: str = '17:00') -> Tuple[Dict[str, Any], bool]:
+        """Return a dataset summary, parsing and computing only what is not cached.
+
+        ``parse`` is only called when the content hash has not been seen.
+        Returns the summary and whether the bars came from the cache.
+        """
+        bars = self.get_bars(dataset_id)
+        cached = bars is not None
+        if bars is None:
+            bars = parse()
+            if len(bars) == 0:
+                raise DataFormatError("File contains no data")
+            self.put_bars(dataset_id, bars)
+
+        day_index = self.ensure_day_index(dataset_id, bars, session_start)
+        self.ensure_pyramid(dataset_id, bars)
+        indicators = self.indicators.get_columns(dataset_id, bars, indicator_config)
+
+        summary = {
+            'dataset_id': dataset_id,
+            'rows': len(bars),
+            'days': len(day_index),
+            'first_timestamp': str(np.datetime64(int(bars.timestamp[0]), 's')),
+            'last_timestamp': str(np.datetime64(int(bars.timestamp[-1]), 's')),
+            'indicators': list(indicators),
+        }
+        return summary, cached
+
+# Global dataset cache instance
+dataset_cache = DatasetCache(
+    os.environ.get('DATASET_CACHE_DIR', DEFAULT_CACHE_DIR),
+    int(os.environ.get('DATASET_CACHE_MAX_BYTES', DEFAULT_CACHE_MAX_BYTES)),
+    int(os.environ.get('INDICATOR_CACHE_MAX_BYTES', DEFAULT_INDICATOR_MEMORY_BYTES)),
+    os.environ.get('DATASET_CACHE_COMPRESSION') or None,
+    int(os.environ.get('DECOMPRESSED_CACHE_MAX_BYTES', DEFAULT_DECOMPRESSED_MEMORY_BYTES))
+)
+
+def get_dataset_cache() -> DatasetCache:
+    """Get the global dataset cache"""
+    return dataset_cache
@@ -0,0 +1,182 @@
+"""
+Policy Observation Features for RL Futures Trading System
+Vectorized feature matrices for training and an incremental indicator state for live bars
+"""
+
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+
+from bar_data import BarData
+from indicators import atr, bollinger_bands, ema, macd
+
+FEATURE_NAMES = (
+    'close_vs_ema1',
+    'close_vs_ema2',
+    'ema1_vs_ema2',
+    'bollinger_position',
+    'macd_line',
+    'macd_histogram',
+    'atr_percent',
+    'return_percent',
+)
+OBS_DIM = len(FEATURE_NAMES)
+
+MACD_SIGNAL_PERIOD = 9
+
+def _safe_ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """numerator / denominator, 0 where the denominator is not positive or NaN"""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    valid = denominator > 0
+    return np.where(valid, numerator / np.where(valid, denominator, 1.0), 0.0)
+
+def _features(close, prev_close, ema1, ema2, atr_value, bb_middle, bb_std, macd_line, macd_signal) -> np.ndarray:
+    """Feature formulas over whole columns (see ``_scalar_features`` for one bar)"""
+    columns = [
+        _safe_ratio(close - ema1, atr_value),
+        _safe_ratio(close - ema2, atr_value),
+        _safe_ratio(ema1 - ema2, atr_value),
+        _safe_ratio(close - bb_middle, bb_std),
+        _safe_ratio(macd_line, atr_value),
+        _safe_ratio(macd_line - macd_signal, atr_value),
+        _safe_ratio(atr_value * 100.0, close),
+        _safe_ratio((close - prev_close) * 100.0, prev_close),
+    ]
+    return np.nan_to_num(np.stack(columns, axis=-1), nan=0.0, posinf=0.0, neginf=0.0)
+
+def _scalar_ratio(numerator: float, denominator: float) -> float:
+    if not denominator > 0:
+        return 0.0
+    value = numerator / denominator
+    return value if math.isfinite(value) else 0.0
+
+def _scalar_features(close, prev_close, ema1, ema2, atr_value, bb_middle, bb_std,
+                     macd_line, macd_signal) -> List[float]:
+    """Same formulas as ``_features`` in plain floats; much cheaper for a single bar"""
+    return [
+        _scalar_ratio(close - ema1, atr_value),
+        _scalar_ratio(close - ema2, atr_value),
+        _scalar_ratio(ema1 - ema2, atr_value),
+        _scalar_ratio(close - bb_middle, bb_std),
+        _scalar_ratio(macd_line, atr_value),
+        _scalar_ratio(macd_line - macd_signal, atr_value),
+        _scalar_ratio(atr_value * 100.0, close),
+        _scalar_ratio((close - prev_close) * 100.0, prev_close),
+    ]
+
+def feature_matrix(bars: BarData, indicator_config: Dict[str, Any]) -> np.ndarray:
+    """Observation features for every bar as a (bars x OBS_DIM) float32 matrix"""
+    close = np.asarray(bars.close, dtype=np.float64)
+    if len(close) == 0:
+        return np.empty((0, OBS_DIM), dtype=np.float32)
+    prev_close = np.concatenate(([close[0]], close[:-1]))
+    bands = bollinger_bands(close, indicator_config['bollinger_bands_period'], num_std=1.0)
+    macd_parts = macd(close, indicator_config['macd_period'], MACD_SIGNAL_PERIOD)
+
+    return _features(
+        close, prev_close,
+        ema(close, indicator_config['ema1_period']),
+        ema(close, indicator_config['ema2_period']),
+        atr(bars.high, bars.low, close, indicator_config['atr_period']),
+        bands['middle'], bands['upper'] - bands['middle'],
+        macd_parts['line'], macd_parts['signal'],
+    ).astype(np.float32)
+
+@dataclass
+class IndicatorState:
+    """Indicator values after the latest bar, updated one bar at a time.
+
+    Produces the same features as ``feature_matrix`` would for the last
+    bar of the series, and round-trips through JSON so clients can hold it
+    between requests.
+    """
+    bars: int = 0
+    prev_close: float = 0.0
+    ema1: float = 0.0
+    ema2: float = 0.0
+    atr: float = 0.0
+    macd_fast: float = 0.0
+    macd_slow: float = 0.0
+    macd_signal: float = 0.0
+    window: Deque[float] = field(default_factory=deque)
+
+    def update(self, high: float, low: float, close: float, indicator_config: Dict[str, Any]) -> List[float]:
+        """Fold in one bar and return its feature vector"""
+        high, low, close = float(high), float(low), float(close)
+        first = self.bars == 0
+        prev_close = close if first else self.prev_close
+        true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+        def step(previous: float, value: float, alpha: float) -> float:
+            return value if first else previous + alpha * (value - previous)
+
+        self.ema1 = step(self.ema1, close, 2.0 / (indicator_config['ema1_period'] + 1))
+        self.ema2 = step(self.ema2, close, 2.0 / (indicator_config['ema2_period'] + 1))
+        self.atr = step(self.atr, true_range, 1.0 / indicator_config['atr_period'])
+
+        slow_period = indicator_config['macd_period']
+        fast_period = max(1, slow_period * 12 // 26)
+        self.macd_fast = step(self.macd_fast, close, 2.0 / (fast_period + 1))
+        self.macd_slow = step(self.macd_slow, close, 2.0 / (slow_period + 1))
+        macd_line = self.macd_fast - self.macd_slow
+        self.macd_signal = step(self.macd_signal, macd_line, 2.0 / (MACD_SIGNAL_PERIOD + 1))
+
+        period = indicator_config['bollinger_bands_period']
+        self.window.append(close)
+        while len(self.window) > period:
+            self.window.popleft()
+        if len(self.window) == period:
+            bb_middle = math.fsum(self.window) / period
+            bb_std = math.sqrt(max(math.fsum((x - bb_middle) ** 2 for x in self.window) / period, 0.0))
+        else:
+            bb_middle, bb_std = math.nan, math.nan
+
+        self.bars += 1
+        self.prev_close = close
+        return _scalar_features(close, prev_close, self.ema1, self.ema2, self.atr,
+                                bb_middle, bb_std, macd_line, self.macd_signal)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'bars': self.bars,
+            'prev_close': self.prev_close,
+            'ema1': self.ema1,
+            'ema2': self.ema2,
+            'atr': self.atr,
+            'macd_fast': self.macd_fast,
+            'macd_slow': self.macd_slow,
+            'macd_signal': self.macd_signal,
+            'window': list(self.window),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]], max_window: int = 10_000) -> 'IndicatorState':
+        """Rebuild a state sent back by a client; raises ValueError if malformed"""
+        if not data:
+            return cls()
+        if not isinstance(data, dict):
+            raise ValueError("state must be an object")
+        try:
+            window = data.get('window', [])
+            if not isinstance(window, list) or len(window) > max_window:
+                raise ValueError("state.window must be a list of prices")
+            state = cls(
+                bars=int(data['bars']),
+                prev_close=float(data['prev_close']),
+                ema1=float(data['ema1']),
+                ema2=float(data['ema2']),
+                atr=float(data['atr']),
+                macd_fast=float(data['macd_fast']),
+                macd_slow=float(data['macd_slow']),
+                macd_signal=float(data['macd_signal']),
+                window=deque(float(x) for x in window),
+            )
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid indicator state: {e}")
+        if state.bars < 0:
+            raise ValueError("state.bars must be >= 0")
+        return state
@@ -0,0 +1,63 @@
+"""
+Gunicorn Serving Profiles for RL Futures Trading System
+Selects sync or threaded workers via SERVING_MODE; individual settings can be overridden by env vars
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+PROFILES = {
+    # One request per process: a slow call (large upload) occupies a whole
+    # worker until it finishes, so the training stream is refused.
+    'sync': {
+        'worker_class': 'sync',
+        'workers': 4,
+        'threads': 1,
+    },
+    # Each worker serves many connections on a thread pool. Slow I/O only
+    # holds one thread, and NumPy releases the GIL for the heavy work.
+    'gthread': {
+        'worker_class': 'gthread',
+        'workers': min(4, multiprocessing.cpu_count()),
+        'threads': 16,
+    },
+}
+
+serving_mode = os.environ.get('SERVING_MODE', 'gthread')
+if serving_mode not in PROFILES:
+    raise ValueError(f"Unknown SERVING_MODE {serving_mode!r}; expected one of {sorted(PROFILES)}")
+profile = PROFILES[serving_mode]
+
+wsgi_app = 'app:create_app()'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = profile['worker_class']
+workers = int(os.environ.get('GUNICORN_WORKERS', profile['workers']))
+threads = int(os.environ.get('GUNICORN_THREADS', profile['threads']))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Build the app and import the NumPy-backed modules once in the master;
+# workers fork with them already loaded. Log files and background threads
+# are opened per worker on its first request.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+os.environ.setdefault('PRELOAD_MODULES', 'true' if preload_app else 'false')
+os.environ.setdefault('STREAMING_RESPONSES', 'false' if worker_class == 'sync' else 'true')
+
+# Write log files from a background thread in every worker
+os.environ.setdefault('LOG_QUEUE_FILE_WRITES', 'true')
+
+# Each worker writes its metrics to its own files here and /metrics merges
+# them, so a scrape sees every worker. An exited worker's counters are folded
+# into one shared file, so a scrape reads two files per live worker plus that
+# one, holding the series written within METRICS_SERIES_TTL.
+os.environ.setdefault('METRICS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'rl_futures_metrics'))
+
+def on_starting(server):
+    from metrics_multiprocess import clear_directory
+    clear_directory(os.environ['METRICS_MULTIPROC_DIR'])
+
+def child_exit(server, worker):
+    from metrics import metrics_collector
+    from metrics_multiprocess import mark_process_dead
+    mark_process_dead(worker.pid, os.environ['METRICS_MULTIPROC_DIR'], max_age=metrics_collector.series_ttl or None)
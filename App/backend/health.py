@@ -4,19 +4,133 @@ Provides detailed health checks, metrics, and system status information
 """
 
 import os
-import psutil
 import time
 import threading
 from datetime import datetime, timedelta
 from typing import Dict, Any, List
 import logging
 
+from latency_sketch import get_latency_summary
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_SAMPLE_INTERVAL = 5.0
+FIRST_CPU_INTERVAL = 0.1
+FIRST_SAMPLE_TIMEOUT = 1.0
+
+class SystemSampler:
+    """Samples psutil probes on a background thread.
+
+    ``cpu_percent(interval=1)``, ``open_files`` and ``net_connections`` take
+    from a second to tens of milliseconds; doing them per request ties up a
+    worker (or, under gevent, the whole event loop). Health endpoints read
+    the latest snapshot instead. The thread starts on first use in each
+    process, so it also survives gunicorn forking workers after import.
+    """
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._process = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Latest probe results; only the first call in a process waits for a sample"""
+        self._ensure_running()
+        self._ready.wait(FIRST_SAMPLE_TIMEOUT)
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.sample()
+        return snapshot
+
+    def sample(self, cpu_interval: float = None) -> Dict[str, Any]:
+        """Run every probe once and store the result"""
+        # Imported on first sample so importing this module stays cheap
+        import psutil
+        snapshot = {
+            'cpu_percent': psutil.cpu_percent(interval=cpu_interval),
+            'memory': psutil.virtual_memory(),
+            'disk': psutil.disk_usage('/'),
+            'process': self._probe_process(),
+            'network': self._probe_network(),
+            'sampled_at': time.time(),
+        }
+        with self._lock:
+            self._snapshot = snapshot
+        self._ready.set()
+        return snapshot
+
+    def stop(self):
+        self._stop.set()
+
+    def _ensure_running(self):
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._snapshot = None
+            self._ready.clear()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='health-sampler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        # CPU usage is measured between calls, so the first sample needs a short window
+        cpu_interval = FIRST_CPU_INTERVAL
+        while not self._stop.is_set():
+            try:
+                self.sample(cpu_interval)
+                cpu_interval = None
+            except Exception as e:
+                logger.error(f"Health sampling failed: {e}")
+            self._stop.wait(self.interval)
+
+    def _probe_process(self) -> Dict[str, Any]:
+        import psutil
+        try:
+            # Keep one Process per pid: its cpu_percent() is relative to the previous call
+            if self._process is None or self._process.pid != os.getpid():
+                self._process = psutil.Process()
+            process = self._process
+            return {
+                'pid': process.pid,
+                'memory_mb': round(process.memory_info().rss / (1024**2), 2),
+                'cpu_percent': process.cpu_percent(),
+                'num_threads': process.num_threads(),
+                'open_files': len(process.open_files()),
+                'connections': len(process.connections()),
+            }
+        except Exception as e:
+            logger.error(f"Failed to get process info: {e}")
+            return {'error': str(e)}
+
+    def _probe_network(self) -> Dict[str, Any]:
+        import psutil
+        try:
+            network_stats = psutil.net_io_counters()
+            return {
+                'bytes_sent': network_stats.bytes_sent,
+                'bytes_recv': network_stats.bytes_recv,
+                'packets_sent': network_stats.packets_sent,
+                'packets_recv': network_stats.packets_recv,
+                'connections': len(psutil.net_connections()),
+            }
+        except Exception as e:
+            logger.error(f"Failed to get network info: {e}")
+            return {'error': str(e)}
+
 class HealthMonitor:
     """Comprehensive health monitoring system"""
     
-    def __init__(self):
+    def __init__(self, sampler: SystemSampler = None):
+        self.sampler = sampler or SystemSampler()
         self.start_time = time.time()
         self.health_history = []
         self.max_history_size = 100
@@ -32,14 +146,16 @@ class HealthMonitor:
     def get_system_health(self) -> Dict[str, Any]:
         """Get comprehensive system health status"""
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
+            snapshot = self.sampler.snapshot()
+            cpu_percent = snapshot['cpu_percent']
+            memory = snapshot['memory']
+            disk = snapshot['disk']
             
             health_status = {
                 'status': 'healthy',
                 'timestamp': datetime.utcnow().isoformat(),
                 'uptime': self._get_uptime(),
+                'sample_age_seconds': round(time.time() - snapshot['sampled_at'], 3),
                 'system': {
                     'cpu_percent': cpu_percent,
                     'memory_percent': memory.percent,
@@ -93,6 +209,7 @@ class HealthMonitor:
             'history': self._get_health_summary(),
             'processes': self._get_process_info(),
             'network': self._get_network_info(),
+            'latency': get_latency_summary(),
         }
         
         return detailed_health
@@ -178,38 +295,17 @@ class HealthMonitor:
         }
     
     def _get_process_info(self) -> Dict[str, Any]:
-        """Get current process information"""
-        try:
-            process = psutil.Process()
-            return {
-                'pid': process.pid,
-                'memory_mb': round(process.memory_info().rss / (1024**2), 2),
-                'cpu_percent': process.cpu_percent(),
-                'num_threads': process.num_threads(),
-                'open_files': len(process.open_files()),
-                'connections': len(process.connections()),
-            }
-        except Exception as e:
-            logger.error(f"Failed to get process info: {e}")
-            return {'error': str(e)}
+        """Get current process information (from the latest sample)"""
+        return self.sampler.snapshot()['process']
     
     def _get_network_info(self) -> Dict[str, Any]:
-        """Get network interface information"""
-        try:
-            network_stats = psutil.net_io_counters()
-            return {
-                'bytes_sent': network_stats.bytes_sent,
-                'bytes_recv': network_stats.bytes_recv,
-                'packets_sent': network_stats.packets_sent,
-                'packets_recv': network_stats.packets_recv,
-                'connections': len(psutil.net_connections()),
-            }
-        except Exception as e:
-            logger.error(f"Failed to get network info: {e}")
-            return {'error': str(e)}
+        """Get network interface information (from the latest sample)"""
+        return self.sampler.snapshot()['network']
 
 # Global health monitor instance
-health_monitor = HealthMonitor()
+health_monitor = HealthMonitor(
+    SystemSampler(float(os.environ.get('HEALTH_SAMPLE_INTERVAL', DEFAULT_SAMPLE_INTERVAL)))
+)
 
 def get_health_status() -> Dict[str, Any]:
     """Get basic health status"""
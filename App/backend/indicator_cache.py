@@ -0,0 +1,154 @@
+"""
+Indicator Column Cache for RL Futures Trading System
+Memoizes indicator columns per (dataset, indicator, params) on disk and in memory
+"""
+
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import logging
+
+from bar_data import BarData
+from indicators import compute_indicator_family, indicator_columns, indicator_family
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDICATOR_MEMORY_BYTES = 256 * 1024 * 1024
+
+ColumnKey = Tuple[str, str, str]
+
+def params_key(params: Dict[str, Any]) -> str:
+    """Stable file-name-safe key for indicator parameters"""
+    return '_'.join(f'{name}{params[name]}' for name in sorted(params))
+
+class IndicatorCache:
+    """Two-level cache of indicator columns.
+
+    Columns are stored once per (dataset id, indicator, params) as ``.npy``
+    files inside the dataset's cache directory. Recently used columns are
+    kept fully loaded in an in-process LRU bounded by ``max_bytes`` of
+    resident memory; hot columns are read-only because callers share them.
+    Configurations that share parameters share columns, so a
+    change to one period only computes the columns that depend on it.
+    """
+
+    def __init__(self, store, max_bytes: int = DEFAULT_INDICATOR_MEMORY_BYTES):
+        self.store = store
+        self.max_bytes = max_bytes
+        self._hot: OrderedDict = OrderedDict()
+        self._hot_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'columns_computed': 0, 'evictions': 0}
+
+    def get_column(self, dataset_id: str, bars: BarData, indicator: str,
+                   params: Dict[str, Any]) -> np.ndarray:
+        """Get one indicator column, computing it only if no cache level has it"""
+        key = (dataset_id, indicator, params_key(params))
+
+        column = self._get_hot(key)
+        if column is not None:
+            return column
+
+        column = self._load(key)
+        if column is not None:
+            with self._lock:
+                self.stats['disk_hits'] += 1
+            self._put_hot(key, column)
+            return column
+
+        # Compute the whole family once; siblings share intermediate work
+        family = indicator_family(indicator)
+        computed = compute_indicator_family(bars, family, params)
+        with self._lock:
+            self.stats['columns_computed'] += len(computed)
+        result = None
+        for name, values in computed.items():
+            sibling_key = (dataset_id, name, key[2])
+            values = self._save(sibling_key, values)
+            self._put_hot(sibling_key, values)
+            if name == indicator:
+                result = values
+
+        return result
+
+    def get_columns(self, dataset_id: str, bars: BarData,
+                    indicator_config: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Get every column of a data_indicators config keyed by column name"""
+        return {
+            name: self.get_column(dataset_id, bars, indicator, params)
+            for name, indicator, params in indicator_columns(indicator_config)
+        }
+
+    def get_matrix(self, dataset_id: str, bars: BarData,
+                   indicator_config: Dict[str, Any]) -> Tuple[List[str], np.ndarray]:
+        """Assemble a (bars x columns) matrix from cached columns"""
+        columns = self.get_columns(dataset_id, bars, indicator_config)
+        matrix = np.empty((len(bars), len(columns)), dtype=np.float64)
+        for position, values in enumerate(columns.values()):
+            matrix[:, position] = values
+        return list(columns), matrix
+
+    def invalidate(self, dataset_id: str):
+        """Drop a dataset's columns from memory"""
+        with self._lock:
+            for key in [key for key in self._hot if key[0] == dataset_id]:
+                self._hot_bytes -= self._hot.pop(key).nbytes
+
+    def memory_bytes(self) -> int:
+        """Get the bytes held in memory by the hot level"""
+        with self._lock:
+            return self._hot_bytes
+
+    def _column_path(self, key: ColumnKey) -> str:
+        dataset_id, indicator, params = key
+        return self.store.dataset_path(dataset_id, 'indicators', f'{indicator}__{params}.npy')
+
+    def _get_hot(self, key: ColumnKey) -> Optional[np.ndarray]:
+        with self._lock:
+            column = self._hot.get(key)
+            if column is not None:
+                self._hot.move_to_end(key)
+                self.stats['hits'] += 1
+            return column
+
+    def _put_hot(self, key: ColumnKey, column: np.ndarray):
+        with self._lock:
+            previous = self._hot.pop(key, None)
+            if previous is not None:
+                self._hot_bytes -= previous.nbytes
+            self._hot[key] = column
+            self._hot_bytes += column.nbytes
+            # Keep at least the newest column even if it alone exceeds the budget
+            while self._hot_bytes > self.max_bytes and len(self._hot) > 1:
+                _, evicted = self._hot.popitem(last=False)
+                self._hot_bytes -= evicted.nbytes
+                self.stats['evictions'] += 1
+
+    def _load(self, key: ColumnKey) -> Optional[np.ndarray]:
+        try:
+            column = np.load(self._column_path(key))
+        except (OSError, ValueError):
+            return None
+        column.flags.writeable = False
+        return column
+
+    def _save(self, key: ColumnKey, column: np.ndarray) -> np.ndarray:
+        """Persist a column and return it as a read-only in-memory array"""
+        column = np.ascontiguousarray(column, dtype=np.float64)
+        column.flags.writeable = False
+        path = self._column_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, column)
+            os.replace(tmp_path, path)
+            self.store.refresh(key[0])
+        except OSError as e:
+            # The dataset may have been evicted meanwhile; serve from memory
+            logger.warning(f"Failed to persist indicator column {key}: {e}")
+        return column
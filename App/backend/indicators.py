@@ -0,0 +1,153 @@
+"""
+Technical Indicators for RL Futures Trading System
+Vectorized indicator computations over bar column arrays
+"""
+
+import math
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from bar_data import BarData
+
+# Largest exponent used inside one EMA block; keeps the rescaled cumulative
+# sums well inside float64 precision
+_EMA_MAX_BLOCK_EXPONENT = 16.0
+
+def ema(values: np.ndarray, period: int = None, alpha: float = None) -> np.ndarray:
+    """Exponential moving average seeded with the first value.
+
+    The recurrence is evaluated in blocks: within a block every output is a
+    decay-weighted cumulative sum, so the work is a handful of NumPy calls per
+    block instead of a Python loop per bar.
+    """
+    if alpha is None:
+        alpha = 2.0 / (period + 1)
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    out = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return out
+
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = values
+        return out
+
+    log_decay = -math.log(decay)
+    block = max(1, min(n, int(_EMA_MAX_BLOCK_EXPONENT / log_decay)))
+    steps = np.arange(1, block + 1, dtype=np.float64)
+    decay_powers = decay ** steps
+    inverse_powers = decay ** -(steps - 1)
+
+    previous = values[0]
+    start = 0
+    while start < n:
+        stop = min(start + block, n)
+        size = stop - start
+        weighted = np.cumsum(values[start:stop] * inverse_powers[:size])
+        out[start:stop] = decay_powers[:size] * previous + alpha * weighted * decay_powers[:size] / decay
+        previous = out[stop - 1]
+        start = stop
+
+    return out
+
+def rolling_mean_std(values: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Rolling mean and population standard deviation; NaN until the window fills"""
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    if n < period:
+        return mean, std
+
+    # Center before accumulating to limit cancellation in the variance
+    centered = values - values[:period].mean()
+    csum = np.concatenate(([0.0], np.cumsum(centered)))
+    csq = np.concatenate(([0.0], np.cumsum(centered * centered)))
+    window_sum = csum[period:] - csum[:-period]
+    window_sq = csq[period:] - csq[:-period]
+    window_mean = window_sum / period
+    variance = np.maximum(window_sq / period - window_mean * window_mean, 0.0)
+
+    mean[period - 1:] = window_mean + values[:period].mean()
+    std[period - 1:] = np.sqrt(variance)
+    return mean, std
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range of every bar"""
+    prev_close = np.concatenate(([close[0]], close[:-1])) if len(close) else close
+    return np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """Average true range with Wilder smoothing"""
+    return ema(true_range(high, low, close), alpha=1.0 / period)
+
+def bollinger_bands(close: np.ndarray, period: int, num_std: float = 2.0) -> Dict[str, np.ndarray]:
+    """Bollinger middle, upper and lower bands"""
+    middle, std = rolling_mean_std(close, period)
+    return {
+        'middle': middle,
+        'upper': middle + num_std * std,
+        'lower': middle - num_std * std,
+    }
+
+def macd(close: np.ndarray, slow_period: int, signal_period: int = 9) -> Dict[str, np.ndarray]:
+    """MACD line, signal and histogram.
+
+    The fast period keeps the classic 12/26 ratio relative to ``slow_period``.
+    """
+    fast_period = max(1, slow_period * 12 // 26)
+    line = ema(close, fast_period) - ema(close, slow_period)
+    signal = ema(line, signal_period)
+    return {'line': line, 'signal': signal, 'histogram': line - signal}
+
+def indicator_columns(indicator_config: Dict[str, Any]) -> List[Tuple[str, str, Dict[str, int]]]:
+    """List (column name, indicator, params) for a data_indicators config"""
+    return [
+        (f"ema_{indicator_config['ema1_period']}", 'ema', {'period': indicator_config['ema1_period']}),
+        (f"ema_{indicator_config['ema2_period']}", 'ema', {'period': indicator_config['ema2_period']}),
+        (f"atr_{indicator_config['atr_period']}", 'atr', {'period': indicator_config['atr_period']}),
+        *[
+            (f"bb_{band}_{indicator_config['bollinger_bands_period']}", f'bb_{band}',
+             {'period': indicator_config['bollinger_bands_period']})
+            for band in ('middle', 'upper', 'lower')
+        ],
+        *[
+            (f"macd_{part}_{indicator_config['macd_period']}", f'macd_{part}',
+             {'period': indicator_config['macd_period']})
+            for part in ('line', 'signal', 'histogram')
+        ],
+    ]
+
+# Indicators computed together, keyed by family
+INDICATOR_FAMILIES = {
+    'ema': ('ema',),
+    'atr': ('atr',),
+    'bb': ('bb_middle', 'bb_upper', 'bb_lower'),
+    'macd': ('macd_line', 'macd_signal', 'macd_histogram'),
+}
+
+def indicator_family(indicator: str) -> str:
+    """Get the family an indicator column belongs to"""
+    family = indicator.split('_', 1)[0]
+    if family not in INDICATOR_FAMILIES or indicator not in INDICATOR_FAMILIES[family]:
+        raise ValueError(f"Unknown indicator: {indicator}")
+    return family
+
+def compute_indicator_family(bars: BarData, family: str, params: Dict[str, int]) -> Dict[str, np.ndarray]:
+    """Compute every column of an indicator family in one go"""
+    period = params['period']
+    if family == 'ema':
+        return {'ema': ema(bars.close, period)}
+    if family == 'atr':
+        return {'atr': atr(bars.high, bars.low, bars.close, period)}
+    if family == 'bb':
+        return {f'bb_{band}': values for band, values in bollinger_bands(bars.close, period).items()}
+    if family == 'macd':
+        return {f'macd_{part}': values for part, values in macd(bars.close, period).items()}
+    raise ValueError(f"Unknown indicator family: {family}")
+
+def compute_indicator(bars: BarData, indicator: str, params: Dict[str, int]) -> np.ndarray:
+    """Compute a single indicator column"""
+    return compute_indicator_family(bars, indicator_family(indicator), params)[indicator]
@@ -0,0 +1,226 @@
+"""
+Policy Inference Service for RL Futures Trading System
+Micro-batched forward passes for concurrent single-bar action requests
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import logging
+
+from checkpoint_store import Checkpoint, CheckpointStore, get_checkpoint_store, warm_start
+from config_schema import DEFAULT_CONFIG
+from features import OBS_DIM, IndicatorState
+from normalization import Normalizer
+from policy import MLPPolicy
+
+logger = logging.getLogger(__name__)
+
+ACTION_NAMES = ('short', 'flat', 'long')
+DEFAULT_BATCH_WINDOW_MS = 1.0
+DEFAULT_MAX_BATCH = 64
+
+BatchResult = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+class _PendingRequest:
+    __slots__ = ('obs', 'done', 'result')
+
+    def __init__(self, obs: np.ndarray):
+        self.obs = obs
+        self.done = threading.Event()
+        self.result = None
+
+class MicroBatcher:
+    """Collects concurrent requests into batches for a single worker thread.
+
+    The first request of a batch opens a window of ``window_ms``; everything
+    that arrives before it closes (up to ``max_batch``) is evaluated in one
+    call to ``run_batch``. Callers that ``announce`` themselves before
+    preparing their input let the window close early once nobody else is
+    on the way, so a lone request does not wait for the full window. The
+    lock only guards the pending list, so callers never wait on each
+    other's computation.
+    """
+
+    def __init__(self, run_batch: Callable[[np.ndarray], BatchResult], obs_dim: int,
+                 window_ms: float = DEFAULT_BATCH_WINDOW_MS, max_batch: int = DEFAULT_MAX_BATCH):
+        self.run_batch = run_batch
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.stats = {'requests': 0, 'batches': 0, 'max_batch_size': 0}
+        self._inputs = np.zeros((max_batch, obs_dim), dtype=np.float32)
+        self._pending: List[_PendingRequest] = []
+        self._announced = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name='inference-batcher', daemon=True)
+        self._worker.start()
+
+    def announce(self):
+        """Signal that a request is being prepared and will be submitted"""
+        with self._condition:
+            self._announced += 1
+
+    def withdraw(self):
+        """Cancel an announcement whose request will not be submitted"""
+        with self._condition:
+            self._announced = max(0, self._announced - 1)
+            self._condition.notify()
+
+    def submit(self, obs: np.ndarray, announced: bool = False,
+               timeout: float = 5.0) -> Tuple[int, np.ndarray, float]:
+        """Evaluate one observation; returns (action, probabilities, value)"""
+        request = _PendingRequest(obs)
+        with self._condition:
+            if announced:
+                self._announced = max(0, self._announced - 1)
+            if self._closed:
+                raise RuntimeError("Inference batcher is closed")
+            self._pending.append(request)
+            self._condition.notify()
+        if not request.done.wait(timeout):
+            raise TimeoutError("Inference request timed out")
+        if isinstance(request.result, Exception):
+            raise request.result
+        return request.result
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._worker.join(timeout=1.0)
+
+    def _next_batch(self) -> List[_PendingRequest]:
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            if not self._pending:
+                return []
+            deadline = time.perf_counter() + self.window
+            while len(self._pending) < self.max_batch and self._announced and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            size = len(batch)
+            inputs = self._inputs[:size]
+            for row, request in enumerate(batch):
+                inputs[row] = request.obs
+            try:
+                actions, probabilities, values = self.run_batch(inputs)
+                for row, request in enumerate(batch):
+                    request.result = (int(actions[row]), probabilities[row].copy(), float(values[row]))
+            except Exception as e:
+                logger.error(f"Inference batch failed: {str(e)}")
+                for request in batch:
+                    request.result = e
+            self.stats['requests'] += size
+            self.stats['batches'] += 1
+            self.stats['max_batch_size'] = max(self.stats['max_batch_size'], size)
+            for request in batch:
+                request.done.set()
+
+class InferenceService:
+    """Serves greedy policy actions for single bars of one or more instruments.
+
+    Indicator state travels with each request and response, so the service
+    itself is stateless apart from the loaded policy and normalization.
+    """
+
+    def __init__(self, policy: MLPPolicy, normalizer: Optional[Normalizer] = None,
+                 indicator_config: Dict[str, Any] = None, checkpoint_id: Optional[str] = None,
+                 window_ms: float = DEFAULT_BATCH_WINDOW_MS, max_batch: int = DEFAULT_MAX_BATCH):
+        if policy.obs_dim != OBS_DIM:
+            raise ValueError(f"Policy expects {policy.obs_dim} features, service provides {OBS_DIM}")
+        self.policy = policy
+        self.normalizer = normalizer
+        if normalizer is not None:
+            normalizer.training = False
+        self.indicator_config = {**DEFAULT_CONFIG['data_indicators'], **(indicator_config or {})}
+        self.checkpoint_id = checkpoint_id
+        self._normalized = np.zeros((max_batch, OBS_DIM), dtype=np.float32)
+        self.batcher = MicroBatcher(self._forward, OBS_DIM, window_ms, max_batch)
+
+    @classmethod
+    def from_checkpoint(cls, store: CheckpointStore, checkpoint_id: Optional[str] = None,
+                        **kwargs) -> 'InferenceService':
+        """Load a checkpoint (default: best, else latest) once for serving"""
+        checkpoint_id = checkpoint_id or store.best() or store.latest()
+        if checkpoint_id is None:
+            raise LookupError("No checkpoint available")
+        checkpoint = store.load(checkpoint_id)
+        normalizer = None
+        if any(name.startswith('normalization/') for name in checkpoint.arrays):
+            normalizer = Normalizer.from_state(checkpoint.arrays)
+        return cls(policy_from_checkpoint(checkpoint), normalizer,
+                   checkpoint.config.get('data_indicators'), checkpoint_id, **kwargs)
+
+    def _forward(self, inputs: np.ndarray) -> BatchResult:
+        if self.normalizer is not None:
+            inputs = self.normalizer.normalize_obs(inputs, out=self._normalized[:len(inputs)])
+        ws = self.policy.forward(inputs)
+        return ws.probs.argmax(axis=1), ws.probs, ws.values[:, 0]
+
+    def act(self, bar: Dict[str, float], state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Update the indicator state with a bar and choose an action"""
+        self.batcher.announce()
+        try:
+            indicator_state = IndicatorState.from_dict(state)
+            features = indicator_state.update(bar['high'], bar['low'], bar['close'], self.indicator_config)
+        except Exception:
+            self.batcher.withdraw()
+            raise
+        action, probabilities, value = self.batcher.submit(features, announced=True)
+        return {
+            'action': ACTION_NAMES[action] if action < len(ACTION_NAMES) else action,
+            'action_index': action,
+            'probabilities': probabilities.tolist(),
+            'value': value,
+            'state': indicator_state.to_dict(),
+            'checkpoint_id': self.checkpoint_id,
+        }
+
+    def close(self):
+        self.batcher.close()
+
+def policy_from_checkpoint(checkpoint: Checkpoint) -> MLPPolicy:
+    """Build a policy whose layer sizes are read from the checkpoint arrays"""
+    weights = checkpoint.group('policy')
+    hidden_sizes = []
+    while f'w{len(hidden_sizes)}' in weights:
+        hidden_sizes.append(weights[f'w{len(hidden_sizes)}'].shape[1])
+    if not hidden_sizes or 'w_pi' not in weights:
+        raise ValueError("Checkpoint does not contain policy weights")
+    policy = MLPPolicy(weights['w0'].shape[0], weights['w_pi'].shape[1], hidden_sizes)
+    warm_start(checkpoint, policy)
+    return policy
+
+_service: Optional[InferenceService] = None
+_service_lock = threading.Lock()
+
+def get_inference_service() -> InferenceService:
+    """Get the global inference service, loading the checkpoint on first use"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = InferenceService.from_checkpoint(
+                    get_checkpoint_store(),
+                    os.environ.get('INFERENCE_CHECKPOINT_ID') or None,
+                    window_ms=float(os.environ.get('INFERENCE_BATCH_WINDOW_MS', DEFAULT_BATCH_WINDOW_MS)),
+                    max_batch=int(os.environ.get('INFERENCE_MAX_BATCH', DEFAULT_MAX_BATCH))
+                )
+                logger.info(f"Inference service loaded checkpoint {_service.checkpoint_id}")
+    return _service
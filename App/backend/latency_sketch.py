@@ -0,0 +1,335 @@
+"""
+Latency Quantile Sketches for RL Futures Trading System
+Fixed-size, mergeable per-endpoint latency sketches with sliding-window percentiles
+"""
+
+import glob
+import json
+import math
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_MAX_BINS = 512
+DEFAULT_SLOT_SECONDS = 10
+DEFAULT_WINDOWS = (60, 300)
+QUANTILES = (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('p99.9', 0.999))
+
+# Snapshots other workers read are at most this many seconds behind
+FLUSH_INTERVAL = 1.0
+
+# Durations at or below this are counted as zero instead of binned
+MIN_TRACKED_VALUE = 1e-9
+
+ALL_ENDPOINTS = 'all'
+
+class DDSketch:
+    """Streaming quantile sketch with relative error guarantees (DDSketch).
+
+    A value ``v`` is counted in bin ``ceil(log(v) / log(gamma))`` with
+    ``gamma = (1 + a) / (1 - a)``, so every quantile is reported within a
+    relative error ``a`` of a value actually seen. Sketches with the same
+    accuracy merge by adding bin counts, exactly as if one sketch had seen
+    both streams. Past ``max_bins`` the lowest bins are folded together,
+    which bounds memory and only costs accuracy at the fast end.
+    """
+
+    __slots__ = ('relative_accuracy', 'max_bins', 'gamma', '_log_gamma',
+                 'bins', 'zero_count', 'count', 'sum', 'min', 'max')
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+                 max_bins: int = DEFAULT_MAX_BINS):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        if value <= MIN_TRACKED_VALUE:
+            self.zero_count += 1
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[index] = self.bins.get(index, 0) + 1
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: 'DDSketch'):
+        """Add another sketch's counts into this one"""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the ``q`` quantile (0..1); None when empty"""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return max(self.min, 0.0)
+        cumulative = self.zero_count
+        for index in sorted(self.bins):
+            cumulative += self.bins[index]
+            if cumulative > rank:
+                # Bin midpoint in relative terms, kept inside the observed range
+                estimate = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def _collapse(self):
+        indexes = sorted(self.bins)
+        excess = len(indexes) - self.max_bins
+        target = indexes[excess]
+        for index in indexes[:excess]:
+            self.bins[target] += self.bins.pop(index)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'bins': [[index, count] for index, count in self.bins.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+                  max_bins: int = DEFAULT_MAX_BINS) -> 'DDSketch':
+        sketch = cls(relative_accuracy, max_bins)
+        sketch.bins = {int(index): count for index, count in data['bins']}
+        sketch.zero_count = data['zero_count']
+        sketch.count = data['count']
+        sketch.sum = data['sum']
+        if data['count']:
+            sketch.min, sketch.max = data['min'], data['max']
+        return sketch
+
+def _summarize(sketch: DDSketch) -> Dict[str, Any]:
+    summary = {'count': sketch.count}
+    if sketch.count:
+        summary['mean'] = round(sketch.sum / sketch.count, 6)
+        summary['max'] = round(sketch.max, 6)
+    for name, q in QUANTILES:
+        value = sketch.quantile(q)
+        summary[name] = round(value, 6) if value is not None else None
+    return summary
+
+_trackers = weakref.WeakSet()
+
+def _reset_after_fork():
+    for tracker in list(_trackers):
+        tracker._after_fork()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+class LatencyTracker:
+    """Per-endpoint latency sketches over sliding time windows.
+
+    Time is cut into ``slot_seconds`` slots, each holding one sketch per
+    endpoint; slots older than the longest window are dropped, so memory is
+    bounded by endpoints x slots x ``max_bins``. A window's percentiles come
+    from merging the sketches of the slots it covers, which costs the size
+    of the sketches rather than the number of requests. Windows are aligned
+    to slot boundaries, so a window may reach up to one slot further back.
+
+    With ``multiprocess_dir`` set, each process writes a snapshot of its
+    slots from a timer ``FLUSH_INTERVAL`` seconds after a request arrives,
+    and summaries merge the snapshots of the other processes with the
+    caller's own sketches.
+    """
+
+    def __init__(self, windows: Iterable[int] = DEFAULT_WINDOWS,
+                 slot_seconds: int = DEFAULT_SLOT_SECONDS,
+                 relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+                 max_bins: int = DEFAULT_MAX_BINS,
+                 multiprocess_dir: Optional[str] = None):
+        self.windows = sorted(windows)
+        self.slot_seconds = slot_seconds
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.multiprocess_dir = multiprocess_dir
+        self._lock = threading.Lock()
+        self._slots: Dict[int, Dict[str, DDSketch]] = {}
+        self._flush_pending = False
+        if multiprocess_dir:
+            _trackers.add(self)
+
+    def record(self, endpoint: str, seconds: float):
+        now = time.time()
+        slot = int(now // self.slot_seconds) * self.slot_seconds
+        with self._lock:
+            sketches = self._slots.get(slot)
+            if sketches is None:
+                sketches = self._slots[slot] = {}
+                self._expire(now)
+            sketch = sketches.get(endpoint)
+            if sketch is None:
+                sketch = sketches[endpoint] = DDSketch(self.relative_accuracy, self.max_bins)
+            sketch.add(seconds)
+            if self.multiprocess_dir and not self._flush_pending:
+                self._flush_pending = True
+                timer = threading.Timer(FLUSH_INTERVAL, self._flush)
+                timer.daemon = True
+                timer.start()
+
+    def summary(self) -> Dict[str, Any]:
+        """Percentiles per window, overall and per endpoint"""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            # Copy under the lock; record() keeps adding to the live sketches
+            slots = [(slot, {endpoint: self._copy(sketch) for endpoint, sketch in sketches.items()})
+                     for slot, sketches in self._slots.items()]
+        if self.multiprocess_dir:
+            slots.extend(self._read_snapshots(now))
+
+        windows = {}
+        for window in self.windows:
+            start = (now // self.slot_seconds) * self.slot_seconds - window + self.slot_seconds
+            merged: Dict[str, DDSketch] = {}
+            for slot, sketches in slots:
+                if slot < start:
+                    continue
+                for endpoint, sketch in sketches.items():
+                    if endpoint in merged:
+                        merged[endpoint].merge(sketch)
+                    else:
+                        merged[endpoint] = self._copy(sketch)
+            overall = DDSketch(self.relative_accuracy, self.max_bins)
+            for sketch in merged.values():
+                overall.merge(sketch)
+            windows[f'{window}s'] = {
+                ALL_ENDPOINTS: _summarize(overall),
+                'endpoints': {endpoint: _summarize(sketch) for endpoint, sketch in sorted(merged.items())},
+            }
+        return {
+            'unit': 'seconds',
+            'relative_accuracy': self.relative_accuracy,
+            'windows': windows,
+        }
+
+    def reset(self):
+        """Drop this process's sketches"""
+        with self._lock:
+            self._slots.clear()
+
+    def _copy(self, sketch: DDSketch) -> DDSketch:
+        copy = DDSketch(self.relative_accuracy, self.max_bins)
+        copy.merge(sketch)
+        return copy
+
+    def _expire(self, now: float):
+        oldest = now - self.windows[-1] - self.slot_seconds
+        for slot in [slot for slot in self._slots if slot < oldest]:
+            del self._slots[slot]
+
+    def _flush(self):
+        with self._lock:
+            self._flush_pending = False
+            snapshot = self._snapshot()
+        self._write_snapshot(snapshot)
+
+    def _snapshot_path(self, pid: int) -> str:
+        return os.path.join(self.multiprocess_dir, f'latency_{pid}.json')
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'slots': {str(slot): {endpoint: sketch.to_dict() for endpoint, sketch in sketches.items()}
+                      for slot, sketches in self._slots.items()},
+        }
+
+    def _write_snapshot(self, snapshot: Dict[str, Any]):
+        path = self._snapshot_path(os.getpid())
+        try:
+            os.makedirs(self.multiprocess_dir, exist_ok=True)
+            with open(path + '.tmp', 'w') as f:
+                json.dump(snapshot, f, separators=(',', ':'))
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            logger.error(f"Failed to write latency snapshot {path}: {e}")
+
+    def _read_snapshots(self, now: float) -> List[Tuple[int, Dict[str, DDSketch]]]:
+        """Slots written by other processes that are still inside the longest window"""
+        own = self._snapshot_path(os.getpid())
+        oldest = now - self.windows[-1] - self.slot_seconds
+        slots = []
+        for path in glob.glob(os.path.join(self.multiprocess_dir, 'latency_*.json')):
+            if path == own:
+                continue
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if snapshot.get('relative_accuracy') != self.relative_accuracy:
+                continue
+            for slot, sketches in snapshot['slots'].items():
+                if int(slot) >= oldest:
+                    slots.append((int(slot), {
+                        endpoint: DDSketch.from_dict(data, self.relative_accuracy, self.max_bins)
+                        for endpoint, data in sketches.items()
+                    }))
+        return slots
+
+    def _after_fork(self):
+        # Sketches inherited from the parent are its own; the child starts empty
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._flush_pending = False
+
+def _windows_from_env() -> Tuple[int, ...]:
+    value = os.environ.get('LATENCY_WINDOWS')
+    if not value:
+        return DEFAULT_WINDOWS
+    return tuple(int(window) for window in value.split(','))
+
+# Global latency tracker instance; shares gunicorn's METRICS_MULTIPROC_DIR
+latency_tracker = LatencyTracker(
+    windows=_windows_from_env(),
+    slot_seconds=int(os.environ.get('LATENCY_SLOT_SECONDS', DEFAULT_SLOT_SECONDS)),
+    relative_accuracy=float(os.environ.get('LATENCY_RELATIVE_ACCURACY', DEFAULT_RELATIVE_ACCURACY)),
+    max_bins=int(os.environ.get('LATENCY_MAX_BINS', DEFAULT_MAX_BINS)),
+    multiprocess_dir=os.environ.get('METRICS_MULTIPROC_DIR') or None,
+)
+
+def record_latency(endpoint: str, seconds: float):
+    """Record a request duration for an endpoint"""
+    latency_tracker.record(endpoint, seconds)
+
+def get_latency_summary() -> Dict[str, Any]:
+    """Get latency percentiles per window"""
+    return latency_tracker.summary()
+
+def get_latency_tracker() -> LatencyTracker:
+    """Get the global latency tracker instance"""
+    return latency_tracker
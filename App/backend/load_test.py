@@ -0,0 +1,211 @@
+"""
+Load Test Harness for RL Futures Trading System
+Measures throughput and tail latency per serving mode, optionally while slow connections hold workers
+
+Usage:
+    python load_test.py --serve sync,gthread --concurrency 1,8,32 --hold 4
+    python load_test.py --url http://localhost:8000 --path /health --duration 10
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import numpy as np
+
+DEFAULT_PATHS = ('/health', '/api/config')
+DEFAULT_CONCURRENCY = (1, 8, 32)
+DEFAULT_DURATION = 5.0
+REQUEST_TIMEOUT = 10.0
+STREAM_PATH = '/api/training/stream'
+
+def percentiles(latencies: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99/max in milliseconds"""
+    if not latencies:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'max_ms': None}
+    values = np.asarray(latencies) * 1000.0
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {'p50_ms': round(float(p50), 3), 'p95_ms': round(float(p95), 3),
+            'p99_ms': round(float(p99), 3), 'max_ms': round(float(values.max()), 3)}
+
+class KeepAliveClient:
+    """Keep-alive HTTP connection that reconnects when the server closes it"""
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.connection = None
+
+    def request(self, method: str, path: str, body: Optional[bytes], headers: Dict[str, str]) -> int:
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(self.host, self.port, timeout=REQUEST_TIMEOUT)
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if response.will_close:
+            self.close()
+        return response.status
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+def run_load(base_url: str, path: str, concurrency: int, duration: float = DEFAULT_DURATION,
+             method: str = 'GET', body: Optional[bytes] = None) -> Dict[str, Any]:
+    """Hit one path from ``concurrency`` closed-loop clients for ``duration`` seconds"""
+    parts = urlsplit(base_url)
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    latencies: List[List[float]] = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    statuses: Dict[int, int] = {}
+    status_lock = threading.Lock()
+    start_barrier = threading.Barrier(concurrency + 1)
+    deadline = [0.0]
+
+    def worker(index: int):
+        client = KeepAliveClient(parts.hostname, parts.port or 80)
+        start_barrier.wait()
+        while time.perf_counter() < deadline[0]:
+            started = time.perf_counter()
+            try:
+                status = client.request(method, path, body, headers)
+            except (OSError, http.client.HTTPException):
+                errors[index] += 1
+                continue
+            latencies[index].append(time.perf_counter() - started)
+            with status_lock:
+                statuses[status] = statuses.get(status, 0) + 1
+        client.close()
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    deadline[0] = time.perf_counter() + duration
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    combined = [latency for per_client in latencies for latency in per_client]
+    return {
+        'path': path,
+        'method': method,
+        'concurrency': concurrency,
+        'requests': len(combined),
+        'errors': sum(errors),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'throughput_rps': round(len(combined) / elapsed, 1) if elapsed > 0 else 0.0,
+        **percentiles(combined),
+    }
+
+def hold_streams(base_url: str, count: int) -> List[socket.socket]:
+    """Open long-lived training stream connections, as idle dashboards would"""
+    parts = urlsplit(base_url)
+    sockets = []
+    for _ in range(count):
+        sock = socket.create_connection((parts.hostname, parts.port or 80), timeout=REQUEST_TIMEOUT)
+        sock.sendall(f'GET {STREAM_PATH} HTTP/1.1\r\nHost: {parts.netloc}\r\n\r\n'.encode())
+        sockets.append(sock)
+    # Give the server time to dispatch every held connection to a worker
+    time.sleep(0.5)
+    return sockets
+
+def wait_until_ready(base_url: str, timeout: float = 30.0) -> None:
+    parts = urlsplit(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        client = KeepAliveClient(parts.hostname, parts.port or 80)
+        try:
+            if client.request('GET', '/health', None, {}) == 200:
+                return
+        except (OSError, http.client.HTTPException):
+            time.sleep(0.2)
+        finally:
+            client.close()
+    raise TimeoutError(f"Server at {base_url} did not become ready")
+
+def start_server(mode: str, port: int, extra_env: Dict[str, str] = None) -> subprocess.Popen:
+    """Run the app under gunicorn with the given serving profile (rate limiting off)"""
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    # Own metrics directory, so servers started side by side do not clear each other's
+    env = {**os.environ, 'SERVING_MODE': mode, 'GUNICORN_BIND': f'127.0.0.1:{port}',
+           'LOG_LEVEL': 'WARNING', 'RATE_LIMIT_ENABLED': 'false',
+           'METRICS_MULTIPROC_DIR': tempfile.mkdtemp(prefix='rlfts-metrics-'), **(extra_env or {})}
+    return subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py'],
+        cwd=backend_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+def run_suite(base_url: str, paths, concurrency_levels, duration: float, hold: int = 0) -> Dict[str, Any]:
+    """Every path at every concurrency level, optionally with ``hold`` streams open"""
+    held = hold_streams(base_url, hold) if hold else []
+    try:
+        results = [run_load(base_url, path, concurrency, duration)
+                   for path in paths for concurrency in concurrency_levels]
+    finally:
+        for sock in held:
+            sock.close()
+    return {'held_streams': hold, 'results': results}
+
+def compare_modes(modes, port: int, paths, concurrency_levels, duration: float, hold: int) -> Dict[str, Any]:
+    """Start gunicorn once per serving mode and run the same suite against each"""
+    report = {}
+    for mode in modes:
+        server = start_server(mode, port)
+        base_url = f'http://127.0.0.1:{port}'
+        try:
+            wait_until_ready(base_url)
+            report[mode] = run_suite(base_url, paths, concurrency_levels, duration, hold)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    return report
+
+def print_table(report: Dict[str, Any]) -> None:
+    print(f"{'mode':<10}{'held':>5} {'path':<16}{'conc':>5}{'rps':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'err':>6}")
+    for mode, suite in report.items():
+        for row in suite['results']:
+            print(f"{mode:<10}{suite['held_streams']:>5} {row['path']:<16}{row['concurrency']:>5}"
+                  f"{row['throughput_rps']:>10}{row['p50_ms'] or '-':>9}{row['p95_ms'] or '-':>9}"
+                  f"{row['p99_ms'] or '-':>9}{row['errors']:>6}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--serve', help='comma-separated serving modes to start under gunicorn (sync,gthread)')
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='target an already running server')
+    parser.add_argument('--port', type=int, default=8765, help='port for servers started with --serve')
+    parser.add_argument('--path', action='append', help=f'path to load (default: {", ".join(DEFAULT_PATHS)})')
+    parser.add_argument('--concurrency', default=','.join(map(str, DEFAULT_CONCURRENCY)))
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION, help='seconds per run')
+    parser.add_argument('--hold', type=int, default=0, help='training streams held open during the runs')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args(argv)
+
+    paths = args.path or list(DEFAULT_PATHS)
+    levels = [int(level) for level in args.concurrency.split(',')]
+    if args.serve:
+        report = compare_modes(args.serve.split(','), args.port, paths, levels, args.duration, args.hold)
+    else:
+        report = {'target': run_suite(args.url, paths, levels, args.duration, args.hold)}
+
+    print_table(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -3,9 +3,11 @@ Structured Logging Configuration for RL Futures Trading System
 Provides consistent, structured logging across the application
 """
 
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 import sys
 from datetime import datetime
 from typing import Dict, Any
@@ -66,6 +68,36 @@ class SecurityFormatter(logging.Formatter):
         
         return json.dumps(security_entry, default=str)
 
+class _LocalQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler for an in-process listener.
+
+    The stock ``prepare`` formats the message and drops ``exc_info`` so the
+    record can be pickled; records here never leave the process, so they are
+    passed through untouched for the structured formatters.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+_queue_listeners = []
+
+def _queued(handler: logging.Handler) -> logging.Handler:
+    """Move a handler's writes onto a background listener thread"""
+    log_queue = queue.SimpleQueue()
+    queue_handler = _LocalQueueHandler(log_queue)
+    queue_handler.setLevel(handler.level)
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    _queue_listeners.append(listener)
+    return queue_handler
+
+def stop_log_listeners() -> None:
+    """Flush and stop background log writers"""
+    while _queue_listeners:
+        _queue_listeners.pop().stop()
+
+atexit.register(stop_log_listeners)
+
 def setup_logging(
     log_level: str = "INFO",
     log_file: str = "logs/app.log",
@@ -73,9 +105,14 @@ def setup_logging(
     backup_count: int = 5,
     enable_console: bool = True,
     enable_file: bool = True,
-    enable_security_logging: bool = True
+    enable_security_logging: bool = True,
+    queue_file_writes: bool = False
 ) -> None:
-    """Setup comprehensive logging configuration"""
+    """Setup comprehensive logging configuration.
+    
+    With ``queue_file_writes`` the log files are written by background
+    listener threads, so request threads only enqueue records.
+    """
     
     # Create logs directory if it doesn't exist
     os.makedirs(os.path.dirname(log_file), exist_ok=True)
@@ -86,6 +123,10 @@ def setup_logging(
     
     # Clear existing handlers
     root_logger.handlers.clear()
+    logging.getLogger('security').handlers.clear()
+    logging.getLogger('error').handlers.clear()
+    stop_log_listeners()
+    wrap = _queued if queue_file_writes else (lambda handler: handler)
     
     # Create formatters
     structured_formatter = StructuredFormatter()
@@ -107,7 +148,7 @@ def setup_logging(
         )
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(structured_formatter)
-        root_logger.addHandler(file_handler)
+        root_logger.addHandler(wrap(file_handler))
     
     # Security logging handler
     if enable_security_logging:
@@ -122,7 +163,7 @@ def setup_logging(
         
         # Create security logger
         security_logger = logging.getLogger('security')
-        security_logger.addHandler(security_handler)
+        security_logger.addHandler(wrap(security_handler))
         security_logger.setLevel(logging.INFO)
         security_logger.propagate = False
     
@@ -138,7 +179,7 @@ def setup_logging(
     
     # Create error logger
     error_logger = logging.getLogger('error')
-    error_logger.addHandler(error_handler)
+    error_logger.addHandler(wrap(error_handler))
     error_logger.setLevel(logging.ERROR)
     error_logger.propagate = False
     
@@ -153,6 +194,7 @@ def setup_logging(
             'log_file': log_file,
             'max_file_size_mb': max_file_size // (1024 * 1024),
             'backup_count': backup_count,
+            'queue_file_writes': queue_file_writes,
         }
     })
 
@@ -3,15 +3,38 @@ Prometheus Metrics Collection for RL Futures Trading System
 Provides comprehensive metrics for monitoring and alerting
 """
 
+import os
+import sys
 import time
 import threading
-from typing import Dict, Any, Optional
+import weakref
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import logging
 
+from latency_sketch import get_latency_summary
+from metrics_multiprocess import DURABLE_FILE, GAUGE_FILE, MmapMetricFile, merge_metric_files, metric_file_path
+
 logger = logging.getLogger(__name__)
 
+HISTOGRAM_BUCKETS = [0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0]
+SIZE_BUCKETS = [256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216]
+
+DEFAULT_MAX_SERIES_PER_FAMILY = 500
+DEFAULT_SERIES_TTL = 3600.0
+MAX_SWEEP_INTERVAL = 60.0
+
+# A process's metric file is compacted once it holds this many entries
+# more than twice the series the process has in memory
+COMPACT_MIN_ENTRIES = 1024
+
+# Label value of the series that absorbs writes past a family's series limit
+OVERFLOW_LABEL_VALUE = '__overflow__'
+
+# Endpoint label for requests that matched no route (404s)
+UNMATCHED_ENDPOINT = 'unmatched'
+
 @dataclass
 class MetricValue:
     """Represents a metric value with timestamp"""
@@ -19,75 +42,265 @@ class MetricValue:
     timestamp: datetime
     labels: Dict[str, str]
 
+_collectors = weakref.WeakSet()
+
+def _reset_after_fork():
+    for collector in list(_collectors):
+        collector._after_fork()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
 class MetricsCollector:
-    """Collects and manages application metrics"""
+    """Collects and manages application metrics.
     
-    def __init__(self):
+    With ``multiprocess_dir`` set, every value is also written to
+    memory-mapped files owned by the current process, and reads merge the
+    files of all processes. Gunicorn workers then report combined totals
+    whichever worker serves the scrape, with no IPC on the request path.
+    """
+    
+    def __init__(self, multiprocess_dir: Optional[str] = None,
+                 max_series_per_family: int = DEFAULT_MAX_SERIES_PER_FAMILY,
+                 series_ttl: float = DEFAULT_SERIES_TTL,
+                 series_limits: Dict[str, int] = None):
         self.metrics = {}
         self._lock = threading.Lock()
         self.start_time = datetime.utcnow()
+        self.multiprocess_dir = multiprocess_dir
+        self._files = {}
+        if multiprocess_dir:
+            _collectors.add(self)
+        
+        # Cardinality controls: each family (metric name) keeps at most its
+        # limit of label sets, and label sets not written for ``series_ttl``
+        # seconds are dropped (0 keeps them forever)
+        self.max_series_per_family = max_series_per_family
+        self.series_limits = series_limits or {}
+        self.series_ttl = series_ttl
+        self._series: Dict[str, Dict[str, float]] = {}
+        self._family_kinds: Dict[str, str] = {}
+        self._overflows: Dict[str, int] = {}
+        self._evicted = 0
+        self._next_sweep = time.monotonic() + self._sweep_interval()
+        # Bucket, sum and count values per histogram label set, by _sum key
+        self._histograms: Dict[str, tuple] = {}
     
     def increment_counter(self, name: str, labels: Dict[str, str] = None, value: int = 1):
         """Increment a counter metric"""
         with self._lock:
-            key = self._get_metric_key(name, labels)
+            labels, key = self._admit(name, 'counter', labels, name)
             if key not in self.metrics:
                 self.metrics[key] = MetricValue(0, datetime.utcnow(), labels or {})
             self.metrics[key].value += value
             self.metrics[key].timestamp = datetime.utcnow()
+            self._persist(key, self.metrics[key], 'counter', delta=value)
     
-    def set_gauge(self, name: str, value: float, labels: Dict[str, str] = None):
-        """Set a gauge metric value"""
+    def set_gauge(self, name: str, value: float, labels: Dict[str, str] = None, merge: str = 'latest'):
+        """Set a gauge metric value.
+        
+        ``merge`` decides how workers combine in multiprocess mode: 'latest'
+        keeps the most recent value, 'sum' adds up the live workers.
+        """
         with self._lock:
-            key = self._get_metric_key(name, labels)
+            labels, key = self._admit(name, 'gauge', labels, name)
             self.metrics[key] = MetricValue(value, datetime.utcnow(), labels or {})
+            self._persist(key, self.metrics[key], 'gauge', merge)
     
-    def record_histogram(self, name: str, value: float, labels: Dict[str, str] = None):
-        """Record a histogram metric value"""
+    def record_histogram(self, name: str, value: float, labels: Dict[str, str] = None,
+                         buckets: List[float] = None):
+        """Record a histogram metric value.
+        
+        ``buckets`` (upper bounds) defaults to the latency buckets and is
+        fixed by the first observation of each label set.
+        """
         with self._lock:
-            # Create histogram buckets
-            buckets = [0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0]
+            labels, sum_key = self._admit(name, 'histogram', labels, f"{name}_sum")
+            series = self._histograms.get(sum_key)
+            if series is None:
+                series = self._histograms[sum_key] = self._histogram_series(
+                    name, labels or {}, buckets or HISTOGRAM_BUCKETS)
             
-            for bucket in buckets:
-                bucket_labels = labels.copy() if labels else {}
-                bucket_labels["le"] = str(bucket)
-                bucket_key = self._get_metric_key(f"{name}_bucket", bucket_labels)
-                if bucket_key not in self.metrics:
-                    self.metrics[bucket_key] = MetricValue(0, datetime.utcnow(), bucket_labels)
-                
+            now = datetime.utcnow()
+            bucket_values, (sum_key, sum_metric), (count_key, count_metric) = series
+            for bucket, bucket_key, metric in bucket_values:
                 if value <= bucket:
-                    self.metrics[bucket_key].value += 1
-                    self.metrics[bucket_key].timestamp = datetime.utcnow()
+                    metric.value += 1
+                    metric.timestamp = now
+                    self._persist(bucket_key, metric, 'histogram', delta=1)
             
             # Record sum and count
-            sum_key = self._get_metric_key(f"{name}_sum", labels)
-            count_key = self._get_metric_key(f"{name}_count", labels)
-            
-            if sum_key not in self.metrics:
-                self.metrics[sum_key] = MetricValue(0, datetime.utcnow(), labels or {})
-            if count_key not in self.metrics:
-                self.metrics[count_key] = MetricValue(0, datetime.utcnow(), labels or {})
-            
-            self.metrics[sum_key].value += value
-            self.metrics[count_key].value += 1
-            self.metrics[sum_key].timestamp = datetime.utcnow()
-            self.metrics[count_key].timestamp = datetime.utcnow()
+            sum_metric.value += value
+            count_metric.value += 1
+            sum_metric.timestamp = now
+            count_metric.timestamp = now
+            self._persist(sum_key, sum_metric, 'histogram', delta=value)
+            self._persist(count_key, count_metric, 'histogram', delta=1)
+    
+    def _histogram_series(self, name: str, labels: Dict[str, str], buckets: List[float]):
+        """Create the bucket, sum and count values of one histogram label set.
+        
+        Keys are built once here; later observations update the values
+        through the returned references.
+        """
+        now = datetime.utcnow()
+        
+        def series_value(key_name: str, series_labels: Dict[str, str]):
+            key = self._get_metric_key(key_name, series_labels)
+            metric = self.metrics.get(key)
+            if metric is None:
+                metric = self.metrics[key] = MetricValue(0, now, series_labels)
+                self._persist(key, metric, 'histogram')
+            return key, metric
+        
+        bucket_values = [(bucket, *series_value(f"{name}_bucket", {**labels, "le": str(bucket)}))
+                         for bucket in buckets]
+        return bucket_values, series_value(f"{name}_sum", labels), series_value(f"{name}_count", labels)
     
     def get_metric(self, name: str, labels: Dict[str, str] = None) -> Optional[MetricValue]:
         """Get a specific metric value"""
+        key = self._get_metric_key(name, labels)
+        if self.multiprocess_dir:
+            return self.get_all_metrics().get(key)
         with self._lock:
-            key = self._get_metric_key(name, labels)
             return self.metrics.get(key)
     
     def get_all_metrics(self) -> Dict[str, MetricValue]:
-        """Get all collected metrics"""
+        """Get all collected metrics, merged across processes in multiprocess mode"""
+        if self.multiprocess_dir:
+            merged = merge_metric_files(self.multiprocess_dir, max_age=self.series_ttl or None)
+            return {
+                key: MetricValue(value, datetime.utcfromtimestamp(timestamp), description['labels'])
+                for key, (description, value, timestamp) in merged.items()
+            }
         with self._lock:
             return self.metrics.copy()
     
     def reset_metrics(self):
-        """Reset all metrics"""
+        """Reset all metrics (in multiprocess mode, only this process's share)"""
         with self._lock:
             self.metrics.clear()
+            self._series.clear()
+            self._overflows.clear()
+            self._histograms.clear()
+            for store in self._files.values():
+                store.close()
+                os.remove(store.path)
+            self._files.clear()
+    
+    def _persist(self, key: str, metric: MetricValue, kind: str, merge: str = None, delta: float = 0):
+        """Mirror a write into this process's metric file (multiprocess mode only).
+        
+        Gauges store their value; counters and histograms add ``delta``, so
+        the file keeps running totals even when the in-memory series starts
+        over.
+        """
+        if not self.multiprocess_dir:
+            return
+        group = GAUGE_FILE if kind == 'gauge' else DURABLE_FILE
+        store = self._files.get(group)
+        if store is None:
+            store = self._files[group] = MmapMetricFile(
+                metric_file_path(self.multiprocess_dir, group, os.getpid()))
+        describe = lambda: {'kind': kind, 'merge': merge, 'labels': metric.labels}
+        if group == GAUGE_FILE:
+            store.write(key, metric.value, time.time(), describe)
+        else:
+            store.add(key, delta, time.time(), describe)
+    
+    def _after_fork(self):
+        # Values and open files inherited from the parent are its own; the
+        # child starts empty and writes files under its own pid
+        self._lock = threading.Lock()
+        self.metrics = {}
+        self._files = {}
+        self._series = {}
+        self._overflows = {}
+        self._histograms = {}
+    
+    def _sweep_interval(self) -> float:
+        return min(self.series_ttl / 10, MAX_SWEEP_INTERVAL) if self.series_ttl else MAX_SWEEP_INTERVAL
+    
+    def _admit(self, family: str, kind: str, labels: Optional[Dict[str, str]], key_name: str):
+        """Track a write to a label set, folding it into the overflow series past the family limit.
+        
+        Returns the labels to record under and the metric key of ``key_name``
+        with them, which also identifies the label set within its family.
+        """
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._evict_stale(now)
+        
+        series = self._series.get(family)
+        if series is None:
+            series = self._series[family] = {}
+            self._family_kinds[family] = kind
+        key = self._get_metric_key(key_name, labels)
+        if key not in series and len(series) >= self.series_limits.get(family, self.max_series_per_family):
+            self._overflows[family] = self._overflows.get(family, 0) + 1
+            labels = {name: OVERFLOW_LABEL_VALUE for name in labels}
+            key = self._get_metric_key(key_name, labels)
+        series[key] = now
+        return labels, key
+    
+    def _evict_stale(self, now: float):
+        """Drop every series whose label set has not been written within ``series_ttl``"""
+        self._next_sweep = now + self._sweep_interval()
+        if not self.series_ttl:
+            return
+        cutoff = now - self.series_ttl
+        for family, series in self._series.items():
+            stale = [key for key, last_write in series.items() if last_write < cutoff]
+            for key in stale:
+                del series[key]
+                self.metrics.pop(key, None)
+                # A histogram is tracked by its _sum key; its buckets and count go with it
+                histogram = self._histograms.pop(key, None)
+                if histogram is not None:
+                    bucket_values, _, (count_key, _) = histogram
+                    for _, bucket_key, _ in bucket_values:
+                        self.metrics.pop(bucket_key, None)
+                    self.metrics.pop(count_key, None)
+            self._evicted += len(stale)
+        if self._files:
+            self._compact_files()
+    
+    def _compact_files(self):
+        """Drop entries of series no process has written within ``series_ttl`` from this process's files.
+        
+        Evicted series stay in the file until then, so a label set that
+        comes back continues from its stored total. Series still live in
+        another worker are kept, since their merged totals include ours.
+        """
+        visible = None
+        for store in self._files.values():
+            if len(store) <= 2 * len(self.metrics) + COMPACT_MIN_ENTRIES:
+                continue
+            if visible is None:
+                visible = merge_metric_files(self.multiprocess_dir, max_age=self.series_ttl)
+            dropped = store.compact(lambda key: key in self.metrics or key in visible)
+            if dropped:
+                logger.info(f"Compacted {dropped} stale series from {store.path}")
+    
+    def cardinality_stats(self) -> Dict[str, Any]:
+        """Series held by this process, per family, with overflow and eviction counts.
+        
+        ``memory_bytes`` is a shallow estimate of the keys, values and
+        label dicts held in ``self.metrics``.
+        """
+        with self._lock:
+            self._evict_stale(time.monotonic())
+            memory = sys.getsizeof(self.metrics) + sum(
+                sys.getsizeof(key) + sys.getsizeof(metric) + sys.getsizeof(metric.__dict__)
+                + sys.getsizeof(metric.labels)
+                for key, metric in self.metrics.items()
+            )
+            return {
+                'series': len(self.metrics),
+                'families': {family: len(series) for family, series in self._series.items()},
+                'overflowed': dict(self._overflows),
+                'evicted': self._evicted,
+                'memory_bytes': memory,
+            }
     
     def _get_metric_key(self, name: str, labels: Dict[str, str] = None) -> str:
         """Generate a unique key for a metric"""
@@ -101,62 +314,80 @@ class MetricsCollector:
     
     def generate_prometheus_format(self) -> str:
         """Generate metrics in Prometheus exposition format"""
-        with self._lock:
-            lines = []
-            
-            # Add application info
-            lines.append("# HELP rl_futures_app_info Application information")
-            lines.append("# TYPE rl_futures_app_info gauge")
-            lines.append(f"rl_futures_app_info{{version=\"0.1.0\"}} 1")
+        all_metrics = self.get_all_metrics()
+        lines = []
+        
+        # Add application info
+        lines.append("# HELP rl_futures_app_info Application information")
+        lines.append("# TYPE rl_futures_app_info gauge")
+        lines.append(f"rl_futures_app_info{{version=\"0.1.0\"}} 1")
+        lines.append("")
+        
+        # Group metrics by type
+        counters = {}
+        gauges = {}
+        histograms = {}
+        
+        for key, metric in all_metrics.items():
+            if key.endswith('_sum') or key.endswith('_count') or key.endswith('_bucket'):
+                histograms[key] = metric
+            elif key.startswith('counter_'):
+                counters[key] = metric
+            else:
+                gauges[key] = metric
+        
+        # Output counters
+        if counters:
+            lines.append("# HELP rl_futures_counters Application counters")
+            lines.append("# TYPE rl_futures_counters counter")
+            for key, metric in counters.items():
+                label_str = self._format_labels(metric.labels)
+                lines.append(f"rl_futures_counters{{{label_str}}} {metric.value}")
             lines.append("")
-            
-            # Group metrics by type
-            counters = {}
-            gauges = {}
-            histograms = {}
-            
-            for key, metric in self.metrics.items():
-                if key.endswith('_sum') or key.endswith('_count') or key.endswith('_bucket'):
-                    histograms[key] = metric
-                elif key.startswith('counter_'):
-                    counters[key] = metric
-                else:
-                    gauges[key] = metric
-            
-            # Output counters
-            if counters:
-                lines.append("# HELP rl_futures_counters Application counters")
-                lines.append("# TYPE rl_futures_counters counter")
-                for key, metric in counters.items():
-                    label_str = self._format_labels(metric.labels)
-                    lines.append(f"rl_futures_counters{{{label_str}}} {metric.value}")
-                lines.append("")
-            
-            # Output gauges
-            if gauges:
-                lines.append("# HELP rl_futures_gauges Application gauges")
-                lines.append("# TYPE rl_futures_gauges gauge")
-                for key, metric in gauges.items():
-                    label_str = self._format_labels(metric.labels)
-                    lines.append(f"rl_futures_gauges{{{label_str}}} {metric.value}")
-                lines.append("")
-            
-            # Output histograms
-            if histograms:
-                lines.append("# HELP rl_futures_histograms Application histograms")
-                lines.append("# TYPE rl_futures_histograms histogram")
-                for key, metric in histograms.items():
-                    label_str = self._format_labels(metric.labels)
-                    lines.append(f"rl_futures_histograms{{{label_str}}} {metric.value}")
-                lines.append("")
-            
-            # Add uptime metric
-            uptime = (datetime.utcnow() - self.start_time).total_seconds()
-            lines.append("# HELP rl_futures_uptime_seconds Application uptime in seconds")
-            lines.append("# TYPE rl_futures_uptime_seconds gauge")
-            lines.append(f"rl_futures_uptime_seconds {uptime}")
-            
-            return "\n".join(lines)
+        
+        # Output gauges
+        if gauges:
+            lines.append("# HELP rl_futures_gauges Application gauges")
+            lines.append("# TYPE rl_futures_gauges gauge")
+            for key, metric in gauges.items():
+                label_str = self._format_labels(metric.labels)
+                lines.append(f"rl_futures_gauges{{{label_str}}} {metric.value}")
+            lines.append("")
+        
+        # Output histograms
+        if histograms:
+            lines.append("# HELP rl_futures_histograms Application histograms")
+            lines.append("# TYPE rl_futures_histograms histogram")
+            for key, metric in histograms.items():
+                label_str = self._format_labels(metric.labels)
+                lines.append(f"rl_futures_histograms{{{label_str}}} {metric.value}")
+            lines.append("")
+        
+        # Self-metrics: the series this process holds and what the limits dropped
+        stats = self.cardinality_stats()
+        lines.append("# HELP rl_futures_metric_series Label sets held per metric family")
+        lines.append("# TYPE rl_futures_metric_series gauge")
+        for family, count in sorted(stats['families'].items()):
+            lines.append(f"rl_futures_metric_series{{family=\"{family}\"}} {count}")
+        lines.append("# HELP rl_futures_metric_series_overflow_total Writes folded into a family's overflow series")
+        lines.append("# TYPE rl_futures_metric_series_overflow_total counter")
+        for family, count in sorted(stats['overflowed'].items()):
+            lines.append(f"rl_futures_metric_series_overflow_total{{family=\"{family}\"}} {count}")
+        lines.append("# HELP rl_futures_metric_series_evicted_total Label sets dropped after the series TTL")
+        lines.append("# TYPE rl_futures_metric_series_evicted_total counter")
+        lines.append(f"rl_futures_metric_series_evicted_total {stats['evicted']}")
+        lines.append("# HELP rl_futures_metrics_memory_bytes Approximate memory held by metric series")
+        lines.append("# TYPE rl_futures_metrics_memory_bytes gauge")
+        lines.append(f"rl_futures_metrics_memory_bytes {stats['memory_bytes']}")
+        lines.append("")
+        
+        # Add uptime metric
+        uptime = (datetime.utcnow() - self.start_time).total_seconds()
+        lines.append("# HELP rl_futures_uptime_seconds Application uptime in seconds")
+        lines.append("# TYPE rl_futures_uptime_seconds gauge")
+        lines.append(f"rl_futures_uptime_seconds {uptime}")
+        
+        return "\n".join(lines)
     
     def _format_labels(self, labels: Dict[str, str]) -> str:
         """Format labels for Prometheus output"""
@@ -171,15 +402,19 @@ class MetricsCollector:
         
         return ",".join(formatted)
 
-# Global metrics collector instance
-metrics_collector = MetricsCollector()
+# Global metrics collector instance; gunicorn.conf.py sets METRICS_MULTIPROC_DIR
+metrics_collector = MetricsCollector(
+    os.environ.get('METRICS_MULTIPROC_DIR') or None,
+    max_series_per_family=int(os.environ.get('METRICS_MAX_SERIES_PER_FAMILY', DEFAULT_MAX_SERIES_PER_FAMILY)),
+    series_ttl=float(os.environ.get('METRICS_SERIES_TTL', DEFAULT_SERIES_TTL)),
+)
 
 # Convenience functions for common metrics
 def increment_request_counter(method: str, endpoint: str, status_code: int):
     """Increment HTTP request counter"""
     metrics_collector.increment_counter(
         "http_requests_total",
-        {"method": method, "endpoint": endpoint, "status": str(status_code)}
+        {"method": method, "endpoint": endpoint or UNMATCHED_ENDPOINT, "status": str(status_code)}
     )
 
 def record_request_duration(method: str, endpoint: str, duration: float):
@@ -187,12 +422,12 @@ def record_request_duration(method: str, endpoint: str, duration: float):
     metrics_collector.record_histogram(
         "http_request_duration_seconds",
         duration,
-        {"method": method, "endpoint": endpoint}
+        {"method": method, "endpoint": endpoint or UNMATCHED_ENDPOINT}
     )
 
 def set_active_connections(count: int):
     """Set active connections gauge"""
-    metrics_collector.set_gauge("active_connections", count)
+    metrics_collector.set_gauge("active_connections", count, merge='sum')
 
 def increment_file_upload_counter(success: bool, file_type: str):
     """Increment file upload counter"""
@@ -206,7 +441,26 @@ def record_file_upload_size(file_type: str, size_bytes: int):
     metrics_collector.record_histogram(
         "file_upload_size_bytes",
         size_bytes,
-        {"file_type": file_type}
+        {"file_type": file_type},
+        SIZE_BUCKETS
+    )
+
+def record_request_size(method: str, endpoint: str, size_bytes: int):
+    """Record HTTP request body size"""
+    metrics_collector.record_histogram(
+        "http_request_size_bytes",
+        size_bytes,
+        {"method": method, "endpoint": endpoint or UNMATCHED_ENDPOINT},
+        SIZE_BUCKETS
+    )
+
+def record_response_size(method: str, endpoint: str, size_bytes: int):
+    """Record HTTP response body size"""
+    metrics_collector.record_histogram(
+        "http_response_size_bytes",
+        size_bytes,
+        {"method": method, "endpoint": endpoint or UNMATCHED_ENDPOINT},
+        SIZE_BUCKETS
     )
 
 def set_memory_usage(bytes_used: int):
@@ -242,6 +496,8 @@ def get_metrics_summary() -> Dict[str, Any]:
         'gauges': {},
         'histograms': {},
         'timestamp': datetime.utcnow().isoformat(),
+        'cardinality': metrics_collector.cardinality_stats(),
+        'latency': get_latency_summary(),
     }
     
     for key, metric in all_metrics.items():
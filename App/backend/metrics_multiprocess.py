@@ -0,0 +1,238 @@
+"""
+Multiprocess Metrics Storage for RL Futures Trading System
+Per-worker memory-mapped metric files, merged across workers at scrape time
+"""
+
+import glob
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+INITIAL_FILE_BYTES = 64 * 1024
+
+_HEADER = struct.Struct('<II')       # used bytes, reserved
+_KEY_LENGTH = struct.Struct('<I')
+_VALUE = struct.Struct('<dd')        # value, unix timestamp
+
+# Counter and histogram files outlive their worker, so totals survive
+# recycling; gauge files describe a live worker and go when it exits
+DURABLE_FILE = 'counter'
+GAUGE_FILE = 'gauge'
+
+# Exited workers' counters are folded into this one file, so a scrape reads
+# two files per live worker plus this one however many workers have exited
+EXITED_FILE = f'{DURABLE_FILE}_exited.db'
+
+def _aligned(size: int) -> int:
+    return size + (-size % 8)
+
+def metric_file_path(directory: str, group: str, pid: int) -> str:
+    return os.path.join(directory, f'{group}_{pid}.db')
+
+def _entries(buffer, used: int) -> Iterator[Tuple[bytes, float, float, int]]:
+    """Yield (key, value, timestamp, value position) for every complete entry"""
+    offset = _HEADER.size
+    while offset < used:
+        length, = _KEY_LENGTH.unpack_from(buffer, offset)
+        key = bytes(buffer[offset + _KEY_LENGTH.size:offset + _KEY_LENGTH.size + length])
+        position = offset + _aligned(_KEY_LENGTH.size + length)
+        value, timestamp = _VALUE.unpack_from(buffer, position)
+        yield key, value, timestamp, position
+        offset = position + _VALUE.size
+
+class MmapMetricFile:
+    """Metric values of one process in a memory-mapped file.
+
+    Entries are appended as ``uint32 key length | JSON description | float64
+    value | float64 timestamp`` with the floats 8-byte aligned, then updated
+    in place. Only the owning process writes. The used length in the header
+    moves after an entry is complete, so readers in other processes never
+    parse a partial entry.
+
+    Counters and histograms are stored with ``add``, which adds to whatever
+    the file already holds. A worker that reuses an exited worker's pid
+    reopens its file and carries on from its totals instead of overwriting
+    them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._open()
+
+    def _open(self):
+        self._file = open(self.path, 'a+b')
+        capacity = os.fstat(self._file.fileno()).st_size
+        if capacity == 0:
+            capacity = INITIAL_FILE_BYTES
+            self._file.truncate(capacity)
+        self._capacity = capacity
+        self._mmap = mmap.mmap(self._file.fileno(), capacity)
+        self._used = _HEADER.unpack_from(self._mmap, 0)[0] or _HEADER.size
+        self._positions: Dict[str, int] = {}
+        for description, _, _, position in _entries(self._mmap, self._used):
+            self._positions[json.loads(description)['key']] = position
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def write(self, key: str, value: float, timestamp: float, describe: Callable[[], Dict[str, Any]]):
+        """Set a value; ``describe`` supplies the stored description the first time a key is seen"""
+        position = self._positions.get(key)
+        if position is None:
+            self._positions[key] = self._append(json.dumps({'key': key, **describe()}).encode('utf-8'),
+                                                value, timestamp)
+        else:
+            _VALUE.pack_into(self._mmap, position, value, timestamp)
+
+    def add(self, key: str, delta: float, timestamp: float, describe: Callable[[], Dict[str, Any]]):
+        """Add to a value; ``describe`` supplies the stored description the first time a key is seen"""
+        position = self._positions.get(key)
+        if position is None:
+            self._positions[key] = self._append(json.dumps({'key': key, **describe()}).encode('utf-8'),
+                                                delta, timestamp)
+        else:
+            value, _ = _VALUE.unpack_from(self._mmap, position)
+            _VALUE.pack_into(self._mmap, position, value + delta, timestamp)
+
+    def fold(self, entries: List[Tuple[Dict[str, Any], float, float]]):
+        """Add another process's (description, value, timestamp) entries, keeping the newest timestamps"""
+        for description, value, timestamp in entries:
+            position = self._positions.get(description['key'])
+            if position is None:
+                self._positions[description['key']] = self._append(json.dumps(description).encode('utf-8'),
+                                                                   value, timestamp)
+            else:
+                current, seen = _VALUE.unpack_from(self._mmap, position)
+                _VALUE.pack_into(self._mmap, position, current + value, max(seen, timestamp))
+
+    def _append(self, description: bytes, value: float, timestamp: float) -> int:
+        offset = self._used
+        position = offset + _aligned(_KEY_LENGTH.size + len(description))
+        end = position + _VALUE.size
+        if end > self._capacity:
+            self._grow(end)
+        _KEY_LENGTH.pack_into(self._mmap, offset, len(description))
+        self._mmap[offset + _KEY_LENGTH.size:offset + _KEY_LENGTH.size + len(description)] = description
+        _VALUE.pack_into(self._mmap, position, value, timestamp)
+        self._used = end
+        _HEADER.pack_into(self._mmap, 0, end, 0)
+        return position
+
+    def _grow(self, needed: int):
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        self._mmap.close()
+        self._file.truncate(capacity)
+        self._mmap = mmap.mmap(self._file.fileno(), capacity)
+        self._capacity = capacity
+
+    def compact(self, keep: Callable[[str], bool]) -> int:
+        """Rewrite the file with only the keys ``keep`` accepts; returns how many were dropped.
+
+        The new file replaces the old one atomically, so readers see one or
+        the other in full.
+        """
+        kept = [(description, value, timestamp)
+                for description, value, timestamp, _ in _entries(self._mmap, self._used)
+                if keep(json.loads(description)['key'])]
+        dropped = len(self._positions) - len(kept)
+        if not dropped:
+            return 0
+        if os.path.exists(self.path + '.compact'):
+            os.remove(self.path + '.compact')
+        fresh = MmapMetricFile(self.path + '.compact')
+        for description, value, timestamp in kept:
+            fresh._append(description, value, timestamp)
+        fresh.close()
+        os.replace(fresh.path, self.path)
+        self.close()
+        self._open()
+        return dropped
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+def read_metric_file(path: str) -> List[Tuple[Dict[str, Any], float, float]]:
+    """Read (description, value, timestamp) entries written by any process"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+    if len(data) < _HEADER.size:
+        return []
+    used = min(_HEADER.unpack_from(data, 0)[0], len(data))
+    return [(json.loads(description), value, timestamp)
+            for description, value, timestamp, _ in _entries(data, used)]
+
+def merge_metric_files(directory: str,
+                       max_age: Optional[float] = None) -> Dict[str, Tuple[Dict[str, Any], float, float]]:
+    """Combine every process's values by metric key.
+
+    Counters and histogram series are summed. Gauges are summed when
+    written with ``merge='sum'``; otherwise the most recent write wins.
+    With ``max_age``, matching the collectors' series TTL, a series is
+    skipped when no process has written it within that many seconds. A
+    series still written by a live worker keeps the counts of exited ones,
+    so its total never goes backwards. Stale gauge entries are left out
+    even for live series.
+    """
+    cutoff = time.time() - max_age if max_age else None
+    merged: Dict[str, List] = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.db'))):
+        for description, value, timestamp in read_metric_file(path):
+            if cutoff is not None and timestamp < cutoff and description['kind'] == 'gauge':
+                continue
+            current = merged.get(description['key'])
+            if current is None:
+                merged[description['key']] = [description, value, timestamp]
+            elif description['kind'] != 'gauge' or description.get('merge') == 'sum':
+                current[1] += value
+                current[2] = max(current[2], timestamp)
+            elif timestamp > current[2]:
+                current[1], current[2] = value, timestamp
+    return {key: tuple(entry) for key, entry in merged.items() if cutoff is None or entry[2] >= cutoff}
+
+def mark_process_dead(pid: int, directory: str, max_age: Optional[float] = None):
+    """Drop an exited worker's gauges and latency snapshot; fold its counters into the exited-workers file.
+
+    Call from the server's master only; it is the single writer of that
+    file. With ``max_age``, the folded file then drops series no process
+    has written within that many seconds, as ``merge_metric_files`` would
+    skip them anyway. A scrape racing the fold may count the worker twice
+    for the moment between writing the folded file and removing its own.
+    """
+    for path in (metric_file_path(directory, GAUGE_FILE, pid), os.path.join(directory, f'latency_{pid}.json')):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    path = metric_file_path(directory, DURABLE_FILE, pid)
+    if not os.path.exists(path):
+        return
+    exited = MmapMetricFile(os.path.join(directory, EXITED_FILE))
+    try:
+        exited.fold(read_metric_file(path))
+        os.remove(path)
+        if max_age:
+            visible = merge_metric_files(directory, max_age=max_age)
+            exited.compact(lambda key: key in visible)
+    finally:
+        exited.close()
+
+def clear_directory(directory: str):
+    """Remove every metric file; call once when the server starts"""
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, '*.db')) + glob.glob(os.path.join(directory, 'latency_*.json')):
+        os.remove(path)
+    logger.info(f"Cleared multiprocess metrics directory {directory}")
@@ -0,0 +1,152 @@
+"""
+Running Normalization for RL Futures Trading System
+Mergeable mean/variance statistics for observation and reward scaling
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_CLIP = 10.0
+DEFAULT_EPSILON = 1e-8
+
+class RunningMeanStd:
+    """Running mean and variance over batches (parallel Welford / Chan et al.).
+
+    Statistics are kept as count, mean and M2 (sum of squared deviations)
+    in float64. Two instances fed disjoint data merge into exactly the
+    statistics of the combined data, in any order.
+    """
+
+    def __init__(self, shape: Tuple[int, ...] = ()):
+        self.shape = tuple(shape)
+        self.count = 0
+        self.mean = np.zeros(self.shape, dtype=np.float64)
+        self.m2 = np.zeros(self.shape, dtype=np.float64)
+
+    @property
+    def var(self) -> np.ndarray:
+        """Population variance (zero until data arrives)"""
+        return self.m2 / self.count if self.count else np.zeros(self.shape)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.var)
+
+    def update(self, batch: np.ndarray):
+        """Fold a batch (leading axis = samples) into the statistics"""
+        batch = np.asarray(batch, dtype=np.float64).reshape((-1,) + self.shape)
+        if len(batch) == 0:
+            return
+        batch_mean = batch.mean(axis=0)
+        deviations = batch - batch_mean
+        batch_m2 = np.einsum('i...,i...->...', deviations, deviations)
+        self._combine(len(batch), batch_mean, batch_m2)
+
+    def merge(self, other: 'RunningMeanStd'):
+        """Fold another instance's statistics into this one"""
+        if other.shape != self.shape:
+            raise ValueError(f"Cannot merge statistics of shape {other.shape} into {self.shape}")
+        self._combine(other.count, other.mean, other.m2)
+
+    @classmethod
+    def merged(cls, parts: Iterable['RunningMeanStd']) -> 'RunningMeanStd':
+        """Combine per-worker statistics into a new instance"""
+        parts = list(parts)
+        combined = cls(parts[0].shape if parts else ())
+        for part in parts:
+            combined.merge(part)
+        return combined
+
+    def _combine(self, count: int, mean: np.ndarray, m2: np.ndarray):
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (count / total)
+        self.m2 = self.m2 + m2 + delta * delta * (self.count * count / total)
+        self.count = total
+
+    def state(self, prefix: str = '') -> Dict[str, np.ndarray]:
+        """Arrays describing the statistics, e.g. for a checkpoint"""
+        return {
+            f'{prefix}count': np.array([self.count], dtype=np.int64),
+            f'{prefix}mean': self.mean.copy(),
+            f'{prefix}m2': self.m2.copy(),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, np.ndarray], prefix: str = '') -> 'RunningMeanStd':
+        mean = np.asarray(state[f'{prefix}mean'], dtype=np.float64)
+        stats = cls(mean.shape)
+        stats.count = int(np.asarray(state[f'{prefix}count']).reshape(-1)[0])
+        stats.mean = mean.copy()
+        stats.m2 = np.asarray(state[f'{prefix}m2'], dtype=np.float64).copy()
+        return stats
+
+class Normalizer:
+    """Observation and reward normalization for n_envs parallel environments.
+
+    Observations are standardized per feature. Rewards are divided by the
+    standard deviation of the running discounted return, as in common PPO
+    setups, so their scale is stable across days with different
+    volatility. Statistics only update while ``training`` is True.
+    """
+
+    def __init__(self, obs_dim: int, n_envs: int = 1, gamma: float = 0.99,
+                 clip_obs: float = DEFAULT_CLIP, clip_reward: float = DEFAULT_CLIP,
+                 epsilon: float = DEFAULT_EPSILON):
+        self.obs_rms = RunningMeanStd((obs_dim,))
+        self.ret_rms = RunningMeanStd()
+        self.gamma = gamma
+        self.clip_obs = clip_obs
+        self.clip_reward = clip_reward
+        self.epsilon = epsilon
+        self.training = True
+        self._returns = np.zeros(n_envs, dtype=np.float64)
+
+    def normalize_obs(self, obs: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Standardize a batch of observations (updating statistics when training)"""
+        if self.training:
+            self.obs_rms.update(obs)
+        scale = 1.0 / np.sqrt(self.obs_rms.var + self.epsilon)
+        if out is None:
+            out = np.empty(np.shape(obs), dtype=np.float32)
+        np.subtract(obs, self.obs_rms.mean, out=out, casting='unsafe')
+        out *= scale.astype(out.dtype)
+        np.clip(out, -self.clip_obs, self.clip_obs, out=out)
+        return out
+
+    def normalize_reward(self, rewards: np.ndarray, dones: np.ndarray) -> np.ndarray:
+        """Scale one step of rewards for every environment"""
+        rewards = np.asarray(rewards, dtype=np.float64)
+        if self.training:
+            self._returns = self._returns * self.gamma + rewards
+            self.ret_rms.update(self._returns)
+            self._returns[np.asarray(dones, dtype=bool)] = 0.0
+        scaled = rewards / np.sqrt(self.ret_rms.var + self.epsilon)
+        return np.clip(scaled, -self.clip_reward, self.clip_reward).astype(np.float32)
+
+    def merge(self, other: 'Normalizer'):
+        """Fold another worker's statistics into this normalizer"""
+        self.obs_rms.merge(other.obs_rms)
+        self.ret_rms.merge(other.ret_rms)
+
+    def state(self, prefix: str = 'normalization/') -> Dict[str, np.ndarray]:
+        """Arrays for ``checkpoint_store.training_state(extra=...)``"""
+        return {
+            **self.obs_rms.state(f'{prefix}obs_'),
+            **self.ret_rms.state(f'{prefix}ret_'),
+            f'{prefix}settings': np.array([self.gamma, self.clip_obs, self.clip_reward, self.epsilon]),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, np.ndarray], prefix: str = 'normalization/',
+                   n_envs: int = 1) -> 'Normalizer':
+        """Rebuild a normalizer, e.g. from ``Checkpoint.arrays``"""
+        gamma, clip_obs, clip_reward, epsilon = np.asarray(state[f'{prefix}settings']).tolist()
+        obs_rms = RunningMeanStd.from_state(state, f'{prefix}obs_')
+        normalizer = cls(obs_rms.shape[0], n_envs, gamma, clip_obs, clip_reward, epsilon)
+        normalizer.obs_rms = obs_rms
+        normalizer.ret_rms = RunningMeanStd.from_state(state, f'{prefix}ret_')
+        return normalizer
@@ -0,0 +1,176 @@
+"""
+Actor-Critic Policy for RL Futures Trading System
+NumPy MLP with a categorical action head, a value head and manual backprop
+"""
+
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+# Discrete trading actions: short, flat, long
+N_ACTIONS = 3
+DEFAULT_HIDDEN_SIZES = (64, 64)
+
+class _Workspace:
+    """Preallocated activations and gradients for one batch size"""
+
+    def __init__(self, batch_size: int, hidden_sizes: Sequence[int], n_actions: int):
+        self.batch_size = batch_size
+        self.hidden = [np.empty((batch_size, size), dtype=np.float32) for size in hidden_sizes]
+        self.d_hidden = [np.empty((batch_size, size), dtype=np.float32) for size in hidden_sizes]
+        self.scratch = [np.empty((batch_size, size), dtype=np.float32) for size in hidden_sizes]
+        self.logits = np.empty((batch_size, n_actions), dtype=np.float32)
+        self.log_probs = np.empty((batch_size, n_actions), dtype=np.float32)
+        self.probs = np.empty((batch_size, n_actions), dtype=np.float32)
+        self.values = np.empty((batch_size, 1), dtype=np.float32)
+        self.d_logits = np.empty((batch_size, n_actions), dtype=np.float32)
+        self.d_values = np.empty((batch_size, 1), dtype=np.float32)
+        self.row = np.empty((batch_size, 1), dtype=np.float32)
+
+class MLPPolicy:
+    """Shared tanh trunk feeding a policy (logits) head and a value head.
+
+    Parameters and gradients are float32 arrays in ``params``/``grads``
+    keyed by layer name. Forward and backward passes write into per-batch-
+    size workspaces, so repeated calls with the same batch size allocate
+    nothing.
+    """
+
+    def __init__(self, obs_dim: int, n_actions: int = N_ACTIONS,
+                 hidden_sizes: Sequence[int] = DEFAULT_HIDDEN_SIZES, seed: int = 0):
+        self.obs_dim = obs_dim
+        self.n_actions = n_actions
+        self.hidden_sizes = tuple(hidden_sizes)
+        rng = np.random.default_rng(seed)
+
+        self.params: Dict[str, np.ndarray] = {}
+        fan_in = obs_dim
+        for layer, size in enumerate(self.hidden_sizes):
+            self.params[f'w{layer}'] = self._init_weights(rng, fan_in, size, np.sqrt(2))
+            self.params[f'b{layer}'] = np.zeros(size, dtype=np.float32)
+            fan_in = size
+        # Small policy weights start close to a uniform action distribution
+        self.params['w_pi'] = self._init_weights(rng, fan_in, n_actions, 0.01)
+        self.params['b_pi'] = np.zeros(n_actions, dtype=np.float32)
+        self.params['w_v'] = self._init_weights(rng, fan_in, 1, 1.0)
+        self.params['b_v'] = np.zeros(1, dtype=np.float32)
+
+        self.grads = {name: np.zeros_like(value) for name, value in self.params.items()}
+        self._workspaces: Dict[int, _Workspace] = {}
+
+    @staticmethod
+    def _init_weights(rng: np.random.Generator, fan_in: int, fan_out: int, gain: float) -> np.ndarray:
+        return (rng.standard_normal((fan_in, fan_out)) * gain / np.sqrt(fan_in)).astype(np.float32)
+
+    @property
+    def n_layers(self) -> int:
+        return len(self.hidden_sizes)
+
+    def workspace(self, batch_size: int) -> _Workspace:
+        """Get (creating once) the workspace for a batch size"""
+        workspace = self._workspaces.get(batch_size)
+        if workspace is None:
+            workspace = _Workspace(batch_size, self.hidden_sizes, self.n_actions)
+            self._workspaces[batch_size] = workspace
+        return workspace
+
+    def forward(self, obs: np.ndarray) -> _Workspace:
+        """Run the network; logits, log-probs, probs and values land in the workspace"""
+        ws = self.workspace(len(obs))
+        inputs = obs
+        for layer in range(self.n_layers):
+            np.matmul(inputs, self.params[f'w{layer}'], out=ws.hidden[layer])
+            ws.hidden[layer] += self.params[f'b{layer}']
+            np.tanh(ws.hidden[layer], out=ws.hidden[layer])
+            inputs = ws.hidden[layer]
+
+        np.matmul(inputs, self.params['w_pi'], out=ws.logits)
+        ws.logits += self.params['b_pi']
+        np.matmul(inputs, self.params['w_v'], out=ws.values)
+        ws.values += self.params['b_v']
+
+        # Numerically stable log-softmax
+        np.max(ws.logits, axis=1, keepdims=True, out=ws.row)
+        np.subtract(ws.logits, ws.row, out=ws.log_probs)
+        np.exp(ws.log_probs, out=ws.probs)
+        np.sum(ws.probs, axis=1, keepdims=True, out=ws.row)
+        np.log(ws.row, out=ws.row)
+        ws.log_probs -= ws.row
+        np.exp(ws.log_probs, out=ws.probs)
+        return ws
+
+    def backward(self, obs: np.ndarray, ws: _Workspace):
+        """Accumulate parameter gradients from ``ws.d_logits`` and ``ws.d_values``"""
+        last = ws.hidden[-1]
+        np.matmul(last.T, ws.d_logits, out=self.grads['w_pi'])
+        np.sum(ws.d_logits, axis=0, out=self.grads['b_pi'])
+        np.matmul(last.T, ws.d_values, out=self.grads['w_v'])
+        np.sum(ws.d_values, axis=0, out=self.grads['b_v'])
+
+        np.matmul(ws.d_logits, self.params['w_pi'].T, out=ws.d_hidden[-1])
+        np.matmul(ws.d_values, self.params['w_v'].T, out=ws.scratch[-1])
+        ws.d_hidden[-1] += ws.scratch[-1]
+
+        for layer in reversed(range(self.n_layers)):
+            # tanh' = 1 - tanh^2, applied in place on the upstream gradient
+            d_pre, scratch = ws.d_hidden[layer], ws.scratch[layer]
+            np.multiply(ws.hidden[layer], ws.hidden[layer], out=scratch)
+            np.subtract(1.0, scratch, out=scratch)
+            d_pre *= scratch
+            inputs = obs if layer == 0 else ws.hidden[layer - 1]
+            np.matmul(inputs.T, d_pre, out=self.grads[f'w{layer}'])
+            np.sum(d_pre, axis=0, out=self.grads[f'b{layer}'])
+            if layer > 0:
+                np.matmul(d_pre, self.params[f'w{layer}'].T, out=ws.d_hidden[layer - 1])
+
+    def act(self, obs: np.ndarray, rng: np.random.Generator,
+            deterministic: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Sample actions; returns (actions, log-probs, values) for a batch of observations"""
+        ws = self.forward(np.asarray(obs, dtype=np.float32))
+        if deterministic:
+            actions = ws.probs.argmax(axis=1)
+        else:
+            # Inverse-CDF sampling, one uniform draw per row
+            cumulative = np.cumsum(ws.probs, axis=1)
+            draws = rng.random((len(obs), 1), dtype=np.float32) * cumulative[:, -1:]
+            actions = np.minimum((cumulative < draws).sum(axis=1), self.n_actions - 1)
+        rows = np.arange(len(obs))
+        return actions, ws.log_probs[rows, actions].copy(), ws.values[:, 0].copy()
+
+class Adam:
+    """Adam optimizer updating parameters in place with preallocated moments"""
+
+    def __init__(self, params: Dict[str, np.ndarray], learning_rate: float = 3e-4,
+                 beta1: float = 0.9, beta2: float = 0.999, eps: float = 1e-8):
+        self.params = params
+        self.learning_rate = learning_rate
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.eps = eps
+        self.step_count = 0
+        self.m = {name: np.zeros_like(value) for name, value in params.items()}
+        self.v = {name: np.zeros_like(value) for name, value in params.items()}
+        self._scratch = {name: np.empty_like(value) for name, value in params.items()}
+
+    def step(self, grads: Dict[str, np.ndarray]):
+        """Apply one update from ``grads``"""
+        self.step_count += 1
+        correction1 = 1.0 - self.beta1 ** self.step_count
+        correction2 = 1.0 - self.beta2 ** self.step_count
+        step_size = np.float32(self.learning_rate * np.sqrt(correction2) / correction1)
+        eps = np.float32(self.eps * np.sqrt(correction2))
+
+        for name, param in self.params.items():
+            grad, m, v, scratch = grads[name], self.m[name], self.v[name], self._scratch[name]
+            m *= self.beta1
+            np.multiply(grad, 1.0 - self.beta1, out=scratch)
+            m += scratch
+            v *= self.beta2
+            np.multiply(grad, grad, out=scratch)
+            scratch *= 1.0 - self.beta2
+            v += scratch
+            np.sqrt(v, out=scratch)
+            scratch += eps
+            np.divide(m, scratch, out=scratch)
+            scratch *= step_size
+            param -= scratch
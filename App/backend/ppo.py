@@ -0,0 +1,157 @@
+"""
+PPO Training Core for RL Futures Trading System
+Clipped-objective policy updates over a preallocated rollout buffer
+"""
+
+from typing import Any, Dict
+
+import numpy as np
+
+from config_schema import DEFAULT_CONFIG
+from policy import Adam, MLPPolicy
+from rollout_buffer import Minibatch, RolloutBuffer
+
+DEFAULT_N_EPOCHS = 10
+DEFAULT_MAX_GRAD_NORM = 0.5
+
+class _LossWorkspace:
+    """Per-minibatch scratch arrays for the PPO loss and its gradient"""
+
+    def __init__(self, batch_size: int, n_actions: int):
+        self.rows = np.arange(batch_size, dtype=np.int64)
+        self.flat_index = np.empty(batch_size, dtype=np.int64)
+        self.log_probs = np.empty(batch_size, dtype=np.float32)
+        self.log_ratio = np.empty(batch_size, dtype=np.float32)
+        self.ratio = np.empty(batch_size, dtype=np.float32)
+        self.surrogate = np.empty(batch_size, dtype=np.float32)
+        self.clipped = np.empty(batch_size, dtype=np.float32)
+        self.unclipped = np.empty(batch_size, dtype=bool)
+        self.entropy = np.empty(batch_size, dtype=np.float32)
+        self.value_error = np.empty(batch_size, dtype=np.float32)
+        self.one_hot = np.zeros((batch_size, n_actions), dtype=np.float32)
+        self.per_action = np.empty((batch_size, n_actions), dtype=np.float32)
+
+class PPOTrainer:
+    """Runs PPO updates for an ``MLPPolicy`` using ``ppo_settings``.
+
+    ``n_steps``, ``batch_size``, ``gamma``, ``gae_lambda``, ``clip_range``,
+    ``ent_coef``, ``vf_coef`` and ``learning_rate`` come from the trading
+    configuration. All per-update arrays are created on the first update
+    and reused afterwards.
+    """
+
+    def __init__(self, policy: MLPPolicy, ppo_settings: Dict[str, Any] = None,
+                 n_epochs: int = DEFAULT_N_EPOCHS, max_grad_norm: float = DEFAULT_MAX_GRAD_NORM,
+                 seed: int = 0):
+        self.policy = policy
+        self.settings = {**DEFAULT_CONFIG['ppo_settings'], **(ppo_settings or {})}
+        self.n_epochs = n_epochs
+        self.max_grad_norm = max_grad_norm
+        self.optimizer = Adam(policy.params, self.settings['learning_rate'])
+        self.rng = np.random.default_rng(seed)
+        self.updates = 0
+        self._workspace = None
+
+    def make_buffer(self, n_envs: int = 1) -> RolloutBuffer:
+        """Create a rollout buffer sized from ``n_steps``"""
+        return RolloutBuffer(self.settings['n_steps'], n_envs, self.policy.obs_dim,
+                             self.settings['gamma'], self.settings['gae_lambda'])
+
+    def update(self, buffer: RolloutBuffer) -> Dict[str, float]:
+        """Run ``n_epochs`` passes of minibatch updates over a full buffer.
+
+        Expects ``buffer.compute_returns_and_advantage`` to have been called.
+        Returns losses and diagnostics averaged over all minibatches.
+        """
+        batch_size = self.settings['batch_size']
+        if self._workspace is None or len(self._workspace.rows) != batch_size:
+            self._workspace = _LossWorkspace(batch_size, self.policy.n_actions)
+
+        totals = {'policy_loss': 0.0, 'value_loss': 0.0, 'entropy': 0.0,
+                  'approx_kl': 0.0, 'clip_fraction': 0.0}
+        steps = 0
+        for _ in range(self.n_epochs):
+            for batch in buffer.minibatches(batch_size, self.rng):
+                for name, value in self._train_step(batch).items():
+                    totals[name] += value
+                steps += 1
+
+        self.updates += 1
+        return {name: total / max(steps, 1) for name, total in totals.items()}
+
+    def _train_step(self, batch: Minibatch) -> Dict[str, float]:
+        policy, work = self.policy, self._workspace
+        clip_range = self.settings['clip_range']
+        ent_coef = self.settings['ent_coef']
+        vf_coef = self.settings['vf_coef']
+        size = len(work.rows)
+
+        ws = policy.forward(batch.observations)
+
+        # Log-probability of the taken actions via a flat gather
+        np.multiply(work.rows, policy.n_actions, out=work.flat_index)
+        work.flat_index += batch.actions
+        np.take(ws.log_probs.reshape(-1), work.flat_index, out=work.log_probs, mode='clip')
+
+        np.subtract(work.log_probs, batch.old_log_probs, out=work.log_ratio)
+        np.exp(work.log_ratio, out=work.ratio)
+
+        advantages = batch.advantages
+        advantages -= advantages.mean()
+        advantages /= advantages.std() + 1e-8
+
+        # Clipped surrogate: min(r * A, clip(r) * A)
+        np.multiply(work.ratio, advantages, out=work.surrogate)
+        np.clip(work.ratio, 1.0 - clip_range, 1.0 + clip_range, out=work.clipped)
+        work.clipped *= advantages
+        np.less_equal(work.surrogate, work.clipped, out=work.unclipped)
+        policy_loss = -float(np.minimum(work.surrogate, work.clipped, out=work.clipped).mean())
+
+        # d(-mean(r * A))/d logits = (r * A / n) * (probs - one_hot), only where unclipped
+        work.surrogate *= work.unclipped
+        work.surrogate /= size
+        work.one_hot[:] = 0.0
+        np.put(work.one_hot, work.flat_index, 1.0)
+        np.subtract(ws.probs, work.one_hot, out=ws.d_logits)
+        ws.d_logits *= work.surrogate[:, None]
+
+        # Entropy bonus: d(-c * mean(H))/d logits = (c / n) * p * (log p + H)
+        np.multiply(ws.probs, ws.log_probs, out=work.per_action)
+        np.sum(work.per_action, axis=1, out=work.entropy)
+        work.entropy *= -1.0
+        np.add(ws.log_probs, work.entropy[:, None], out=work.per_action)
+        work.per_action *= ws.probs
+        work.per_action *= ent_coef / size
+        ws.d_logits += work.per_action
+
+        np.subtract(ws.values[:, 0], batch.returns, out=work.value_error)
+        value_loss = float(np.dot(work.value_error, work.value_error)) / size
+        np.multiply(work.value_error, 2.0 * vf_coef / size, out=ws.d_values[:, 0])
+
+        policy.backward(batch.observations, ws)
+        self._clip_gradients()
+        self.optimizer.step(policy.grads)
+
+        # approx KL = mean((r - 1) - log r)
+        approx_kl = float(work.ratio.mean() - 1.0 - work.log_ratio.mean())
+        np.subtract(work.ratio, 1.0, out=work.log_ratio)
+        np.abs(work.log_ratio, out=work.log_ratio)
+        np.greater(work.log_ratio, clip_range, out=work.unclipped)
+        clip_fraction = float(np.count_nonzero(work.unclipped)) / size
+
+        return {
+            'policy_loss': policy_loss,
+            'value_loss': value_loss,
+            'entropy': float(work.entropy.mean()),
+            'approx_kl': approx_kl,
+            'clip_fraction': clip_fraction,
+        }
+
+    def _clip_gradients(self):
+        """Scale all gradients in place so their global norm is at most max_grad_norm"""
+        grads = self.policy.grads.values()
+        norm = float(np.sqrt(sum(float(np.vdot(grad, grad)) for grad in grads)))
+        if norm > self.max_grad_norm:
+            scale = np.float32(self.max_grad_norm / (norm + 1e-6))
+            for grad in grads:
+                grad *= scale
@@ -0,0 +1,147 @@
+"""
+Request Metrics Middleware for RL Futures Trading System
+Times each request at the WSGI layer and records counts, latency, body sizes and in-flight requests
+"""
+
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+import logging
+from flask import Request
+
+from health import record_request
+from latency_sketch import record_latency
+from logging_config import log_request, log_security_event
+from metrics import (
+    UNMATCHED_ENDPOINT,
+    increment_request_counter,
+    record_request_duration,
+    record_request_size,
+    record_response_size,
+    set_active_connections
+)
+
+logger = logging.getLogger(__name__)
+
+# Environ key under which the Flask request registers itself, so the
+# middleware can read the matched endpoint once the response is done
+REQUEST_ENVIRON_KEY = 'rl_futures.request'
+
+class MeteredRequest(Request):
+    """Flask request that leaves a reference to itself in the WSGI environ"""
+
+    def __init__(self, environ, *args, **kwargs):
+        super().__init__(environ, *args, **kwargs)
+        environ[REQUEST_ENVIRON_KEY] = self
+
+class _MeteredBody:
+    """Response iterable that counts bytes sent and reports when the server closes it"""
+
+    def __init__(self, body: Iterable[bytes], on_close: Callable[[int], None]):
+        self._body = body
+        self._on_close = on_close
+        self._sent = 0
+
+    def __iter__(self):
+        for chunk in self._body:
+            self._sent += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            if hasattr(self._body, 'close'):
+                self._body.close()
+        finally:
+            on_close, self._on_close = self._on_close, None
+            if on_close is not None:
+                on_close(self._sent)
+
+class RequestMetricsMiddleware:
+    """WSGI middleware measuring the whole request lifecycle.
+
+    The clock starts before Flask sees the request and stops when the
+    server closes the response, so request hooks, security headers and
+    streaming the body are all included. Streamed responses such as the
+    training stream therefore report how long the connection stayed open.
+    ``before`` runs at the start of every request and must be cheap.
+    """
+
+    def __init__(self, app, before: Optional[Callable[[], None]] = None):
+        self.app = app
+        self.before = before
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        started = time.perf_counter_ns()
+        wall_started = time.time()
+        self._adjust_in_flight(1)
+        status = [500]
+
+        def capture_status(status_line, headers, exc_info=None):
+            status[0] = int(status_line[:3])
+            return start_response(status_line, headers, exc_info)
+
+        try:
+            if self.before is not None:
+                self.before()
+            body = self.app(environ, capture_status)
+        except BaseException:
+            self._finish(environ, started, wall_started, 500, 0)
+            raise
+        return _MeteredBody(body, lambda sent: self._finish(environ, started, wall_started, status[0], sent))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _adjust_in_flight(self, delta: int):
+        with self._lock:
+            self._in_flight += delta
+            set_active_connections(self._in_flight)
+
+    def _finish(self, environ, started: int, wall_started: float, status_code: int, sent: int):
+        duration = (time.perf_counter_ns() - started) / 1e9
+        self._adjust_in_flight(-1)
+        try:
+            request = environ.get(REQUEST_ENVIRON_KEY)
+            endpoint = request.endpoint if request is not None else None
+            method = environ.get('REQUEST_METHOD', '')
+            try:
+                received = int(environ.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                received = 0
+
+            increment_request_counter(method, endpoint, status_code)
+            record_request_duration(method, endpoint, duration)
+            record_request_size(method, endpoint, received)
+            record_response_size(method, endpoint, sent)
+            record_request(status_code < 500, duration)
+            record_latency(endpoint or UNMATCHED_ENDPOINT, duration)
+
+            ip_address = environ.get('REMOTE_ADDR')
+            user_agent = environ.get('HTTP_USER_AGENT')
+            log_request(
+                request_id=f"req_{int(wall_started * 1000)}",
+                method=method,
+                endpoint=endpoint,
+                status_code=status_code,
+                response_time=duration,
+                ip_address=ip_address,
+                user_agent=user_agent
+            )
+
+            # Log security events for failed requests
+            if status_code >= 400:
+                log_security_event(
+                    message=f"Request failed: {method} {endpoint}",
+                    level="WARNING",
+                    ip_address=ip_address,
+                    user_agent=user_agent,
+                    endpoint=endpoint,
+                    risk_level="medium" if status_code >= 500 else "low"
+                )
+        except Exception as e:
+            # Metrics must never turn a served response into an error
+            logger.error(f"Failed to record request metrics: {e}")
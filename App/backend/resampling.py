@@ -0,0 +1,55 @@
+"""
+Bar Resampling for RL Futures Trading System
+Aggregates 1-minute bars to coarser timeframes aligned to trading sessions
+"""
+
+import re
+
+import numpy as np
+
+from bar_data import SECONDS_PER_DAY, BarData, parse_session_time, trading_day_ids
+
+_TIMEFRAME_PATTERN = re.compile(r'^(\d+)([mhd])$')
+_UNIT_SECONDS = {'m': 60, 'h': 3600, 'd': SECONDS_PER_DAY}
+
+def parse_timeframe(timeframe: str) -> int:
+    """Convert a timeframe such as '5m', '1h' or '1d' to seconds"""
+    match = _TIMEFRAME_PATTERN.match(timeframe or '')
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid timeframe: {timeframe!r}")
+    seconds = int(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+    if seconds > SECONDS_PER_DAY:
+        raise ValueError("Timeframes longer than one session are not supported")
+    return seconds
+
+def resample(bars: BarData, interval: int, session_start: str = '17:00') -> BarData:
+    """Aggregate bars into ``interval``-second buckets aligned to session opens.
+
+    Buckets start at the session open (e.g. 17:00) and never span two
+    trading days; the last bucket of a session may be shorter. Each bucket
+    is labelled with its open time. Groups are formed from runs of equal
+    bucket keys, so input is expected in timestamp order.
+    """
+    if len(bars) == 0:
+        return BarData.empty()
+
+    timestamps = np.asarray(bars.timestamp)
+    shift = (SECONDS_PER_DAY - parse_session_time(session_start)) % SECONDS_PER_DAY
+    day_ids = trading_day_ids(timestamps, session_start)
+    session_open = day_ids * SECONDS_PER_DAY - shift
+    buckets = (timestamps - session_open) // interval
+
+    # One integer key per (trading day, bucket) so a single diff finds groups
+    buckets_per_day = -(-SECONDS_PER_DAY // interval)
+    keys = day_ids * buckets_per_day + buckets
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    ends = np.append(starts[1:], len(keys)) - 1
+
+    return BarData(
+        timestamp=(session_open[starts] + buckets[starts] * interval).astype(np.int64),
+        open=np.asarray(bars.open)[starts],
+        high=np.fmax.reduceat(np.asarray(bars.high), starts),
+        low=np.fmin.reduceat(np.asarray(bars.low), starts),
+        close=np.asarray(bars.close)[ends],
+        volume=np.add.reduceat(np.asarray(bars.volume), starts),
+    )
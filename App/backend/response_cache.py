@@ -0,0 +1,196 @@
+"""
+Response Cache for RL Futures Trading System
+Keeps serialized, pre-compressed GET responses with ETags until the state they depend on changes
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import logging
+from flask import current_app, request
+
+from compression import MIN_COMPRESS_BYTES, CompressedBody, negotiate_encoding
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_ENTRY_BYTES = 4 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 300.0
+
+CacheKey = Tuple[int, str, Tuple, Tuple, str]
+
+class CachedResponse:
+    """One serialized response body with its compressed form and validators"""
+
+    __slots__ = ('body', 'compressed', 'mimetype', 'etag', 'dataset_id', 'expires')
+
+    def __init__(self, body: bytes, mimetype: str, dataset_id: Optional[str], expires: float):
+        self.body = body
+        self.mimetype = mimetype
+        self.dataset_id = dataset_id
+        self.expires = expires
+        self.etag = hashlib.blake2b(body, digest_size=12).hexdigest()
+        # Small bodies grow when compressed; they are always sent as is
+        self.compressed = CompressedBody(body) if len(body) >= MIN_COMPRESS_BYTES else None
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + (len(self.compressed) if self.compressed is not None else 0)
+
+class ResponseCache:
+    """In-process LRU of successful GET responses.
+
+    Entries are keyed by endpoint, view arguments, query string and Accept
+    header (data views negotiate their format on it), plus a generation
+    number that ``invalidate()`` bumps when configuration or
+    uploaded data changes. Responses that belong to a dataset can be dropped
+    on their own with ``invalidate(dataset_id)``. Each worker process keeps
+    its own cache, so entries also expire after ``ttl`` seconds to bound
+    how long another worker's change can go unseen.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_entry_bytes: int = DEFAULT_MAX_ENTRY_BYTES,
+                 ttl: float = DEFAULT_TTL_SECONDS, enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.ttl = ttl
+        self.enabled = enabled
+        self.generation = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'stores': 0, 'evictions': 0,
+                      'invalidations': 0}
+
+    def key(self, endpoint: str, view_args: Dict[str, Any], query: Iterable[Tuple[str, str]],
+            accept: str = '') -> CacheKey:
+        return (self.generation, endpoint, tuple(sorted(view_args.items())), tuple(sorted(query)), accept)
+
+    def get(self, key: CacheKey) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry
+
+    def put(self, key: CacheKey, body: bytes, mimetype: str,
+            dataset_id: Optional[str] = None) -> Optional[CachedResponse]:
+        """Store a body; returns None when it is too large to cache"""
+        if len(body) > self.max_entry_bytes:
+            return None
+        entry = CachedResponse(body, mimetype, dataset_id, time.monotonic() + self.ttl)
+        with self._lock:
+            # A write that raced with invalidate() belongs to an old generation
+            if key[0] != self.generation:
+                return entry
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self.stats['stores'] += 1
+            while self._bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self.stats['evictions'] += 1
+        return entry
+
+    def invalidate(self, dataset_id: Optional[str] = None):
+        """Drop every entry, or only the entries of one dataset"""
+        with self._lock:
+            if dataset_id is None:
+                self.generation += 1
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                for key in [key for key, entry in self._entries.items() if entry.dataset_id == dataset_id]:
+                    self._remove(key)
+            self.stats['invalidations'] += 1
+
+    def count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _remove(self, key: CacheKey):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+response_cache = ResponseCache(
+    max_bytes=int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)),
+    ttl=float(os.environ.get('RESPONSE_CACHE_TTL', DEFAULT_TTL_SECONDS)),
+    enabled=os.environ.get('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true',
+)
+
+def _etag_matches(entry: CachedResponse) -> bool:
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    # Weak comparison: the compressed and identity variants share one validator
+    tags = {tag.strip().removeprefix('W/').strip('"').partition('-')[0] for tag in header.split(',')}
+    return entry.etag in tags
+
+def serve_cached(entry: CachedResponse):
+    """Build the response for a cache entry, honouring If-None-Match and Accept-Encoding"""
+    coding = negotiate_encoding(request.headers.get('Accept-Encoding')) if entry.compressed else None
+    if _etag_matches(entry):
+        response = current_app.response_class(status=304)
+        response_cache.count('not_modified')
+    else:
+        response = current_app.response_class(entry.compressed.encode(coding) if coding else entry.body,
+                                              mimetype=entry.mimetype)
+        if coding:
+            response.headers['Content-Encoding'] = coding
+    response.headers['ETag'] = f'"{entry.etag}-{coding}"' if coding else f'"{entry.etag}"'
+    response.headers['Vary'] = 'Accept, Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def cached_response(dataset_arg: Optional[str] = None):
+    """Decorator to serve successful GET responses from the response cache.
+
+    ``dataset_arg`` names the view argument holding a dataset id, so the
+    entries can be invalidated per dataset. Other methods pass through.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method != 'GET' or not response_cache.enabled:
+                return f(*args, **kwargs)
+
+            key = response_cache.key(request.endpoint, kwargs, request.args.items(multi=True),
+                                     request.headers.get('Accept', ''))
+            entry = response_cache.get(key)
+            if entry is None:
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                entry = response_cache.put(key, response.get_data(), response.mimetype,
+                                           kwargs.get(dataset_arg) if dataset_arg else None)
+                if entry is None:
+                    return response
+            return serve_cached(entry)
+        return decorated_function
+    return decorator
+
+def get_response_cache() -> ResponseCache:
+    """Get the global response cache instance"""
+    return response_cache
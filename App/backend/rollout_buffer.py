@@ -0,0 +1,143 @@
+"""
+Rollout Buffer for RL Futures Trading System
+Preallocated float32 storage for PPO rollouts with vectorized GAE and minibatching
+"""
+
+from typing import Iterator
+
+import numpy as np
+
+class Minibatch:
+    """Preallocated arrays that each minibatch is gathered into"""
+
+    def __init__(self, batch_size: int, obs_dim: int):
+        self.observations = np.empty((batch_size, obs_dim), dtype=np.float32)
+        self.actions = np.empty(batch_size, dtype=np.int64)
+        self.old_values = np.empty(batch_size, dtype=np.float32)
+        self.old_log_probs = np.empty(batch_size, dtype=np.float32)
+        self.advantages = np.empty(batch_size, dtype=np.float32)
+        self.returns = np.empty(batch_size, dtype=np.float32)
+
+class RolloutBuffer:
+    """Fixed-size rollout storage shaped (n_steps, n_envs, ...).
+
+    Every array is allocated once in the constructor and reused across
+    iterations: ``reset`` only rewinds the write position, GAE writes into
+    the advantage and return arrays in place, and minibatches are gathered
+    through a shuffled index array into preallocated ``Minibatch`` arrays.
+    """
+
+    def __init__(self, n_steps: int, n_envs: int, obs_dim: int,
+                 gamma: float = 0.99, gae_lambda: float = 0.95):
+        self.n_steps = n_steps
+        self.n_envs = n_envs
+        self.obs_dim = obs_dim
+        self.gamma = gamma
+        self.gae_lambda = gae_lambda
+
+        shape = (n_steps, n_envs)
+        self.observations = np.zeros(shape + (obs_dim,), dtype=np.float32)
+        self.actions = np.zeros(shape, dtype=np.int64)
+        self.rewards = np.zeros(shape, dtype=np.float32)
+        # dones[t] marks that the episode ended after step t
+        self.dones = np.zeros(shape, dtype=np.float32)
+        self.values = np.zeros(shape, dtype=np.float32)
+        self.log_probs = np.zeros(shape, dtype=np.float32)
+        self.advantages = np.zeros(shape, dtype=np.float32)
+        self.returns = np.zeros(shape, dtype=np.float32)
+
+        # Scratch space for the GAE scan
+        self._next_values = np.zeros(shape, dtype=np.float32)
+        self._discounts = np.zeros(shape, dtype=np.float32)
+        self._last_gae = np.zeros(n_envs, dtype=np.float32)
+
+        self._indices = np.arange(self.size, dtype=np.int64)
+        self._minibatches = {}
+        self.pos = 0
+
+    @property
+    def size(self) -> int:
+        return self.n_steps * self.n_envs
+
+    @property
+    def full(self) -> bool:
+        return self.pos == self.n_steps
+
+    def reset(self):
+        """Rewind for the next rollout without freeing any storage"""
+        self.pos = 0
+
+    def add(self, obs: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+            dones: np.ndarray, values: np.ndarray, log_probs: np.ndarray):
+        """Store one step for every environment"""
+        if self.full:
+            raise IndexError("Rollout buffer is full")
+        step = self.pos
+        self.observations[step] = obs
+        self.actions[step] = actions
+        self.rewards[step] = rewards
+        self.dones[step] = dones
+        self.values[step] = values
+        self.log_probs[step] = log_probs
+        self.pos += 1
+
+    def compute_returns_and_advantage(self, last_values: np.ndarray):
+        """Generalized Advantage Estimation over the whole rollout.
+
+        TD residuals for all steps and environments are computed as whole-
+        array operations; only the backward recurrence
+        ``A[t] = delta[t] + gamma * lambda * (1 - done[t]) * A[t + 1]`` loops
+        over time, updating every environment at once.
+        """
+        next_values, discounts = self._next_values, self._discounts
+        next_values[:-1] = self.values[1:]
+        next_values[-1] = last_values
+
+        # discounts = gamma * (1 - done); deltas go straight into advantages
+        np.subtract(1.0, self.dones, out=discounts)
+        discounts *= self.gamma
+        deltas = self.advantages
+        np.multiply(discounts, next_values, out=deltas)
+        deltas += self.rewards
+        deltas -= self.values
+
+        discounts *= self.gae_lambda
+        last_gae = self._last_gae
+        last_gae[:] = 0.0
+        for step in range(self.n_steps - 1, -1, -1):
+            last_gae *= discounts[step]
+            last_gae += deltas[step]
+            deltas[step] = last_gae
+
+        np.add(self.advantages, self.values, out=self.returns)
+
+    def minibatches(self, batch_size: int, rng: np.random.Generator) -> Iterator[Minibatch]:
+        """Yield shuffled minibatches covering the rollout once.
+
+        The same ``Minibatch`` object is refilled for every batch, so callers
+        must finish with one before advancing the iterator. A trailing
+        partial batch is dropped.
+        """
+        batch = self._minibatches.get(batch_size)
+        if batch is None:
+            batch = Minibatch(batch_size, self.obs_dim)
+            self._minibatches[batch_size] = batch
+
+        rng.shuffle(self._indices)
+        # Flattened views of the (n_steps, n_envs) arrays; no copies
+        observations = self.observations.reshape(self.size, self.obs_dim)
+        sources = (
+            (self.actions.reshape(-1), batch.actions),
+            (self.values.reshape(-1), batch.old_values),
+            (self.log_probs.reshape(-1), batch.old_log_probs),
+            (self.advantages.reshape(-1), batch.advantages),
+            (self.returns.reshape(-1), batch.returns),
+        )
+
+        for start in range(0, self.size - batch_size + 1, batch_size):
+            indices = self._indices[start:start + batch_size]
+            # mode='clip' lets take write straight into ``out`` (indices are in range)
+            np.take(observations, indices, axis=0, out=batch.observations, mode='clip')
+            for source, target in sources:
+                np.take(source, indices, out=target, mode='clip')
+            yield batch
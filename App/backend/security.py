@@ -4,18 +4,46 @@ Provides input validation, sanitization, and security utilities.
 """
 
 import re
-import html
 import json
 from typing import Any, Dict, List, Optional, Union
 from flask import request, jsonify, current_app
 from functools import wraps
 import logging
+import os
+import threading
 import time
+from collections import deque
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Control characters stripped from string input (everything below 0x20 except
+# tab, newline and carriage return, plus DEL)
+_CONTROL_CHARS = [c for c in range(0x20) if c not in (0x09, 0x0A, 0x0D)] + [0x7F]
+
+# Single-pass translation table: drop control characters and HTML-escape the
+# same characters as html.escape(value, quote=True)
+_SANITIZE_TABLE = {c: None for c in _CONTROL_CHARS}
+_SANITIZE_TABLE.update({
+    ord('&'): '&amp;',
+    ord('<'): '&lt;',
+    ord('>'): '&gt;',
+    ord('"'): '&quot;',
+    ord("'"): '&#x27;',
+})
+
+# Matches any character the translation table would change
+_UNSAFE_CHARS = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F&<>"\']')
+
+# Precompiled validation patterns
+_EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_PATH_CHARS = re.compile(r'[./\\]')
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^\w\-_.]')
+_DATASET_ID_PATTERN = re.compile(r'^[0-9a-f]{40}$')
+
+# Default budgets for sanitize_input
+MAX_SANITIZE_DEPTH = 32
+MAX_SANITIZE_ITEMS = 100_000
+
 class SecurityError(Exception):
     """Custom exception for security-related errors."""
     pass
@@ -32,13 +60,12 @@ class InputValidator:
         if len(value) > max_length:
             raise SecurityError(f"Input too long. Maximum length: {max_length}")
         
-        # Remove null bytes and control characters
-        value = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', value)
-        
-        # HTML escape to prevent XSS
-        value = html.escape(value)
+        # Fast path: already-clean strings are returned without a copy
+        if _UNSAFE_CHARS.search(value) is None:
+            return value.strip()
         
-        return value.strip()
+        # Remove control characters and HTML escape in a single pass
+        return value.translate(_SANITIZE_TABLE).strip()
     
     @staticmethod
     def validate_email(email: str) -> str:
@@ -47,9 +74,8 @@ class InputValidator:
             raise SecurityError("Email is required")
         
         email = email.lower().strip()
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
         
-        if not re.match(email_pattern, email):
+        if not _EMAIL_PATTERN.match(email):
             raise SecurityError("Invalid email format")
         
         return email
@@ -92,54 +118,80 @@ class InputValidator:
             raise SecurityError("Filename is required")
         
         # Remove path traversal attempts
-        filename = re.sub(r'[./\\]', '_', filename)
+        filename = _PATH_CHARS.sub('_', filename)
         
         # Remove dangerous characters
-        filename = re.sub(r'[^\w\-_.]', '', filename)
+        filename = _UNSAFE_FILENAME_CHARS.sub('', filename)
         
         if not filename:
             raise SecurityError("Invalid filename")
         
         return filename
 
+    @staticmethod
+    def validate_dataset_id(dataset_id: str) -> str:
+        """Validate a content-hash dataset identifier."""
+        if not isinstance(dataset_id, str) or not _DATASET_ID_PATTERN.match(dataset_id):
+            raise SecurityError("Invalid dataset id")
+        
+        return dataset_id
+
 class RateLimiter:
-    """Simple in-memory rate limiter for development."""
+    """Simple in-memory rate limiter for development.
+    
+    Requests are counted per (scope, IP) over a sliding window. The rate
+    limit decorator scopes by endpoint, so each route has its own budget.
+    """
     
     def __init__(self):
-        self.requests = {}
-        self.max_requests = 100  # requests per window
-        self.window_size = 60    # seconds
+        self.requests: Dict[tuple, deque] = {}
+        self.max_requests = 100  # default requests per window
+        self.window_size = 60    # default window, seconds
+        self._lock = threading.Lock()
+        # Load tests switch limiting off to measure the serving stack itself
+        self.enabled = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() != 'false'
     
-    def is_allowed(self, ip: str) -> bool:
-        """Check if IP is allowed to make a request."""
-        current_time = int(time.time())
-        window_start = current_time - self.window_size
-        
-        # Clean old entries
-        if ip in self.requests:
-            self.requests[ip] = [t for t in self.requests[ip] if t > window_start]
-        
-        # Check rate limit
-        if ip not in self.requests:
-            self.requests[ip] = []
-        
-        if len(self.requests[ip]) >= self.max_requests:
-            return False
+    def is_allowed(self, ip: str, max_requests: Optional[int] = None, window: Optional[float] = None,
+                   scope: str = '') -> bool:
+        """Check if IP is allowed to make a request within a scope."""
+        if not self.enabled:
+            return True
+        max_requests = self.max_requests if max_requests is None else max_requests
+        window = self.window_size if window is None else window
+        current_time = time.monotonic()
+        window_start = current_time - window
         
-        self.requests[ip].append(current_time)
-        return True
+        with self._lock:
+            timestamps = self.requests.get((scope, ip))
+            if timestamps is None:
+                timestamps = self.requests[(scope, ip)] = deque()
+            
+            # Clean old entries
+            while timestamps and timestamps[0] <= window_start:
+                timestamps.popleft()
+            
+            # Check rate limit
+            if len(timestamps) >= max_requests:
+                return False
+            
+            timestamps.append(current_time)
+            return True
 
 # Global rate limiter instance
 rate_limiter = RateLimiter()
 
-def require_validation(required_fields: List[str] = None):
-    """Decorator to require input validation."""
+def require_validation(required_fields: List[str] = None, allow_files: bool = False):
+    """Decorator to require input validation.
+    
+    With ``allow_files`` set, multipart requests carrying files skip the JSON
+    field check and are validated by the view itself.
+    """
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             try:
                 # Validate required fields
-                if required_fields:
+                if required_fields and not (allow_files and request.files):
                     data = request.get_json() or {}
                     for field in required_fields:
                         if field not in data:
@@ -157,13 +209,13 @@ def require_validation(required_fields: List[str] = None):
     return decorator
 
 def rate_limit(max_requests: int = 100, window: int = 60):
-    """Decorator to apply rate limiting."""
+    """Decorator to apply a per-route rate limit of ``max_requests`` per ``window`` seconds per IP."""
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             ip = request.remote_addr
             
-            if not rate_limiter.is_allowed(ip):
+            if not rate_limiter.is_allowed(ip, max_requests, window, scope=f.__name__):
                 logger.warning(f"Rate limit exceeded for IP: {ip}")
                 return jsonify({'error': 'Rate limit exceeded'}), 429
             
@@ -171,21 +223,57 @@ def rate_limit(max_requests: int = 100, window: int = 60):
         return decorated_function
     return decorator
 
-def sanitize_input(data: Union[str, Dict, List]) -> Union[str, Dict, List]:
-    """Recursively sanitize input data."""
+def sanitize_input(data: Union[str, Dict, List], max_length: int = 1000,
+                   max_depth: int = MAX_SANITIZE_DEPTH,
+                   max_items: int = MAX_SANITIZE_ITEMS) -> Union[str, Dict, List]:
+    """Sanitize nested input data iteratively.
+    
+    Walks dicts and lists with an explicit stack instead of recursion, so
+    deeply nested payloads fail with a SecurityError once they exceed
+    ``max_depth`` rather than hitting the interpreter recursion limit.
+    ``max_items`` bounds the total number of values visited.
+    """
     if isinstance(data, str):
-        return InputValidator.sanitize_string(data)
-    elif isinstance(data, dict):
-        return {k: sanitize_input(v) for k, v in data.items()}
-    elif isinstance(data, list):
-        return [sanitize_input(item) for item in data]
-    else:
+        return InputValidator.sanitize_string(data, max_length)
+    if not isinstance(data, (dict, list)):
         return data
+    
+    sanitize_string = InputValidator.sanitize_string
+    root = {} if isinstance(data, dict) else []
+    stack = [(data, root, 1)]
+    items = 0
+    
+    while stack:
+        source, target, depth = stack.pop()
+        if depth > max_depth:
+            raise SecurityError(f"Input nested too deeply. Maximum depth: {max_depth}")
+        
+        items += len(source)
+        if items > max_items:
+            raise SecurityError(f"Input too large. Maximum items: {max_items}")
+        
+        is_dict = isinstance(source, dict)
+        for key, value in (source.items() if is_dict else enumerate(source)):
+            if isinstance(value, str):
+                value = sanitize_string(value, max_length)
+            elif isinstance(value, (dict, list)):
+                child = {} if isinstance(value, dict) else []
+                stack.append((value, child, depth + 1))
+                value = child
+            
+            if is_dict:
+                target[key] = value
+            else:
+                target.append(value)
+    
+    return root
 
 # Security middleware
-def security_middleware():
+def security_middleware(app=None):
     """Apply security headers and checks to all responses."""
-    @current_app.after_request
+    app = app or current_app
+    
+    @app.after_request
     def add_security_headers(response):
         # Security headers
         response.headers['X-Content-Type-Options'] = 'nosniff'
@@ -1,5 +1,11 @@
+import os
+import subprocess
+import sys
+
 import pytest
-from app import app
+from app import DATA_MODULES, app, create_app
+
+HEALTH_STATUSES = {'healthy', 'degraded', 'unhealthy'}
 
 @pytest.fixture
 def client():
@@ -13,14 +19,14 @@ class TestApp:
         response = client.get('/health')
         
         assert response.status_code == 200
-        assert response.json['status'] == 'ok'
+        assert response.json['status'] in HEALTH_STATUSES
     
     def test_root_endpoint(self, client):
         """Test the root endpoint returns correct response"""
         response = client.get('/')
         
         assert response.status_code == 200
-        assert response.data.decode('utf-8') == 'Backend is running'
+        assert response.json['status'] == 'running'
     
     def test_health_endpoint_methods(self, client):
         """Test that health endpoint only accepts GET method"""
@@ -56,7 +62,8 @@ class TestApp:
         
         assert response.content_type == 'application/json'
         assert 'status' in response.json
-        assert response.json['status'] == 'ok'
+        assert response.json['status'] in HEALTH_STATUSES
+        assert {'timestamp', 'uptime', 'system', 'application'} <= set(response.json)
     
     def test_nonexistent_endpoint(self, client):
         """Test that nonexistent endpoints return 404"""
@@ -78,7 +85,8 @@ class TestApp:
         response = client.get('/')
         
         assert response.status_code == 200
-        assert 'text/html' in response.content_type or 'text/plain' in response.content_type
+        assert 'application/json' in response.content_type
+        assert response.headers['X-Content-Type-Options'] == 'nosniff'
     
     def test_multiple_health_requests(self, client):
         """Test that health endpoint handles multiple requests correctly"""
@@ -86,7 +94,7 @@ class TestApp:
         for i in range(5):
             response = client.get('/health')
             assert response.status_code == 200
-            assert response.json['status'] == 'ok'
+            assert response.json['status'] in HEALTH_STATUSES
     
     def test_health_endpoint_performance(self, client):
         """Test that health endpoint responds quickly"""
@@ -112,12 +120,55 @@ class TestApp:
         """Test the exact content of health endpoint"""
         response = client.get('/health')
         
-        expected_content = {'status': 'ok'}
-        assert response.json == expected_content
+        assert set(response.json['system']) == {
+            'cpu_percent', 'memory_percent', 'memory_available_gb', 'disk_percent', 'disk_free_gb'
+        }
+        assert response.json['application']['requests_total'] >= 0
     
     def test_root_endpoint_content(self, client):
         """Test the exact content of root endpoint"""
         response = client.get('/')
         
-        expected_content = 'Backend is running'
-        assert response.data.decode('utf-8') == expected_content
+        assert response.json['message'] == 'RL Futures Trading System Backend'
+        assert response.json['endpoints']['health'] == '/health'
+
+
+class TestAppFactory:
+    def test_import_has_no_side_effects(self, tmp_path):
+        """Importing the module opens no files, starts no threads and defers NumPy"""
+        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        script = (
+            "import logging, sys, threading\n"
+            f"sys.path.insert(0, {backend_dir!r})\n"
+            "import app\n"
+            "app.create_app()\n"
+            "print(len(logging.getLogger().handlers), threading.active_count(), 'numpy' in sys.modules)\n"
+        )
+        result = subprocess.run([sys.executable, '-c', script], cwd=tmp_path, capture_output=True, text=True)
+        
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.split() == ['0', '1', 'False']
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_config_overrides_and_endpoint_names(self):
+        """create_app applies overrides and keeps view names as endpoints"""
+        application = create_app({'MAX_CONTENT_LENGTH': 1024, 'SETUP_LOGGING': False})
+        
+        assert application.config['MAX_CONTENT_LENGTH'] == 1024
+        endpoints = {rule.endpoint for rule in application.url_map.iter_rules()}
+        assert {'health', 'upload_file', 'config_endpoint', 'training_stream'} <= endpoints
+    
+    def test_preload_imports_data_modules(self):
+        """PRELOAD_MODULES imports the NumPy-backed modules up front"""
+        create_app({'PRELOAD_MODULES': True, 'SETUP_LOGGING': False})
+        
+        assert all(module in sys.modules for module in DATA_MODULES)
+    
+    def test_training_stream_is_refused_without_threaded_workers(self):
+        """Sync workers answer the training stream with 503 instead of holding the worker"""
+        application = create_app({'STREAMING_RESPONSES': False, 'SETUP_LOGGING': False, 'TESTING': True})
+        
+        with application.test_client() as client:
+            response = client.get('/api/training/stream')
+        
+        assert response.status_code == 503
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from backtest import crossover_backtest, crossover_grid, summarize
+from bar_data import BarData, build_day_index
+from config_schema import DEFAULT_CONFIG
+from indicators import ema
+
+PARAMS = DEFAULT_CONFIG['trading_params']
+
+
+def make_bars(days=3, per_day=300, seed=3):
+    rng = np.random.default_rng(seed)
+    n = days * per_day
+    # 17:00 UTC session opens, one bar per minute
+    timestamp = (np.repeat(np.arange(days), per_day) * 86400 + 1704128400
+                 + np.tile(np.arange(per_day), days) * 60).astype(np.int64)
+    close = 4800 + np.cumsum(rng.normal(0, 2, n)).round(2)
+    return BarData(timestamp=timestamp, open=close, high=close + 1, low=close - 1,
+                   close=close, volume=np.ones(n))
+
+
+def reference_day(close, fast, slow, params):
+    """Bar-by-bar loop over one day for a single combo"""
+    cost = params['commissions'] + params['slippage'] * params['contract_value']
+    position, running, peak, drawdown = 0, 0.0, 0.0, 0.0
+    trades, wins, trade_pnl, stopped = 0, 0, 0.0, False
+    for t in range(len(close)):
+        if t > 0:
+            move = position * (close[t] - close[t - 1]) * params['contract_value']
+            running += move
+            trade_pnl += move
+        if running >= params['daily_profit_target'] or running <= -params['daily_max_loss_limit']:
+            stopped = True
+        target = 0 if stopped or t == len(close) - 1 else int(np.sign(fast[t] - slow[t]))
+        if target != position:
+            if position:
+                running -= cost
+                trades += 1
+                wins += trade_pnl - cost > 0
+            if target:
+                running -= cost
+                trade_pnl = -cost
+            position = target
+        peak = max(peak, running)
+        drawdown = max(drawdown, peak - running)
+    return running, drawdown, trades, wins
+
+
+def test_matches_bar_by_bar_reference():
+    bars = make_bars()
+    day_index = build_day_index(bars.timestamp)
+    combos = crossover_grid([3, 5, 8], [8, 21])
+    columns = {p: ema(bars.close, p) for p in np.unique(combos)}
+    params = {**PARAMS, 'daily_profit_target': 150, 'daily_max_loss_limit': 120}
+
+    result = crossover_backtest(bars, day_index, columns, combos, params)
+
+    for k, (fast, slow) in enumerate(combos):
+        for day in range(len(day_index)):
+            window = day_index.day_slice(day)
+            pnl, drawdown, trades, wins = reference_day(
+                bars.close[window], columns[fast][window], columns[slow][window], params)
+            assert result.pnl[k, day] == pytest.approx(pnl)
+            assert result.drawdown[k, day] == pytest.approx(drawdown)
+            assert (result.trades[k, day], result.wins[k, day]) == (trades, wins)
+
+
+def test_grid_and_summary():
+    combos = crossover_grid(range(5, 30, 5), [20, 50])
+    assert combos.tolist() == [[5, 20], [5, 50], [10, 20], [10, 50], [15, 20], [15, 50], [20, 50], [25, 50]]
+
+    bars = make_bars()
+    columns = {p: ema(bars.close, p) for p in np.unique(combos)}
+    result = crossover_backtest(bars, build_day_index(bars.timestamp), columns, combos, PARAMS)
+    summary = summarize(result, top=2)
+
+    totals = [entry['total_pnl'] for entry in summary['ranking']]
+    assert totals == sorted(totals, reverse=True)
+    assert len(summary['per_day']['pnl']) == 2
+    assert len(summary['per_day']['pnl'][0]) == len(summary['per_day']['days']) == 3
+    assert summary['performance']['combo_bars'] == 8 * len(bars)
+
+
+def test_grid_rejects_oversized_sweeps():
+    with pytest.raises(ValueError):
+        crossover_grid(range(1, 200), range(200, 400))
+
+
+def test_ema_budget_bounds_periods_times_bars(monkeypatch):
+    import backtest
+    from backtest import check_ema_budget
+
+    check_ema_budget(2001, 10_000)
+    with pytest.raises(ValueError, match='distinct EMA periods'):
+        check_ema_budget(2001, 1_000_000)
+
+    monkeypatch.setattr(backtest, 'MAX_EMA_COLUMN_BYTES', 8 * 100)
+    check_ema_budget(10, 10)
+    with pytest.raises(ValueError):
+        check_ema_budget(11, 10)
@@ -0,0 +1,91 @@
+import io
+
+import numpy as np
+import pytest
+
+from bar_data import (
+    DataFormatError,
+    build_day_index,
+    get_file_type,
+    parse_csv_stream,
+    parse_csv_text,
+    parse_excel_stream,
+    parse_row_dicts,
+)
+
+
+def test_parse_csv_uses_column_aliases():
+    bars = parse_csv_text(
+        'Date,open_price,High,lowPrice,Close\n'
+        '2024-01-02 17:00:00,1,2,0.5,1.5\n'
+        '\n'
+        '01/02/2024 17:01,1.5,2.5,,2\n'
+    )
+
+    assert len(bars) == 2
+    assert bars.timestamp.dtype == np.int64
+    assert bars.timestamp[1] - bars.timestamp[0] == 60
+    assert bars.high.tolist() == [2.0, 2.5]
+    assert np.isnan(bars.low[1])
+    assert bars.volume.tolist() == [0.0, 0.0]
+
+
+def test_parse_csv_in_chunks_matches_single_pass():
+    lines = ['time,open,high,low,close'] + [
+        f'2024-01-02 {i // 60:02d}:{i % 60:02d}:00,{i},{i + 1},{i - 1},{i}' for i in range(250)
+    ]
+    chunked = parse_csv_stream(lines, chunk_rows=7)
+    assert chunked.close.tolist() == [float(i) for i in range(250)]
+
+
+def test_parse_rows_and_missing_columns():
+    bars = parse_row_dicts([{'time': '2024-01-02T09:30', 'Open': 1, 'High': 2, 'Low': 0, 'Close': 1}])
+    assert bars.open.tolist() == [1.0]
+
+    with pytest.raises(DataFormatError, match='close'):
+        parse_row_dicts([{'time': '2024-01-02', 'open': 1, 'high': 2, 'low': 0}])
+
+
+def test_day_index_splits_sessions_at_session_start():
+    timestamps = np.array([
+        '2024-01-02T16:59', '2024-01-02T17:00', '2024-01-03T15:59', '2024-01-03T17:30',
+    ], dtype='datetime64[s]').astype(np.int64)
+
+    index = build_day_index(timestamps, '17:00')
+
+    assert index.offsets.tolist() == [0, 1, 3, 4]
+    assert index.day_labels() == ['2024-01-02', '2024-01-03', '2024-01-04']
+
+
+def test_parse_excel_streams_every_matching_worksheet():
+    openpyxl = pytest.importorskip('openpyxl')
+    from datetime import datetime
+
+    workbook = openpyxl.Workbook()
+    first = workbook.active
+    first.append(['Time', 'Open', 'High', 'Low', 'Close', 'Volume'])
+    for minute in range(5):
+        first.append([datetime(2024, 1, 2, 9, minute), 1, 2, 0.5, 1.5, 10])
+    notes = workbook.create_sheet('notes')
+    notes.append(['comment'])
+    notes.append(['not bar data'])
+    second = workbook.create_sheet('more')
+    second.append(['date', 'openPrice', 'highPrice', 'lowPrice', 'closePrice'])
+    second.append([datetime(2024, 1, 2, 9, 5), 2, 3, 1, 2.5])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+
+    bars = parse_excel_stream(buffer, chunk_rows=2)
+
+    assert len(bars) == 6
+    assert np.all(np.diff(bars.timestamp) == 60)
+    assert bars.volume.tolist() == [10.0] * 5 + [0.0]
+
+
+def test_file_types():
+    assert get_file_type('ES.CSV') == 'csv'
+    assert get_file_type('es.xlsx') == 'excel'
+    with pytest.raises(DataFormatError):
+        get_file_type('es.xls')
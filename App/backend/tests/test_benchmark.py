@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from benchmark import ClientTarget, build_scenarios, compare, measure_startup, run_scenario
+from dataset_cache import dataset_cache
+
+
+@pytest.fixture
+def target(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_cache, 'root', str(tmp_path))
+    monkeypatch.setattr(dataset_cache, '_entries', None)
+    target = ClientTarget()
+    yield target
+    target.close()
+
+
+def test_scenarios_cover_endpoints_and_payload_sizes():
+    scenarios = {scenario.name: scenario for scenario in build_scenarios(['1k', '64k'])}
+
+    assert {'health', 'metrics', 'config_get', 'config_post', 'validate_1k', 'upload_64k'} <= set(scenarios)
+    upload = scenarios['upload_64k']
+    assert 60 * 1024 < upload.payload_bytes <= 64 * 1024
+    # Every iteration is a distinct dataset, so uploads are parsed rather than cached
+    assert upload.body(0) != upload.body(1)
+    assert json.loads(upload.body(0))['data'].startswith('time,open,high,low,close,volume\n')
+
+
+def test_run_scenario_reports_latency_and_status(target):
+    scenarios = {scenario.name: scenario for scenario in build_scenarios(['1k'])}
+
+    for name in ('health', 'config_post', 'validate_1k', 'upload_1k'):
+        result = run_scenario(target, scenarios[name], iterations=5)
+        assert result['requests'] == 5
+        assert result['statuses'] == {'200': 5}, name
+        assert 0 < result['p50_ms'] <= result['p95_ms'] <= result['p99_ms'] <= result['max_ms']
+
+
+def test_compare_flags_only_regressions_beyond_threshold_and_noise():
+    baseline = {'results': {
+        'client/health': {'p50_ms': 1.0, 'p95_ms': 2.0},
+        'client/upload_1m': {'p50_ms': 100.0, 'p95_ms': 120.0},
+    }}
+    current = {'results': {
+        'client/health': {'p50_ms': 1.4, 'p95_ms': 2.2},
+        'client/upload_1m': {'p50_ms': 140.0, 'p95_ms': 125.0},
+        'client/new_scenario': {'p50_ms': 5.0, 'p95_ms': 6.0},
+    }}
+
+    regressions = compare(baseline, current, threshold=0.25)
+    assert [(r['scenario'], r['stat']) for r in regressions] == [('client/upload_1m', 'p50_ms')]
+    assert regressions[0]['change'] == 0.4
+
+
+def test_measure_startup_reports_each_phase():
+    results = measure_startup(runs=1)
+
+    assert set(results) == {f'startup/{phase}' for phase in (
+        'process', 'import', 'create_app', 'first_request', 'first_data_request', 'create_app_preload')}
+    assert all(result['errors'] == 0 and result['p50_ms'] > 0 for result in results.values())
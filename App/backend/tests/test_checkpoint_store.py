@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from checkpoint_store import CheckpointStore, training_state, warm_start
+from policy import Adam, MLPPolicy
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(str(tmp_path), keep_last=2)
+
+
+def test_round_trip_and_warm_start(store):
+    policy = MLPPolicy(obs_dim=6, hidden_sizes=(8,), seed=1)
+    optimizer = Adam(policy.params)
+    policy.grads['w0'][:] = 1.0
+    optimizer.step(policy.grads)
+    config = {'ppo_settings': {'n_steps': 2048}}
+
+    checkpoint_id = store.save(training_state(policy, optimizer, {'norm/mean': np.arange(6.0)}),
+                               config, step=10, trading_day='2024-01-02', score=1.5)
+    checkpoint = store.load(checkpoint_id)
+
+    assert checkpoint.config == config
+    assert isinstance(checkpoint.arrays['policy/w0'].base, np.memmap)
+    np.testing.assert_array_equal(checkpoint.arrays['norm/mean'], np.arange(6.0))
+
+    restored = MLPPolicy(obs_dim=6, hidden_sizes=(8,), seed=2)
+    restored_optimizer = Adam(restored.params)
+    warm_start(checkpoint, restored, restored_optimizer)
+
+    obs = np.ones((3, 6), dtype=np.float32)
+    np.testing.assert_array_equal(restored.forward(obs).logits, policy.forward(obs).logits)
+    np.testing.assert_array_equal(restored_optimizer.m['w0'], optimizer.m['w0'])
+    assert restored_optimizer.step_count == 1
+
+    # Training after a warm start must not write back into the checkpoint
+    restored_optimizer.step(policy.grads)
+    np.testing.assert_array_equal(store.load(checkpoint_id).arrays['policy/w0'], policy.params['w0'])
+
+
+def test_keeps_last_n_plus_best_per_day(store):
+    arrays = {'x': np.zeros(3, dtype=np.float32)}
+    ids = {}
+    for step, day, score in [(1, 'd1', 5.0), (2, 'd1', 9.0), (3, 'd1', 1.0),
+                             (4, 'd2', 2.0), (5, 'd2', 1.0), (6, None, None)]:
+        ids[step] = store.save(arrays, step=step, trading_day=day, score=score)
+
+    kept = [manifest['step'] for manifest in store.list()]
+    assert kept == [2, 4, 5, 6]
+    assert store.best('d1') == ids[2]
+    assert store.best() == ids[2]
+    assert store.latest() == ids[6]
+
+
+def test_warm_start_rejects_mismatched_architecture(store):
+    checkpoint_id = store.save(training_state(MLPPolicy(obs_dim=4, hidden_sizes=(8,))))
+    with pytest.raises(ValueError):
+        warm_start(store.load(checkpoint_id), MLPPolicy(obs_dim=4, hidden_sizes=(16,)))
+
+
+def test_restart_at_lower_step_keeps_new_checkpoint(store):
+    arrays = {'x': np.zeros(3, dtype=np.float32)}
+    for step in (1000, 2000, 3000):
+        store.save(arrays, step=step)
+
+    restarted = store.save(arrays, step=10)
+
+    assert store.latest() == restarted
+    assert [manifest['step'] for manifest in store.list()] == [3000, 10]
+    assert store.load(restarted).manifest['step'] == 10
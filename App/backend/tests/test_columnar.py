@@ -0,0 +1,55 @@
+import json
+
+import numpy as np
+import pytest
+
+from bar_data import BarData
+from columnar import ALIGNMENT, decode_columnar, encode_columnar
+from data_preview import build_pyramid, minmax_series, page_rows
+
+
+def test_round_trip_keeps_dtypes_nan_and_meta():
+    columns = {
+        'time': np.arange(5, dtype=np.int64) * 60,
+        'close': np.array([1.5, np.nan, 2.25, 3.0, 4.0]),
+        'flags': np.array([1, 0, 1, 1, 0], dtype=np.uint8),
+    }
+    meta, decoded = decode_columnar(encode_columnar(columns, {'dataset_id': 'abc', 'total': 5}))
+
+    assert meta == {'dataset_id': 'abc', 'total': 5}
+    for name, values in columns.items():
+        assert decoded[name].dtype == values.dtype
+        np.testing.assert_array_equal(decoded[name], values)
+
+
+def test_columns_are_aligned_for_typed_array_views():
+    payload = encode_columnar({'flags': np.ones(3, dtype=np.uint8), 'close': np.arange(3.0)})
+    header_length = int.from_bytes(payload[4:8], 'little')
+    header = json.loads(payload[8:8 + header_length])
+
+    assert (8 + header_length) % ALIGNMENT == 0
+    assert [column['offset'] % ALIGNMENT for column in header['columns']] == [0, 0]
+    assert len(payload) == 8 + header_length + 8 + 3 * 8
+
+
+def test_rejects_unsupported_columns():
+    with pytest.raises(ValueError):
+        encode_columnar({'grid': np.zeros((2, 2))})
+    with pytest.raises(ValueError):
+        encode_columnar({'label': np.array(['a', 'b'])})
+
+
+def test_preview_columns_match_json_values():
+    n = 2_000
+    close = 100 + np.cumsum(np.random.default_rng(2).normal(size=n))
+    bars = BarData(timestamp=60 * np.arange(n, dtype=np.int64), open=close.copy(), high=close + 1,
+                   low=close - 1, close=close, volume=np.ones(n))
+
+    as_json = page_rows(bars, offset=10, limit=50)
+    as_columns = page_rows(bars, offset=10, limit=50, columnar=True)
+    assert as_columns['rows']['close'].tolist() == as_json['rows']['close']
+    assert as_columns['rows']['time'][0] == 600
+
+    series = minmax_series(bars, build_pyramid(bars), width=100, columnar=True)
+    assert series['series']['index'].dtype == np.int64
+    assert series['points'] == len(series['series']['close'])
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from bar_data import BAR_COLUMNS, BarData, trading_day_ids
+from compressed_bars import CompressedBarReader, CompressedFormatError, detect_decimals, write_compressed
+
+
+def make_bars(n=20000, start=1704232800):
+    rng = np.random.default_rng(7)
+    close = 4800 + np.cumsum(rng.integers(-4, 5, n)) * 0.25
+    return BarData(
+        timestamp=start + np.arange(n, dtype=np.int64) * 60,
+        open=close - 0.25,
+        high=close + 0.5,
+        low=close - 0.75,
+        close=close,
+        volume=rng.integers(0, 500, n).astype(np.float64),
+    )
+
+
+def assert_same(left, right):
+    for name in BAR_COLUMNS:
+        np.testing.assert_array_equal(getattr(left, name), getattr(right, name))
+
+
+@pytest.mark.parametrize('codec', ['zlib', 'lzma'])
+def test_round_trip_is_lossless(tmp_path, codec):
+    bars = make_bars()
+    bars.close[5] = np.nan
+    path = str(tmp_path / 'bars.rlfb')
+
+    stored = write_compressed(path, bars, codec, block_rows=1000)
+    restored = CompressedBarReader(path).read_all()
+
+    assert_same(bars, restored)
+    assert stored['raw_bytes'] / stored['compressed_bytes'] > 5
+
+
+def test_unscalable_prices_fall_back_to_raw_floats(tmp_path):
+    bars = make_bars(500)
+    bars.open[:] = np.random.default_rng(1).random(500)
+    path = str(tmp_path / 'bars.rlfb')
+
+    stored = write_compressed(path, bars)
+
+    assert stored['decimals']['open'] is None
+    assert stored['decimals']['close'] == 2
+    assert_same(bars, CompressedBarReader(path).read_all())
+
+
+def test_read_day_matches_trading_day_ids(tmp_path):
+    bars = make_bars(3 * 1440, start=1704110400)  # 2024-01-01 12:00 UTC
+    path = str(tmp_path / 'bars.rlfb')
+    write_compressed(path, bars, block_rows=500)
+    reader = CompressedBarReader(path)
+
+    day_ids = trading_day_ids(bars.timestamp)
+    day = reader.read_day(int(day_ids[2000]))
+
+    np.testing.assert_array_equal(day.timestamp, bars.timestamp[day_ids == day_ids[2000]])
+    assert len(day) == 1440
+    assert len(reader.read_range(0, 1)) == 0
+
+
+def test_detect_decimals():
+    assert detect_decimals(np.array([4800.25, 4800.5, np.nan])) == 2
+    assert detect_decimals(np.array([1.0, 2.0])) == 0
+    assert detect_decimals(np.array([np.pi])) is None
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / 'bars.rlfb'
+    path.write_bytes(b'not a bar file at all')
+    with pytest.raises(CompressedFormatError):
+        CompressedBarReader(str(path))
+
+
+def test_infinite_values_round_trip(tmp_path):
+    bars = make_bars(3000)
+    bars.volume[10] = np.inf
+    bars.high[2500] = -np.inf
+    bars.close[2501] = np.nan
+    path = str(tmp_path / 'bars.rlfb')
+
+    write_compressed(path, bars, 'zlib', block_rows=1000)
+
+    assert_same(bars, CompressedBarReader(path).read_all())
@@ -0,0 +1,35 @@
+import gzip
+import zlib
+
+from flask import Response
+
+from compression import CompressedBody, compress_response, negotiate_encoding
+
+
+def test_negotiation_honours_weights():
+    assert negotiate_encoding('gzip, deflate, br') == 'gzip'
+    assert negotiate_encoding('deflate;q=1.0, gzip;q=0.5') == 'deflate'
+    assert negotiate_encoding('gzip;q=0, deflate') == 'deflate'
+    assert negotiate_encoding('*') == 'gzip'
+    assert negotiate_encoding('br, identity') is None
+    assert negotiate_encoding(None) is None
+
+
+def test_one_compression_pass_frames_both_codings():
+    body = b'{"close": [4800.25, 4800.5, 4800.75]}' * 200
+    compressed = CompressedBody(body)
+
+    assert gzip.decompress(compressed.encode('gzip')) == body
+    assert zlib.decompress(compressed.encode('deflate')) == body
+
+
+def test_compress_response_threshold_and_exclusions():
+    large = Response(b'x' * 4096, mimetype='application/json')
+    compress_response(large, 'gzip')
+    assert large.headers['Content-Encoding'] == 'gzip'
+    assert int(large.headers['Content-Length']) == len(large.get_data()) < 4096
+
+    small = compress_response(Response(b'{}', mimetype='application/json'), 'gzip')
+    stream = compress_response(Response(b'data: x\n\n' * 512, mimetype='text/event-stream'), 'gzip')
+    assert 'Content-Encoding' not in small.headers
+    assert 'Content-Encoding' not in stream.headers
@@ -0,0 +1,50 @@
+import pytest
+
+from config_schema import DEFAULT_CONFIG, ConfigValidationError, validate_config
+
+
+def test_default_config_is_valid():
+    assert validate_config(DEFAULT_CONFIG) == DEFAULT_CONFIG
+
+
+def test_partial_config_is_accepted_and_coerced():
+    validated = validate_config({'ppo_settings': {'n_steps': 4096.0, 'gamma': 1}})
+    assert validated == {'ppo_settings': {'n_steps': 4096, 'gamma': 1}}
+    assert isinstance(validated['ppo_settings']['n_steps'], int)
+
+
+def test_all_errors_are_reported_together():
+    with pytest.raises(ConfigValidationError) as exc_info:
+        validate_config({
+            'ppo_settings': {'learning_rate': 0, 'gamma': 1.5, 'n_steps': 'many'},
+            'trading_params': {'slippage': True},
+            'day_mastery': {'start_time': '25:00'},
+            'unknown_section': {},
+        })
+
+    errors = exc_info.value.errors
+    assert 'ppo_settings.learning_rate: must be > 0' in errors
+    assert 'ppo_settings.gamma: must be <= 1' in errors
+    assert 'ppo_settings.n_steps: must be a number' in errors
+    assert 'trading_params.slippage: must be a number' in errors
+    assert 'day_mastery.start_time: has an invalid format' in errors
+    assert 'unknown_section: unknown section' in errors
+
+
+def test_cross_field_relations():
+    with pytest.raises(ConfigValidationError) as exc_info:
+        validate_config({
+            'ppo_settings': {'batch_size': 4096},
+            'data_indicators': {'ema1_period': 60},
+        })
+
+    assert exc_info.value.errors == [
+        'ppo_settings.batch_size: must be <= n_steps',
+        'data_indicators.ema1_period: must be < ema2_period',
+    ]
+
+
+@pytest.mark.parametrize('value', [float('nan'), float('inf'), 13.5])
+def test_integer_fields_reject_non_integral_values(value):
+    with pytest.raises(ConfigValidationError):
+        validate_config({'data_indicators': {'ema1_period': value}})
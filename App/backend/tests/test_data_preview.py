@@ -0,0 +1,70 @@
+import numpy as np
+
+from bar_data import BarData
+from data_preview import PYRAMID_FACTOR, build_pyramid, lttb_indices, lttb_series, minmax_series, page_rows
+
+
+def _bars(n):
+    close = 100 + np.cumsum(np.random.default_rng(1).normal(size=n))
+    return BarData(
+        timestamp=60 * np.arange(n, dtype=np.int64),
+        open=close.copy(),
+        high=close + 1,
+        low=close - 1,
+        close=close,
+        volume=np.ones(n),
+    )
+
+
+def test_page_rows_clamps_and_serializes_nan():
+    bars = _bars(10)
+    bars.close[9] = np.nan
+
+    page = page_rows(bars, offset=8, limit=5)
+
+    assert page['total'] == 10
+    assert page['rows']['time'] == ['1970-01-01T00:08:00', '1970-01-01T00:09:00']
+    assert page['rows']['close'][1] is None
+
+
+def test_pyramid_levels_shrink_by_factor():
+    bars = _bars(10_000)
+    pyramid = build_pyramid(bars)
+
+    assert len(pyramid[0]['close']) == 10_000 // PYRAMID_FACTOR
+    assert pyramid[0]['high'][0] == bars.high[:PYRAMID_FACTOR].max()
+    assert pyramid[1]['low'][0] == bars.low[:PYRAMID_FACTOR ** 2].min()
+
+
+def test_minmax_series_preserves_extremes_within_width():
+    bars = _bars(50_000)
+    result = minmax_series(bars, build_pyramid(bars), width=300)
+
+    assert result['points'] <= 300
+    assert max(result['series']['high']) == bars.high.max()
+    assert min(result['series']['low']) == bars.low.min()
+
+
+def test_small_ranges_use_raw_bars():
+    bars = _bars(50_000)
+    result = minmax_series(bars, build_pyramid(bars), width=500, start=1000, end=1100)
+
+    assert result['series']['index'] == list(range(1000, 1100))
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    y = np.zeros(1000)
+    y[437] = 50
+    chosen = lttb_indices(np.arange(1000, dtype=float), y, 20)
+
+    assert len(chosen) == 20
+    assert chosen[0] == 0 and chosen[-1] == 999
+    assert 437 in chosen
+
+
+def test_lttb_series_width():
+    bars = _bars(20_000)
+    result = lttb_series(bars, build_pyramid(bars), width=100)
+
+    assert result['points'] == 100
+    assert result['method'] == 'lttb'
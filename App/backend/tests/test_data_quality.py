@@ -0,0 +1,83 @@
+import numpy as np
+
+from bar_data import BarData, build_day_index
+from data_quality import QualityThresholds, validate_bars
+
+
+def _bars(timestamps, close, spread=1.0):
+    timestamp = np.array(timestamps, dtype='datetime64[s]').astype(np.int64)
+    close = np.array(close, dtype=float)
+    return BarData(
+        timestamp=timestamp,
+        open=close.copy(),
+        high=close + spread,
+        low=close - spread,
+        close=close,
+        volume=np.zeros(len(close)),
+    )
+
+
+def test_clean_data_is_valid():
+    times = np.arange('2024-01-02T09:00', '2024-01-02T10:00', dtype='datetime64[m]')
+    bars = _bars(times, 100 + np.sin(np.arange(len(times))))
+
+    report = validate_bars(bars, build_day_index(bars.timestamp))
+
+    assert report['valid']
+    assert report['days'] == 1
+    assert not any(report['summary'].values())
+
+
+def test_each_check_is_counted_per_day():
+    bars = _bars([
+        '2024-01-02T09:00', '2024-01-02T09:01', '2024-01-02T09:01', '2024-01-02T09:05',
+        '2024-01-02T09:04', '2024-01-02T17:00', '2024-01-02T17:01', '2024-01-02T17:02',
+    ], [100, 100, 100, 100, 100, 100, 100, 100])
+    bars.high[1] = 90
+    bars.close[6] = np.nan
+    bars.low[7] = 0
+    bars.close[7] = 0
+
+    report = validate_bars(bars, build_day_index(bars.timestamp, '17:00'))
+    summary = report['summary']
+
+    assert not report['valid']
+    assert summary['duplicate_timestamps'] == 1
+    assert summary['non_monotonic_timestamps'] == 1
+    assert summary['gaps'] == 1
+    assert summary['missing_bars'] == 3
+    assert summary['ohlc_inconsistent'] == 1
+    assert summary['missing_prices'] == 1
+    assert summary['non_positive_prices'] == 1
+    assert report['samples']['duplicate_timestamps'] == [3]
+
+    first_day, second_day = report['per_day']
+    assert (first_day['date'], first_day['bars']) == ('2024-01-02', 5)
+    assert second_day['date'] == '2024-01-03'
+    # The drop to 0 after the missing close is measured from the last known close
+    assert second_day['issues'] == {'missing_prices': 1, 'non_positive_prices': 1, 'outlier_jumps': 1}
+
+
+def test_session_breaks_are_not_gaps_and_outliers_use_atr():
+    bars = _bars(['2024-01-02T15:59', '2024-01-02T17:00', '2024-01-02T17:01'], [100, 100, 200], spread=0.5)
+
+    report = validate_bars(bars, build_day_index(bars.timestamp),
+                           QualityThresholds(atr_period=2, outlier_atr_multiple=5))
+
+    assert report['summary']['gaps'] == 0
+    assert report['summary']['outlier_jumps'] == 1
+    assert report['valid']
+
+
+def test_missing_price_does_not_hide_later_outliers():
+    timestamps = np.datetime64('2024-01-02T00:00') + np.arange(2000) * np.timedelta64(1, 'm')
+    close = 4800 + np.sin(np.arange(2000) / 10.0)
+    close[1500:] += 500
+    close[10] = np.nan
+    bars = _bars(timestamps, close)
+
+    report = validate_bars(bars, build_day_index(bars.timestamp))
+
+    assert report['summary']['missing_prices'] == 1
+    assert report['summary']['outlier_jumps'] == 1
+    assert report['samples']['outlier_jumps'] == [1501]
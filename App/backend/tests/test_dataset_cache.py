@@ -0,0 +1,158 @@
+import numpy as np
+import pytest
+
+from bar_data import parse_csv_text
+from config_schema import DEFAULT_CONFIG
+from compressed_bars import CompressedBarReader
+from dataset_cache import COMPRESSED_BARS_FILE, DatasetCache, hash_text
+
+CSV = 'time,open,high,low,close\n' + '\n'.join(
+    f'2024-01-02 {i // 60:02d}:{i % 60:02d}:00,{100 + i % 5},{101 + i % 5},{99 + i % 5},{100 + i % 5}'
+    for i in range(600)
+)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DatasetCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+
+
+def test_repeat_ingest_is_served_from_cache(cache):
+    dataset_id, _ = hash_text(CSV)
+    config = DEFAULT_CONFIG['data_indicators']
+    calls = []
+
+    def parse():
+        calls.append(1)
+        return parse_csv_text(CSV)
+
+    first, cached_first = cache.ingest(dataset_id, parse, config)
+    second, cached_second = cache.ingest(dataset_id, parse, config)
+
+    assert (cached_first, cached_second) == (False, True)
+    assert calls == [1]
+    assert first == second
+    assert first['rows'] == 600
+
+    bars = cache.get_bars(dataset_id)
+    names, matrix = cache.indicators.get_matrix(dataset_id, bars, config)
+    assert matrix.shape == (600, len(names))
+
+
+def test_changing_one_period_recomputes_one_column(cache):
+    dataset_id, _ = hash_text(CSV)
+    config = dict(DEFAULT_CONFIG['data_indicators'])
+    cache.ingest(dataset_id, lambda: parse_csv_text(CSV), config)
+    computed = cache.indicators.stats['columns_computed']
+
+    cache.ingest(dataset_id, lambda: parse_csv_text(CSV), {**config, 'ema2_period': 60})
+
+    assert cache.indicators.stats['columns_computed'] == computed + 1
+
+
+def test_indicator_columns_are_loaded_from_disk(tmp_path):
+    dataset_id, _ = hash_text(CSV)
+    config = DEFAULT_CONFIG['data_indicators']
+    DatasetCache(str(tmp_path)).ingest(dataset_id, lambda: parse_csv_text(CSV), config)
+
+    cache = DatasetCache(str(tmp_path))
+    bars = cache.get_bars(dataset_id)
+    column = cache.indicators.get_column(dataset_id, bars, 'ema', {'period': 13})
+
+    assert type(column) is np.ndarray and not column.flags.writeable
+    assert cache.indicators.stats['columns_computed'] == 0
+    assert cache.indicators.stats['disk_hits'] == 1
+
+
+def test_memory_level_respects_byte_budget(tmp_path):
+    cache = DatasetCache(str(tmp_path), indicator_memory_bytes=600 * 8 * 2)
+    dataset_id, _ = hash_text(CSV)
+    cache.ingest(dataset_id, lambda: parse_csv_text(CSV), DEFAULT_CONFIG['data_indicators'])
+
+    assert cache.indicators.memory_bytes() <= 600 * 8 * 2
+    assert cache.indicators.stats['evictions'] > 0
+
+
+def test_lru_eviction_respects_disk_budget(tmp_path):
+    cache = DatasetCache(str(tmp_path), max_bytes=1)
+    bars = parse_csv_text(CSV)
+
+    cache.put_bars('a' * 40, bars)
+    cache.put_bars('b' * 40, bars)
+
+    assert not cache.contains('a' * 40)
+    assert cache.contains('b' * 40)
+
+
+def test_resampled_timeframes_are_cached(cache):
+    dataset_id, _ = hash_text(CSV)
+    cache.ingest(dataset_id, lambda: parse_csv_text(CSV), DEFAULT_CONFIG['data_indicators'])
+    bars = cache.get_bars(dataset_id)
+
+    computed = cache.ensure_timeframe(dataset_id, bars, '15m')
+    stored = cache.get_timeframe(dataset_id, '15m', '17:00')
+
+    assert len(computed) == 40
+    assert isinstance(stored.close, np.memmap)
+    np.testing.assert_array_equal(stored.close, computed.close)
+
+
+def test_compressed_cache_serves_bars_and_single_days(tmp_path):
+    dataset_id, _ = hash_text(CSV)
+    cache = DatasetCache(str(tmp_path), compression='zlib')
+    cache.ingest(dataset_id, lambda: parse_csv_text(CSV), DEFAULT_CONFIG['data_indicators'])
+
+    assert cache.get_metadata(dataset_id)['compression']['codec'] == 'zlib'
+    bars = cache.get_bars(dataset_id)
+    np.testing.assert_array_equal(bars.close, parse_csv_text(CSV).close)
+
+    _, day_index = cache.get_dataset(dataset_id)
+    day = cache.get_day_bars(dataset_id, int(day_index.day_ids[0]))
+    assert len(day) == 600
+
+
+
+def test_compressed_bars_are_decompressed_once(tmp_path, monkeypatch):
+    dataset_id, _ = hash_text(CSV)
+    cache = DatasetCache(str(tmp_path), compression='zlib')
+    cache.ingest(dataset_id, lambda: parse_csv_text(CSV), DEFAULT_CONFIG['data_indicators'])
+    first = cache.get_bars(dataset_id)
+
+    def fail(self):
+        raise AssertionError("decompressed again")
+    monkeypatch.setattr(CompressedBarReader, 'read_all', fail)
+
+    assert cache.get_bars(dataset_id) is first
+    assert not first.close.flags.writeable
+
+
+def test_corrupt_compressed_dataset_is_discarded(tmp_path):
+    dataset_id, _ = hash_text(CSV)
+    cache = DatasetCache(str(tmp_path), compression='zlib')
+    cache.ingest(dataset_id, lambda: parse_csv_text(CSV), DEFAULT_CONFIG['data_indicators'])
+    cache._forget_decompressed(dataset_id)
+
+    path = cache.dataset_path(dataset_id, COMPRESSED_BARS_FILE)
+    reader = CompressedBarReader(path)
+    with open(path, 'r+b') as f:
+        f.seek(int(reader.index[0]['offset']) + 8)
+        f.write(b'\xff' * 16)
+
+    assert cache.get_bars(dataset_id) is None
+    assert not cache.contains(dataset_id)
+
+def test_hot_indicator_columns_are_resident_and_budgeted(tmp_path):
+    cache = DatasetCache(str(tmp_path), indicator_memory_bytes=3 * 600 * 8)
+    dataset_id, _ = hash_text(CSV)
+    cache.ingest(dataset_id, lambda: parse_csv_text(CSV), DEFAULT_CONFIG['data_indicators'])
+    bars = cache.get_bars(dataset_id)
+    indicators = cache.indicators
+    indicators.invalidate(dataset_id)
+    evictions = indicators.stats['evictions']
+
+    for period in (5, 10, 20, 50):
+        indicators.get_column(dataset_id, bars, 'ema', {'period': period})
+
+    # The budget counts resident bytes, not mapped files
+    assert indicators.memory_bytes() == 3 * 600 * 8
+    assert indicators.stats['evictions'] == evictions + 1
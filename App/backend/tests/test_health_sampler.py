@@ -0,0 +1,27 @@
+import time
+
+from health import HealthMonitor, SystemSampler
+
+
+def test_snapshot_is_served_from_background_samples():
+    sampler = SystemSampler(interval=60)
+    first = sampler.snapshot()
+
+    started = time.perf_counter()
+    for _ in range(20):
+        assert sampler.snapshot() is first
+    assert time.perf_counter() - started < 0.1
+    sampler.stop()
+
+
+def test_health_reports_sample_age_without_blocking():
+    monitor = HealthMonitor(SystemSampler(interval=60))
+    monitor.get_system_health()
+
+    started = time.perf_counter()
+    health = monitor.get_detailed_health()
+    assert time.perf_counter() - started < 0.1
+    assert health['sample_age_seconds'] >= 0
+    assert 'pid' in health['processes']
+    assert 'bytes_sent' in health['network']
+    monitor.sampler.stop()
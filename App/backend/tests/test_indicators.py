@@ -0,0 +1,36 @@
+import numpy as np
+
+from indicators import atr, ema, rolling_mean_std
+
+
+def _loop_ema(values, alpha):
+    out = np.empty_like(values)
+    previous = values[0]
+    for i, value in enumerate(values):
+        previous = (1 - alpha) * previous + alpha * value
+        out[i] = previous
+    return out
+
+
+def test_blocked_ema_matches_recurrence():
+    values = np.cumsum(np.random.default_rng(0).normal(size=5000)) + 4500
+    for period in (1, 2, 13, 55, 500):
+        np.testing.assert_allclose(ema(values, period), _loop_ema(values, 2 / (period + 1)), rtol=1e-10)
+
+
+def test_atr_uses_wilder_smoothing():
+    high = np.array([2.0, 3.0, 4.0, 3.5])
+    low = np.array([1.0, 2.0, 2.5, 1.0])
+    close = np.array([1.5, 2.5, 3.0, 2.0])
+    true_range = np.array([1.0, 1.5, 1.5, 2.5])
+
+    np.testing.assert_allclose(atr(high, low, close, 3), _loop_ema(true_range, 1 / 3))
+
+
+def test_rolling_mean_std():
+    values = np.arange(10, dtype=float)
+    mean, std = rolling_mean_std(values, 4)
+
+    assert np.isnan(mean[:3]).all()
+    np.testing.assert_allclose(mean[3:], values[3:] - 1.5)
+    np.testing.assert_allclose(std[3:], np.std([0, 1, 2, 3]))
@@ -0,0 +1,80 @@
+import threading
+
+import numpy as np
+import pytest
+
+from bar_data import BarData
+from checkpoint_store import CheckpointStore, training_state
+from config_schema import DEFAULT_CONFIG
+from features import OBS_DIM, IndicatorState, feature_matrix
+from inference import InferenceService
+from normalization import Normalizer
+from policy import MLPPolicy
+
+CONFIG = DEFAULT_CONFIG['data_indicators']
+
+
+def make_bars(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 4800 + np.cumsum(rng.normal(0, 1, n))
+    return BarData(timestamp=np.arange(n, dtype=np.int64) * 60, open=close, high=close + rng.random(n),
+                   low=close - rng.random(n), close=close, volume=np.ones(n))
+
+
+def test_incremental_state_matches_feature_matrix():
+    bars = make_bars()
+    expected = feature_matrix(bars, CONFIG)
+
+    state = IndicatorState()
+    for i in range(len(bars)):
+        # Round-trip through JSON-style dicts as a client would
+        state = IndicatorState.from_dict(state.to_dict())
+        features = state.update(bars.high[i], bars.low[i], bars.close[i], CONFIG)
+        np.testing.assert_allclose(features, expected[i], rtol=1e-5, atol=1e-5)
+
+
+def test_malformed_state_is_rejected():
+    with pytest.raises(ValueError):
+        IndicatorState.from_dict({'bars': 'x'})
+    with pytest.raises(ValueError):
+        IndicatorState.from_dict({'bars': 1})
+
+
+@pytest.fixture
+def service(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    policy = MLPPolicy(OBS_DIM, seed=4)
+    normalizer = Normalizer(OBS_DIM)
+    normalizer.normalize_obs(feature_matrix(make_bars(seed=1), CONFIG))
+    store.save(training_state(policy, extra=normalizer.state()), {'data_indicators': CONFIG})
+    service = InferenceService.from_checkpoint(store, window_ms=5.0)
+    yield service
+    service.close()
+
+
+def test_concurrent_requests_share_batches(service):
+    bars = make_bars(32)
+    results = [None] * 32
+
+    def request(i):
+        bar = {'high': bars.high[i], 'low': bars.low[i], 'close': bars.close[i]}
+        results[i] = service.act(bar)
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(32)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = service.batcher.stats
+    assert stats['requests'] == 32
+    assert stats['batches'] < 32
+
+    # Batched answers equal a direct single-row forward pass
+    for i, result in enumerate(results):
+        features = IndicatorState().update(bars.high[i], bars.low[i], bars.close[i], CONFIG)
+        obs = service.normalizer.normalize_obs(np.array([features]))
+        probabilities = service.policy.forward(obs).probs[0]
+        np.testing.assert_allclose(result['probabilities'], probabilities, rtol=1e-5)
+        assert result['state']['bars'] == 1
+        assert result['action'] in ('short', 'flat', 'long')
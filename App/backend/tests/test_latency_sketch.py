@@ -0,0 +1,98 @@
+import multiprocessing
+import random
+import time
+
+import pytest
+
+import latency_sketch
+from latency_sketch import ALL_ENDPOINTS, DDSketch, LatencyTracker
+
+
+def _exact(values, q):
+    return sorted(values)[int(q * (len(values) - 1))]
+
+
+def test_quantiles_stay_within_relative_accuracy_and_merge_exactly():
+    rng = random.Random(7)
+    first = [rng.lognormvariate(-4, 1.5) for _ in range(20000)]
+    second = [rng.expovariate(2.0) for _ in range(20000)]
+    a, b, combined = DDSketch(0.01), DDSketch(0.01), DDSketch(0.01)
+    for value in first:
+        a.add(value)
+        combined.add(value)
+    for value in second:
+        b.add(value)
+        combined.add(value)
+    a.merge(b)
+
+    assert a.bins == combined.bins and a.count == 40000
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exact = _exact(first + second, q)
+        assert abs(a.quantile(q) - exact) / exact <= 0.01
+
+
+def test_bins_are_capped_by_folding_the_fastest():
+    sketch = DDSketch(0.01, max_bins=64)
+    for exponent in range(-600, 200):
+        sketch.add(10 ** (exponent / 100))
+
+    assert len(sketch.bins) == 64
+    assert sketch.count == 800
+    # The slow tail keeps full accuracy
+    assert abs(sketch.quantile(0.999) - 10 ** (198 / 100)) / 10 ** (198 / 100) <= 0.01
+
+
+class _Clock:
+    now = 1_000_000.0
+
+    @classmethod
+    def time(cls):
+        return cls.now
+
+
+def test_windows_only_cover_recent_slots(monkeypatch):
+    monkeypatch.setattr(latency_sketch, 'time', _Clock)
+    tracker = LatencyTracker(windows=(10, 60), slot_seconds=5)
+    for _ in range(100):
+        tracker.record('slow', 2.0)
+    _Clock.now += 30
+    for _ in range(100):
+        tracker.record('fast', 0.01)
+
+    windows = tracker.summary()['windows']
+    assert windows['10s'][ALL_ENDPOINTS]['count'] == 100
+    assert list(windows['10s']['endpoints']) == ['fast']
+    assert windows['60s'][ALL_ENDPOINTS]['count'] == 200
+    assert windows['60s'][ALL_ENDPOINTS]['p99'] == pytest.approx(2.0, rel=0.01)
+
+    _Clock.now += 120
+    assert tracker.summary()['windows']['60s'][ALL_ENDPOINTS]['count'] == 0
+    assert tracker._slots == {}
+
+
+def _worker(directory, seconds, barrier):
+    tracker = LatencyTracker(multiprocess_dir=directory)
+    for _ in range(1000):
+        tracker.record('dataset_rows', seconds)
+    time.sleep(latency_sketch.FLUSH_INTERVAL * 4)
+    barrier.wait()
+
+
+def test_summary_merges_other_workers_snapshots(tmp_path, monkeypatch):
+    monkeypatch.setattr(latency_sketch, 'FLUSH_INTERVAL', 0.05)
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(3)
+    workers = [context.Process(target=_worker, args=(str(tmp_path), seconds, barrier)) for seconds in (0.01, 1.0)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    for worker in workers:
+        worker.join()
+
+    scraper = LatencyTracker(multiprocess_dir=str(tmp_path))
+    scraper.record('dataset_rows', 0.01)
+    rows = scraper.summary()['windows']['60s']['endpoints']['dataset_rows']
+
+    assert rows['count'] == 2001
+    assert rows['p50'] == pytest.approx(0.01, rel=0.011)
+    assert rows['p99'] == pytest.approx(1.0, rel=0.011)
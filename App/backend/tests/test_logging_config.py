@@ -0,0 +1,23 @@
+import json
+import logging
+import logging.handlers
+
+from logging_config import setup_logging, stop_log_listeners
+
+
+def test_queued_file_writes_keep_structured_records(tmp_path):
+    log_file = tmp_path / 'logs' / 'app.log'
+    setup_logging(log_file=str(log_file), enable_console=False, queue_file_writes=True)
+    assert isinstance(logging.getLogger().handlers[0], logging.handlers.QueueHandler)
+
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        logging.getLogger('requests').exception('request failed', extra={'extra_fields': {'status_code': 500}})
+    stop_log_listeners()
+
+    entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+    failure = next(entry for entry in entries if entry['message'] == 'request failed')
+    assert failure['status_code'] == 500
+    assert 'ValueError: boom' in failure['exception']
+    logging.getLogger().handlers.clear()
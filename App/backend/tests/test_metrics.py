@@ -0,0 +1,50 @@
+import time
+
+from metrics import OVERFLOW_LABEL_VALUE, UNMATCHED_ENDPOINT, MetricsCollector
+import metrics
+
+
+def test_series_past_the_family_limit_fold_into_overflow():
+    collector = MetricsCollector(max_series_per_family=3, series_limits={'uploads': 1})
+    for i in range(10):
+        collector.increment_counter('http_requests_total', {'endpoint': f'e{i}', 'status': '200'})
+        collector.record_histogram('latency', 0.2, {'endpoint': f'e{i}'})
+    collector.increment_counter('uploads', {'file_type': 'csv'})
+    collector.increment_counter('uploads', {'file_type': 'xlsx'})
+
+    overflow = collector.get_metric('http_requests_total', {'endpoint': OVERFLOW_LABEL_VALUE, 'status': OVERFLOW_LABEL_VALUE})
+    assert overflow.value == 7
+    assert collector.get_metric('latency_count', {'endpoint': OVERFLOW_LABEL_VALUE}).value == 7
+    # Writes to a label set admitted before the limit still land on it
+    collector.increment_counter('http_requests_total', {'endpoint': 'e0', 'status': '200'})
+    assert collector.get_metric('http_requests_total', {'endpoint': 'e0', 'status': '200'}).value == 2
+
+    stats = collector.cardinality_stats()
+    assert stats['families'] == {'http_requests_total': 4, 'latency': 4, 'uploads': 2}
+    assert stats['overflowed'] == {'http_requests_total': 7, 'latency': 7, 'uploads': 1}
+    assert stats['series'] == 4 + 4 * 10 + 2
+
+
+def test_stale_series_are_evicted_after_ttl():
+    collector = MetricsCollector(series_ttl=0.05)
+    collector.increment_counter('requests', {'endpoint': 'old'})
+    collector.record_histogram('latency', 0.2, {'endpoint': 'old'})
+    time.sleep(0.1)
+    collector.increment_counter('requests', {'endpoint': 'new'})
+
+    assert collector.get_metric('requests', {'endpoint': 'old'}) is None
+    assert collector.get_metric('requests', {'endpoint': 'new'}).value == 1
+    stats = collector.cardinality_stats()
+    assert stats['series'] == 1
+    assert stats['evicted'] == 2
+
+
+def test_unmatched_requests_are_labelled_and_exportable(monkeypatch):
+    monkeypatch.setattr(metrics, 'metrics_collector', MetricsCollector())
+    metrics.increment_request_counter('GET', None, 404)
+    metrics.record_request_duration('GET', None, 0.01)
+
+    exported = metrics.export_prometheus_metrics()
+    assert f'endpoint="{UNMATCHED_ENDPOINT}"' in exported
+    assert 'rl_futures_metric_series{family="http_requests_total"} 1' in exported
+    assert 'rl_futures_metrics_memory_bytes' in exported
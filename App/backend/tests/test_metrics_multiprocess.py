@@ -0,0 +1,146 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+import metrics
+from metrics import MetricsCollector
+from metrics_multiprocess import (DURABLE_FILE, EXITED_FILE, GAUGE_FILE, INITIAL_FILE_BYTES, MmapMetricFile,
+                                  mark_process_dead, metric_file_path, read_metric_file)
+
+LABELS = {'method': 'GET', 'endpoint': 'health', 'status': '200'}
+
+
+def _worker(directory, requests, barrier):
+    collector = MetricsCollector(directory)
+    for _ in range(requests):
+        collector.increment_counter('http_requests_total', LABELS)
+        collector.record_histogram('http_request_duration_seconds', 0.3, {'endpoint': 'health'})
+    collector.set_gauge('active_connections', 2, merge='sum')
+    collector.set_gauge('build', os.getpid())
+    barrier.wait()
+    barrier.wait()
+
+
+def test_scrape_merges_workers_and_keeps_counts_of_exited_ones(tmp_path):
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(4)
+    workers = [context.Process(target=_worker, args=(str(tmp_path), 100 * (i + 1), barrier)) for i in range(3)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+
+    scraper = MetricsCollector(str(tmp_path))
+    assert scraper.get_metric('http_requests_total', LABELS).value == 600
+    assert scraper.get_metric('http_request_duration_seconds_bucket', {'endpoint': 'health', 'le': '0.5'}).value == 600
+    assert scraper.get_metric('http_request_duration_seconds_bucket', {'endpoint': 'health', 'le': '0.1'}).value == 0
+    assert scraper.get_metric('active_connections').value == 6
+    assert scraper.get_metric('build').value in {worker.pid for worker in workers}
+
+    barrier.wait()
+    for worker in workers:
+        worker.join()
+        mark_process_dead(worker.pid, str(tmp_path))
+
+    assert scraper.get_metric('http_requests_total', LABELS).value == 600
+    assert scraper.get_metric('active_connections') is None
+    assert 'rl_futures_gauges{endpoint="health",method="GET",status="200"} 600' in \
+        scraper.generate_prometheus_format()
+
+
+def test_file_grows_and_reopens_with_existing_entries(tmp_path):
+    path = metric_file_path(str(tmp_path), GAUGE_FILE, 1)
+    store = MmapMetricFile(path)
+    for i in range(2000):
+        store.write(f'series_{i}', i, 0.0, lambda: {'kind': 'gauge', 'labels': {}})
+    store.close()
+    assert os.path.getsize(path) > INITIAL_FILE_BYTES
+
+    reopened = MmapMetricFile(path)
+    reopened.write('series_5', 50.0, 1.0, lambda: {'kind': 'gauge', 'labels': {}})
+    reopened.close()
+
+    entries = {description['key']: value for description, value, _ in read_metric_file(path)}
+    assert len(entries) == 2000
+    assert entries['series_5'] == 50.0 and entries['series_1999'] == 1999
+
+
+def test_worker_reusing_a_pid_adds_to_the_exited_workers_totals(tmp_path):
+    exited = MetricsCollector(str(tmp_path))
+    for _ in range(5):
+        exited.increment_counter('http_requests_total', LABELS)
+        exited.record_histogram('http_request_duration_seconds', 0.3, {'endpoint': 'health'})
+    for store in exited._files.values():
+        store.close()
+
+    # Same pid, fresh process state: the new worker opens the same files
+    recycled = MetricsCollector(str(tmp_path))
+    recycled.increment_counter('http_requests_total', LABELS)
+    recycled.record_histogram('http_request_duration_seconds', 0.3, {'endpoint': 'health'})
+
+    assert recycled.get_metric('http_requests_total', LABELS).value == 6
+    assert recycled.get_metric('http_request_duration_seconds_count', {'endpoint': 'health'}).value == 6
+    assert recycled.get_metric('http_request_duration_seconds_sum', {'endpoint': 'health'}).value == \
+        pytest.approx(1.8)
+
+
+def test_evicted_counter_continues_from_its_stored_total(tmp_path):
+    collector = MetricsCollector(str(tmp_path), series_ttl=0.05)
+    for _ in range(1000):
+        collector.increment_counter('http_requests_total', LABELS)
+    time.sleep(0.1)
+    collector.increment_counter('http_requests_total', LABELS)
+
+    assert collector.cardinality_stats()['evicted'] == 1
+    assert collector.get_metric('http_requests_total', LABELS).value == 1001
+
+
+def test_stale_series_leave_the_scrape_and_the_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, 'COMPACT_MIN_ENTRIES', 16)
+    collector = MetricsCollector(str(tmp_path), max_series_per_family=10, series_ttl=0.02)
+    for batch in range(20):
+        for i in range(10):
+            collector.increment_counter('uploads', {'file_type': f'type_{batch}_{i}'})
+        time.sleep(0.03)
+    collector.increment_counter('uploads', {'file_type': 'csv'})
+
+    assert len(collector.get_all_metrics()) <= 11
+    store = collector._files[DURABLE_FILE]
+    assert len(store) <= 2 * len(collector.metrics) + 16
+    assert len(read_metric_file(store.path)) == len(store)
+
+
+def _short_lived_worker(directory, file_type):
+    collector = MetricsCollector(directory)
+    collector.increment_counter('http_requests_total', LABELS)
+    collector.increment_counter('uploads', {'file_type': file_type})
+
+
+def test_exited_workers_are_folded_into_one_file(tmp_path, monkeypatch):
+    context = multiprocessing.get_context('fork')
+    for i in range(5):
+        worker = context.Process(target=_short_lived_worker, args=(str(tmp_path), f'type_{i}'))
+        worker.start()
+        worker.join()
+        mark_process_dead(worker.pid, str(tmp_path), max_age=60)
+
+    assert sorted(os.listdir(tmp_path)) == [EXITED_FILE]
+    scraper = MetricsCollector(str(tmp_path))
+    assert scraper.get_metric('http_requests_total', LABELS).value == 5
+    assert scraper.get_metric('uploads', {'file_type': 'type_4'}).value == 1
+
+    # Series nobody has written within the TTL leave the folded file on the next exit
+    monkeypatch.setattr(time, 'time', lambda: 1e12)
+    open(metric_file_path(str(tmp_path), DURABLE_FILE, 1), 'wb').close()
+    mark_process_dead(1, str(tmp_path), max_age=60)
+    assert read_metric_file(str(tmp_path / EXITED_FILE)) == []
+
+
+def test_exited_workers_latency_snapshot_is_removed(tmp_path):
+    (tmp_path / 'latency_42.json').write_text('{}')
+    (tmp_path / 'latency_43.json').write_text('{}')
+
+    mark_process_dead(42, str(tmp_path))
+
+    assert sorted(os.listdir(tmp_path)) == ['latency_43.json']
@@ -0,0 +1,41 @@
+import json
+import logging
+
+from microbench import CASES, history_baseline, load_history, main, run_case
+
+
+def test_every_case_runs_single_and_multi_threaded():
+    for name, factory in CASES.items():
+        for threads in (1, 2):
+            result = run_case(factory, calls=40, threads=threads)
+            assert result['calls'] == 40, name
+            assert 0 < result['p50_us'] <= result['p99_us'], name
+
+
+def test_request_log_is_restored_after_run():
+    logger = logging.getLogger('requests')
+    handlers, propagate = logger.handlers[:], logger.propagate
+
+    run_case(CASES['log_request'], calls=10)
+    assert logger.handlers == handlers
+    assert logger.propagate == propagate
+
+
+def test_history_baseline_is_median_of_recent_runs():
+    history = [{'results': {'case/t1': {'p50_us': p50, 'p99_us': p50 * 2}}} for p50 in (1.0, 9.0, 2.0, 3.0)]
+
+    baseline = history_baseline(history, window=3)
+    assert baseline['results']['case/t1'] == {'p50_us': 3.0, 'p99_us': 6.0}
+
+
+def test_main_appends_history_and_flags_regressions(tmp_path):
+    history = tmp_path / 'history.jsonl'
+    fast = {'results': {'rate_limiter_hot_ip/t1': {'p50_us': 0.001, 'p99_us': 0.001}}}
+    history.write_text(json.dumps(fast) + '\n')
+
+    status = main(['--case', 'rate_limiter_hot_ip', '--threads', '1', '--calls', '200',
+                   '--history', str(history)])
+    assert status == 1
+    runs = load_history(str(history))
+    assert len(runs) == 2
+    assert 'rate_limiter_hot_ip/t1' in runs[1]['results']
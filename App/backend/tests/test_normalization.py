@@ -0,0 +1,55 @@
+import numpy as np
+
+from checkpoint_store import CheckpointStore
+from normalization import Normalizer, RunningMeanStd
+
+
+def test_batches_and_merges_match_full_data_statistics():
+    rng = np.random.default_rng(0)
+    data = rng.normal(5.0, 3.0, size=(3000, 4)) * [1, 10, 100, 1000]
+    chunks = np.array_split(data, [7, 500, 1800])
+
+    workers = []
+    for chunk in chunks:
+        stats = RunningMeanStd((4,))
+        for batch in np.array_split(chunk, 3):
+            stats.update(batch)
+        workers.append(stats)
+
+    forward = RunningMeanStd.merged(workers)
+    backward = RunningMeanStd.merged(reversed(workers))
+
+    for stats in (forward, backward):
+        assert stats.count == 3000
+        np.testing.assert_allclose(stats.mean, data.mean(axis=0), rtol=1e-12)
+        np.testing.assert_allclose(stats.var, data.var(axis=0), rtol=1e-10)
+
+
+def test_normalizer_state_round_trips_through_a_checkpoint(tmp_path):
+    rng = np.random.default_rng(1)
+    normalizer = Normalizer(obs_dim=3, n_envs=2)
+    for _ in range(20):
+        normalizer.normalize_obs(rng.normal(2.0, 4.0, size=(2, 3)))
+        normalizer.normalize_reward(rng.normal(size=2), np.array([False, True]))
+
+    store = CheckpointStore(str(tmp_path))
+    checkpoint = store.load(store.save(normalizer.state()))
+    restored = Normalizer.from_state(checkpoint.arrays)
+    restored.training = False
+
+    obs = rng.normal(size=(5, 3))
+    normalizer.training = False
+    np.testing.assert_array_equal(restored.normalize_obs(obs), normalizer.normalize_obs(obs))
+    np.testing.assert_array_equal(restored.normalize_reward([1.0], [False]),
+                                  normalizer.normalize_reward([1.0], [False]))
+    assert restored.obs_rms.count == 40
+
+
+def test_frozen_normalizer_does_not_update():
+    normalizer = Normalizer(obs_dim=2)
+    normalizer.normalize_obs(np.array([[1.0, 2.0], [3.0, 4.0]]))
+    normalizer.training = False
+    normalizer.normalize_obs(np.array([[100.0, 100.0]]))
+
+    assert normalizer.obs_rms.count == 2
+    np.testing.assert_allclose(normalizer.obs_rms.mean, [2.0, 3.0])
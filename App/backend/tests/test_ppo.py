@@ -0,0 +1,111 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from policy import MLPPolicy
+from ppo import PPOTrainer
+from rollout_buffer import RolloutBuffer
+
+
+def reference_gae(rewards, values, dones, last_values, gamma, lam):
+    advantages = np.zeros_like(rewards)
+    last = np.zeros(rewards.shape[1])
+    for t in reversed(range(len(rewards))):
+        next_values = last_values if t == len(rewards) - 1 else values[t + 1]
+        delta = rewards[t] + gamma * next_values * (1 - dones[t]) - values[t]
+        last = delta + gamma * lam * (1 - dones[t]) * last
+        advantages[t] = last
+    return advantages
+
+
+def test_gae_matches_reference_loop():
+    rng = np.random.default_rng(0)
+    buffer = RolloutBuffer(n_steps=50, n_envs=4, obs_dim=2, gamma=0.9, gae_lambda=0.8)
+    for _ in range(50):
+        buffer.add(rng.random((4, 2)), rng.integers(0, 3, 4), rng.normal(size=4),
+                   rng.random(4) < 0.1, rng.normal(size=4), rng.normal(size=4))
+    last_values = rng.normal(size=4).astype(np.float32)
+
+    buffer.compute_returns_and_advantage(last_values)
+
+    expected = reference_gae(buffer.rewards.astype(np.float64), buffer.values.astype(np.float64),
+                             buffer.dones.astype(np.float64), last_values, 0.9, 0.8)
+    np.testing.assert_allclose(buffer.advantages, expected, rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(buffer.returns, buffer.advantages + buffer.values, rtol=1e-6)
+
+
+def run_bandit_rollout(trainer, buffer, rng):
+    """Contextual bandit: go long on positive signals, short on negative ones"""
+    buffer.reset()
+    while not buffer.full:
+        obs = rng.choice([-1.0, 1.0], size=(buffer.n_envs, 1)).astype(np.float32)
+        actions, log_probs, values = trainer.policy.act(obs, rng)
+        rewards = np.where(actions == np.where(obs[:, 0] > 0, 2, 0), 1.0, -1.0)
+        buffer.add(obs, actions, rewards, np.ones(buffer.n_envs), values, log_probs)
+    buffer.compute_returns_and_advantage(np.zeros(buffer.n_envs, dtype=np.float32))
+
+
+def test_ppo_learns_a_contextual_bandit():
+    rng = np.random.default_rng(1)
+    policy = MLPPolicy(obs_dim=1, hidden_sizes=(16,), seed=1)
+    trainer = PPOTrainer(policy, {'n_steps': 64, 'batch_size': 64, 'learning_rate': 0.01}, n_epochs=4)
+    buffer = trainer.make_buffer(n_envs=4)
+
+    for _ in range(30):
+        run_bandit_rollout(trainer, buffer, rng)
+        stats = trainer.update(buffer)
+
+    actions, _, _ = policy.act(np.array([[1.0], [-1.0]], dtype=np.float32), rng, deterministic=True)
+    assert actions.tolist() == [2, 0]
+    assert set(stats) == {'policy_loss', 'value_loss', 'entropy', 'approx_kl', 'clip_fraction'}
+
+
+def test_repeated_updates_do_not_allocate_arrays():
+    rng = np.random.default_rng(2)
+    policy = MLPPolicy(obs_dim=64, seed=2)
+    trainer = PPOTrainer(policy, {'n_steps': 256, 'batch_size': 512}, n_epochs=2)
+    buffer = trainer.make_buffer(n_envs=8)
+    for _ in range(256):
+        buffer.add(rng.normal(size=(8, 64)), rng.integers(0, 3, 8), rng.normal(size=8),
+                   np.zeros(8), rng.normal(size=8), np.full(8, -1.1))
+    buffer.compute_returns_and_advantage(np.zeros(8, dtype=np.float32))
+    trainer.update(buffer)
+
+    tracemalloc.start()
+    buffer.compute_returns_and_advantage(np.zeros(8, dtype=np.float32))
+    trainer.update(buffer)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # A single minibatch of observations is 128 KiB; only NumPy's small,
+    # fixed-size iterator buffers may show up here
+    assert peak < 64 * 1024
+
+
+def test_policy_backward_matches_finite_differences():
+    rng = np.random.default_rng(3)
+    policy = MLPPolicy(obs_dim=4, hidden_sizes=(8, 8), seed=3)
+    obs = rng.normal(size=(5, 4)).astype(np.float32)
+    logit_weights = rng.normal(size=(5, 3)).astype(np.float32)
+    value_weights = rng.normal(size=(5, 1)).astype(np.float32)
+
+    def loss():
+        ws = policy.forward(obs)
+        return float((ws.logits * logit_weights).sum() + (ws.values * value_weights).sum())
+
+    ws = policy.forward(obs)
+    ws.d_logits[:] = logit_weights
+    ws.d_values[:] = value_weights
+    policy.backward(obs, ws)
+
+    for name in ('w0', 'b1', 'w_pi', 'b_v'):
+        param, grad = policy.params[name].reshape(-1), policy.grads[name].reshape(-1)
+        for i in range(min(3, len(param))):
+            original = param[i]
+            param[i] = original + 1e-2
+            upper = loss()
+            param[i] = original - 1e-2
+            lower = loss()
+            param[i] = original
+            assert grad[i] == pytest.approx((upper - lower) / 2e-2, rel=2e-2, abs=2e-3)
@@ -0,0 +1,62 @@
+import pytest
+
+import metrics
+from app import create_app
+from metrics import UNMATCHED_ENDPOINT, MetricsCollector
+from request_metrics import RequestMetricsMiddleware
+
+
+@pytest.fixture
+def collector(monkeypatch):
+    collector = MetricsCollector()
+    monkeypatch.setattr(metrics, 'metrics_collector', collector)
+    return collector
+
+
+@pytest.fixture
+def client(collector):
+    app = create_app({'TESTING': True, 'SETUP_LOGGING': False, 'COMPRESS_RESPONSES': False})
+    with app.test_client() as client:
+        yield client
+
+
+def test_request_is_recorded_under_its_endpoint(client, collector):
+    # Servers close the body once sent; the test client waits to be told
+    response = client.get('/api/config')
+    response.close()
+    labels = {'method': 'GET', 'endpoint': 'config_endpoint'}
+
+    assert collector.get_metric('http_requests_total', {**labels, 'status': '200'}).value == 1
+    assert collector.get_metric('http_request_duration_seconds_count', labels).value == 1
+    assert collector.get_metric('http_request_duration_seconds_sum', labels).value > 0
+    assert collector.get_metric('http_response_size_bytes_sum', labels).value == len(response.get_data())
+    assert collector.get_metric('active_connections').value == 0
+
+
+def test_unrouted_request_is_labelled_unmatched(client, collector):
+    response = client.get('/no/such/path')
+    response.close()
+    assert response.status_code == 404
+
+    labels = {'method': 'GET', 'endpoint': UNMATCHED_ENDPOINT, 'status': '404'}
+    assert collector.get_metric('http_requests_total', labels).value == 1
+
+
+def test_streamed_body_is_timed_until_closed(collector):
+    finished = []
+
+    def app(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return iter([b'abc', b'defgh'])
+
+    middleware = RequestMetricsMiddleware(app)
+    middleware._finish = lambda environ, started, wall, status, sent: finished.append((status, sent))
+    environ = {'REQUEST_METHOD': 'POST', 'CONTENT_LENGTH': '12'}
+
+    body = middleware(environ, lambda status, headers, exc_info=None: None)
+    assert b''.join(body) == b'abcdefgh'
+    assert finished == []
+    body.close()
+    body.close()
+
+    assert finished == [(200, 8)]
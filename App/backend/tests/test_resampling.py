@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from bar_data import BarData
+from resampling import parse_timeframe, resample
+
+
+def _minute_bars(start, count):
+    timestamp = (np.datetime64(start, 's') + 60 * np.arange(count)).astype(np.int64)
+    close = np.arange(count, dtype=float)
+    return BarData(timestamp=timestamp, open=close, high=close + 1, low=close - 1,
+                   close=close, volume=np.ones(count))
+
+
+def test_parse_timeframe():
+    assert parse_timeframe('5m') == 300
+    assert parse_timeframe('1h') == 3600
+    assert parse_timeframe('1d') == 86400
+    for bad in ('0m', '5', '2d', '../5m'):
+        with pytest.raises(ValueError):
+            parse_timeframe(bad)
+
+
+def test_resample_aggregates_ohlcv():
+    bars = _minute_bars('2024-01-02T09:00', 10)
+    result = resample(bars, 300)
+
+    assert result.timestamp.astype('datetime64[s]').astype(str).tolist() == [
+        '2024-01-02T09:00:00', '2024-01-02T09:05:00',
+    ]
+    assert result.open.tolist() == [0, 5]
+    assert result.high.tolist() == [5, 10]
+    assert result.low.tolist() == [-1, 4]
+    assert result.close.tolist() == [4, 9]
+    assert result.volume.tolist() == [5, 5]
+
+
+def test_buckets_align_to_session_open_and_never_span_days():
+    # 45-minute buckets from a 17:00 open; 16:59 closes the previous session
+    bars = _minute_bars('2024-01-02T16:30', 120)
+    result = resample(bars, 2700, session_start='17:00')
+
+    assert result.timestamp.astype('datetime64[s]').astype(str).tolist() == [
+        '2024-01-02T16:15:00', '2024-01-02T17:00:00', '2024-01-02T17:45:00',
+    ]
+    assert result.volume.tolist() == [30, 45, 45]
+
+
+def test_daily_bars_follow_trading_days():
+    bars = _minute_bars('2024-01-02T16:00', 180)
+    result = resample(bars, 86400, session_start='17:00')
+
+    assert result.volume.tolist() == [60, 120]
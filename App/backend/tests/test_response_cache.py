@@ -0,0 +1,83 @@
+import gzip
+import time
+
+import pytest
+
+import response_cache as response_cache_module
+from app import create_app
+from response_cache import ResponseCache, response_cache
+
+
+@pytest.fixture
+def client():
+    response_cache.invalidate()
+    app = create_app({'TESTING': True, 'SETUP_LOGGING': False})
+    with app.test_client() as client:
+        yield client
+
+
+def test_repeat_get_is_served_from_cache_with_etag(client):
+    first = client.get('/api/config')
+    hits = response_cache.stats['hits']
+    second = client.get('/api/config')
+
+    assert response_cache.stats['hits'] == hits + 1
+    assert first.get_data() == second.get_data()
+    assert first.headers['ETag'] == second.headers['ETag']
+    assert second.json == first.json
+
+
+def test_if_none_match_returns_304(client):
+    etag = client.get('/api/config').headers['ETag']
+    response = client.get('/api/config', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_gzip_body_is_served_when_accepted(client, monkeypatch):
+    monkeypatch.setattr(response_cache_module, 'MIN_COMPRESS_BYTES', 64)
+    plain = client.get('/api/config')
+    compressed = client.get('/api/config', headers={'Accept-Encoding': 'gzip, deflate'})
+
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert gzip.decompress(compressed.get_data()) == plain.get_data()
+    assert len(compressed.get_data()) < len(plain.get_data())
+    # Either variant's ETag validates the other
+    assert client.get('/api/config', headers={'If-None-Match': compressed.headers['ETag']}).status_code == 304
+
+
+def test_config_post_invalidates(client):
+    client.get('/api/config')
+    assert len(response_cache) == 1
+
+    response = client.post('/api/config', json={'day_mastery': {'start_time': '18:00'}})
+
+    assert response.status_code == 200
+    assert len(response_cache) == 0
+
+
+def test_dataset_invalidation_and_byte_budget():
+    cache = ResponseCache(max_bytes=3000)
+    for i in range(3):
+        cache.put(cache.key('rows', {'dataset_id': f'd{i}'}, []), b'x' * 900, 'application/json', f'd{i}')
+    cache.invalidate('d1')
+
+    assert cache.get(cache.key('rows', {'dataset_id': 'd1'}, [])) is None
+    assert cache.get(cache.key('rows', {'dataset_id': 'd0'}, [])) is not None
+
+    cache.put(cache.key('rows', {'dataset_id': 'd3'}, []), b'y' * 2000, 'application/json', 'd3')
+    assert cache.memory_bytes() <= 3000
+    assert cache.stats['evictions'] >= 1
+
+
+def test_entries_expire_after_ttl():
+    cache = ResponseCache(ttl=0.01)
+    key = cache.key('index', {}, [])
+    cache.put(key, b'{}', 'application/json')
+    time.sleep(0.02)
+
+    assert cache.get(key) is None
+    assert len(cache) == 0
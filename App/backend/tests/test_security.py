@@ -0,0 +1,82 @@
+import html
+import re
+
+import pytest
+
+from security import InputValidator, SecurityError, sanitize_input
+
+
+def _reference_sanitize(value):
+    value = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', value)
+    return html.escape(value).strip()
+
+
+@pytest.mark.parametrize('value', [
+    'plain text',
+    '  padded  ',
+    '<script>alert("x")</script>',
+    "it's & more",
+    'null\x00byte\x07bell\x7f',
+    '\x0b\x0c leading controls',
+    'tab\tnewline\ncr\r',
+])
+def test_sanitize_string_matches_reference(value):
+    assert InputValidator.sanitize_string(value) == _reference_sanitize(value)
+
+
+def test_sanitize_string_clean_fast_path_returns_same_object():
+    value = 'already clean value'
+    assert InputValidator.sanitize_string(value) is value
+
+
+def test_sanitize_string_rejects_long_input():
+    with pytest.raises(SecurityError):
+        InputValidator.sanitize_string('x' * 1001)
+
+
+def test_sanitize_input_preserves_structure():
+    data = {
+        'name': '<b>',
+        'values': [1, 2.5, None, True, ['a&b', {'k': '"q"'}]],
+        'nested': {'empty': {}, 'list': []},
+    }
+    assert sanitize_input(data) == {
+        'name': '&lt;b&gt;',
+        'values': [1, 2.5, None, True, ['a&amp;b', {'k': '&quot;q&quot;'}]],
+        'nested': {'empty': {}, 'list': []},
+    }
+
+
+def test_sanitize_input_handles_deep_nesting_without_recursion():
+    data = 'leaf'
+    for _ in range(5000):
+        data = [data]
+
+    with pytest.raises(SecurityError, match='nested too deeply'):
+        sanitize_input(data)
+
+    assert sanitize_input(data, max_depth=6000) is not None
+
+
+def test_sanitize_input_enforces_item_budget():
+    with pytest.raises(SecurityError, match='too large'):
+        sanitize_input(list(range(11)), max_items=10)
+
+
+def test_rate_limits_are_per_route(monkeypatch):
+    import security
+    from app import create_app
+
+    limiter = security.RateLimiter()
+    limiter.enabled = True
+    monkeypatch.setattr(security, 'rate_limiter', limiter)
+    client = create_app({'TESTING': True, 'SETUP_LOGGING': False}).test_client()
+
+    # The inference route allows 6000/min and does not share the default 100
+    statuses = {client.post('/api/inference/act', json={'bar': {}}).status_code for _ in range(150)}
+    assert 429 not in statuses
+    assert client.get('/api/config').status_code == 200
+
+    # Uploads keep their stricter limit of 10
+    statuses = [client.post('/api/upload', json={}).status_code for _ in range(11)]
+    assert 429 not in statuses[:10] and statuses[10] == 429
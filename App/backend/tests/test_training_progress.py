@@ -0,0 +1,133 @@
+import json
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+import training_progress
+from training_progress import (ProgressBroadcaster, ProgressReporter, ProgressSpool, format_sse,
+                               sse_stream)
+
+
+def test_fan_out_to_every_subscriber():
+    broadcaster = ProgressBroadcaster()
+    first, second = broadcaster.subscribe(), broadcaster.subscribe()
+    broadcaster.publish('iteration', {'iteration': 1})
+
+    assert first.get(0)['data'] == {'iteration': 1}
+    assert second.get(0)['data'] == {'iteration': 1}
+    assert first.get(0) is None
+
+
+def test_slow_subscriber_drops_oldest_frames_without_blocking():
+    broadcaster = ProgressBroadcaster(buffer_frames=4)
+    slow = broadcaster.subscribe()
+
+    start = time.perf_counter()
+    for i in range(1000):
+        broadcaster.publish('iteration', {'iteration': i})
+    assert time.perf_counter() - start < 1.0
+
+    assert slow.dropped == 996
+    assert [slow.get(0)['data']['iteration'] for _ in range(4)] == [996, 997, 998, 999]
+
+
+def test_late_subscriber_receives_latest_frame():
+    broadcaster = ProgressBroadcaster()
+    broadcaster.publish('iteration', {'iteration': 1})
+    broadcaster.publish('iteration', {'iteration': 2})
+
+    assert broadcaster.subscribe().get(0)['data'] == {'iteration': 2}
+
+
+def test_subscriber_limit_and_unsubscribe():
+    broadcaster = ProgressBroadcaster(max_subscribers=1)
+    subscription = broadcaster.subscribe()
+    with pytest.raises(RuntimeError):
+        broadcaster.subscribe()
+
+    subscription.close()
+    assert broadcaster.subscriber_count == 0
+    broadcaster.subscribe()
+
+
+def test_waiting_subscriber_wakes_on_publish():
+    broadcaster = ProgressBroadcaster()
+    subscription = broadcaster.subscribe()
+    received = []
+    reader = threading.Thread(target=lambda: received.append(subscription.get(5.0)))
+    reader.start()
+    time.sleep(0.05)
+    broadcaster.publish('iteration', {'iteration': 7})
+    reader.join(timeout=1.0)
+
+    assert received[0]['data'] == {'iteration': 7}
+
+
+def test_sse_stream_formats_frames_and_reports_drops():
+    broadcaster = ProgressBroadcaster(buffer_frames=2)
+    subscription = broadcaster.subscribe()
+    for i in range(3):
+        broadcaster.publish('iteration', {'iteration': i})
+
+    stream = sse_stream(subscription, heartbeat=0.01)
+    assert next(stream) == 'retry: 5000\n\n'
+    assert next(stream) == 'event: dropped\ndata: {"frames": 1}\n\n'
+    message = next(stream)
+    assert message.startswith('id: 2\nevent: iteration\n')
+    assert json.loads(message.split('data: ')[1]) == {'iteration': 1}
+    assert next(stream) == format_sse({'id': 3, 'event': 'iteration', 'data': {'iteration': 2}})
+    assert next(stream) == ': heartbeat\n\n'
+
+    stream.close()
+    assert broadcaster.subscriber_count == 0
+
+
+def test_reporter_numbers_iterations_and_measures_throughput():
+    broadcaster = ProgressBroadcaster()
+    subscription = broadcaster.subscribe()
+    reporter = ProgressReporter(broadcaster)
+    reporter.report({'policy_loss': 0.1}, steps=2048, episode_reward=1.5,
+                    success_rate_per_day={'2024-01-02': 0.5})
+
+    data = subscription.get(0)['data']
+    assert data['iteration'] == 1
+    assert data['losses'] == {'policy_loss': 0.1}
+    assert data['success_rate_per_day'] == {'2024-01-02': 0.5}
+    assert data['steps_per_sec'] > 0
+
+
+def _train(spool_path):
+    ProgressReporter(spool_path=spool_path).report({'policy_loss': 0.25}, steps=512)
+
+
+def test_frames_from_another_process_reach_the_stream(tmp_path):
+    spool_path = str(tmp_path / 'progress.jsonl')
+    broadcaster = ProgressBroadcaster(spool_path=spool_path)
+    subscription = broadcaster.subscribe()
+    # Let the tailer take its starting position before the trainer writes
+    time.sleep(training_progress.SPOOL_POLL_SECONDS * 2)
+
+    trainer = multiprocessing.get_context('fork').Process(target=_train, args=(spool_path,))
+    trainer.start()
+    trainer.join()
+
+    stream = sse_stream(subscription, heartbeat=5)
+    next(stream)
+    chunk = next(stream)
+    stream.close()
+    assert chunk.startswith('id: 1\nevent: iteration\n')
+    assert '"policy_loss": 0.25' in chunk
+    assert broadcaster.subscriber_count == 0
+
+
+def test_late_subscriber_gets_the_last_spooled_frame(tmp_path):
+    spool = ProgressSpool(str(tmp_path / 'progress.jsonl'), max_bytes=200)
+    for iteration in range(5):
+        spool.publish('iteration', {'iteration': iteration})
+
+    subscription = ProgressBroadcaster(spool_path=spool.path).subscribe()
+
+    assert subscription.get(1)['data'] == {'iteration': 4}
+    subscription.close()
@@ -0,0 +1,310 @@
+"""
+Training Progress Streaming for RL Futures Trading System
+Non-blocking fan-out of per-iteration training metrics to Server-Sent Events subscribers
+
+Trainers run in their own processes, so frames travel through a spool
+file: ``ProgressReporter`` appends one JSON line per frame, and the
+broadcaster in every server worker tails the file while it has
+subscribers.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_FRAMES = 64
+DEFAULT_MAX_SUBSCRIBERS = 100
+HEARTBEAT_SECONDS = 15.0
+SPOOL_POLL_SECONDS = 0.25
+# The spool restarts with just the newest frame once it grows past this
+MAX_SPOOL_BYTES = 1024 * 1024
+# Read from the end of the spool when a tailer starts, to find the latest frame
+SPOOL_TAIL_BYTES = 64 * 1024
+
+DEFAULT_SPOOL_PATH = os.path.join(tempfile.gettempdir(), 'rl_futures_training_progress.jsonl')
+
+class ProgressSpool:
+    """Append-only JSON-lines file carrying frames from trainers to server workers"""
+
+    def __init__(self, path: str = DEFAULT_SPOOL_PATH, max_bytes: int = MAX_SPOOL_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._sequence = 0
+
+    def publish(self, event: str, data: Dict[str, Any]) -> int:
+        """Append a frame; returns this writer's sequence number"""
+        self._sequence += 1
+        line = json.dumps({'event': event, 'time': time.time(), 'data': data}, default=str) + '\n'
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size + len(line) > self.max_bytes:
+            # Swap in a fresh file; tailers notice the new inode and start over
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w') as f:
+                f.write(line)
+            os.replace(tmp_path, self.path)
+        else:
+            # One write per line in append mode, so concurrent writers never interleave
+            with open(self.path, 'a') as f:
+                f.write(line)
+        return self._sequence
+
+class _SpoolPosition:
+    __slots__ = ('inode', 'offset')
+
+    def __init__(self):
+        self.inode = None
+        self.offset = 0
+
+class Subscription:
+    """One subscriber's bounded frame buffer.
+
+    When the buffer is full the oldest frame is discarded, so a slow client
+    falls behind and skips frames instead of holding up the publisher.
+    """
+
+    def __init__(self, broadcaster: 'ProgressBroadcaster', buffer_frames: int):
+        self._broadcaster = broadcaster
+        self.frames: Deque[Dict[str, Any]] = deque(maxlen=buffer_frames)
+        self.dropped = 0
+        self.closed = False
+
+    def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait up to ``timeout`` seconds for the next frame"""
+        condition = self._broadcaster._condition
+        with condition:
+            if not self.frames and not self.closed:
+                condition.wait(timeout)
+            return self.frames.popleft() if self.frames else None
+
+    def close(self):
+        self._broadcaster.unsubscribe(self)
+
+class ProgressBroadcaster:
+    """Publishes training frames to any number of subscribers.
+
+    ``publish`` only appends to each subscriber's deque under a short lock
+    and never waits on consumers. The latest frame is replayed to new
+    subscribers so they have something to show immediately.
+    """
+
+    def __init__(self, buffer_frames: int = DEFAULT_BUFFER_FRAMES,
+                 max_subscribers: int = DEFAULT_MAX_SUBSCRIBERS,
+                 spool_path: Optional[str] = None):
+        self.buffer_frames = buffer_frames
+        self.max_subscribers = max_subscribers
+        self.spool_path = spool_path
+        self._subscribers = []
+        self._condition = threading.Condition()
+        self._sequence = 0
+        self._latest: Optional[Dict[str, Any]] = None
+        self._tailer: Optional[threading.Thread] = None
+        if spool_path:
+            _broadcasters.add(self)
+
+    def publish(self, event: str, data: Dict[str, Any]) -> int:
+        """Send a frame to every subscriber; returns its sequence number"""
+        with self._condition:
+            self._sequence += 1
+            frame = {'id': self._sequence, 'event': event, 'time': time.time(), 'data': data}
+            self._latest = frame
+            for subscription in self._subscribers:
+                if len(subscription.frames) == subscription.frames.maxlen:
+                    subscription.dropped += 1
+                subscription.frames.append(frame)
+            self._condition.notify_all()
+            return self._sequence
+
+    def subscribe(self) -> Subscription:
+        """Register a subscriber; raises RuntimeError when at capacity"""
+        with self._condition:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise RuntimeError("Too many progress subscribers")
+            subscription = Subscription(self, self.buffer_frames)
+            if self._tailer is None and self.spool_path:
+                # Started on demand: workers without subscribers never poll
+                self._latest = self._read_latest_spooled() or self._latest
+                self._tailer = threading.Thread(target=self._tail_spool, name='progress-spool', daemon=True)
+                self._tailer.start()
+            if self._latest is not None:
+                subscription.frames.append(self._latest)
+            self._subscribers.append(subscription)
+        logger.debug(f"Progress subscriber added ({len(self._subscribers)} active)")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._condition:
+            subscription.closed = True
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+            self._condition.notify_all()
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._condition:
+            return len(self._subscribers)
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        with self._condition:
+            return self._latest
+
+    def _read_latest_spooled(self) -> Optional[Dict[str, Any]]:
+        """Last complete frame in the spool; also positions the tailer at its end"""
+        self._position = _SpoolPosition()
+        try:
+            with open(self.spool_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                f.seek(max(0, stat.st_size - SPOOL_TAIL_BYTES))
+                tail = f.read()
+        except OSError:
+            return None
+        self._position.inode = stat.st_ino
+        self._position.offset = stat.st_size - len(tail) + tail.rfind(b'\n') + 1
+        for line in reversed(tail[:tail.rfind(b'\n') + 1].splitlines()):
+            try:
+                spooled = json.loads(line)
+            except ValueError:
+                continue
+            self._sequence += 1
+            return {'id': self._sequence, 'event': spooled['event'], 'time': spooled['time'],
+                    'data': spooled['data']}
+        return None
+
+    def _tail_spool(self):
+        """Publish frames appended to the spool until the last subscriber leaves"""
+        position = self._position
+        while True:
+            with self._condition:
+                if not self._subscribers:
+                    self._tailer = None
+                    return
+            try:
+                for event, data in self._read_spool(position):
+                    self.publish(event, data)
+            except Exception as e:
+                logger.error(f"Failed to read training progress spool: {e}")
+            time.sleep(SPOOL_POLL_SECONDS)
+
+    def _read_spool(self, position: _SpoolPosition) -> List[Tuple[str, Dict[str, Any]]]:
+        try:
+            with open(self.spool_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                if stat.st_ino != position.inode or stat.st_size < position.offset:
+                    # Replaced or truncated: the whole new file is unread
+                    position.inode, position.offset = stat.st_ino, 0
+                if stat.st_size == position.offset:
+                    return []
+                f.seek(position.offset)
+                chunk = f.read(stat.st_size - position.offset)
+        except FileNotFoundError:
+            return []
+        # A trailing partial line is left for the next poll
+        complete = chunk[:chunk.rfind(b'\n') + 1]
+        position.offset += len(complete)
+        frames = []
+        for line in complete.splitlines():
+            try:
+                spooled = json.loads(line)
+                frames.append((spooled['event'], spooled['data']))
+            except (ValueError, KeyError):
+                logger.warning("Skipping malformed training progress frame")
+        return frames
+
+    def _after_fork(self):
+        # The parent's tailer thread does not exist in the child
+        self._condition = threading.Condition()
+        self._subscribers = []
+        self._tailer = None
+
+_broadcasters = weakref.WeakSet()
+
+def _reset_after_fork():
+    for broadcaster in list(_broadcasters):
+        broadcaster._after_fork()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def format_sse(frame: Dict[str, Any]) -> str:
+    """Encode a frame as a Server-Sent Events message"""
+    return f"id: {frame['id']}\nevent: {frame['event']}\ndata: {json.dumps(frame['data'], default=str)}\n\n"
+
+def sse_stream(subscription: Subscription, heartbeat: float = HEARTBEAT_SECONDS) -> Iterator[str]:
+    """Yield SSE messages for a subscription, with comment heartbeats while idle.
+
+    Frames skipped because the client fell behind are reported in a
+    ``dropped`` event before the next frame.
+    """
+    reported = 0
+    try:
+        yield "retry: 5000\n\n"
+        while not subscription.closed:
+            frame = subscription.get(heartbeat)
+            if frame is None:
+                yield ": heartbeat\n\n"
+                continue
+            if subscription.dropped > reported:
+                yield f"event: dropped\ndata: {json.dumps({'frames': subscription.dropped - reported})}\n\n"
+                reported = subscription.dropped
+            yield format_sse(frame)
+    finally:
+        subscription.close()
+
+def iteration_frame(iteration: int, losses: Dict[str, float], episode_reward: Optional[float] = None,
+                    success_rate_per_day: Optional[Dict[str, float]] = None,
+                    steps_per_sec: Optional[float] = None) -> Dict[str, Any]:
+    """Build the payload of a per-iteration training progress frame"""
+    return {
+        'iteration': iteration,
+        'episode_reward': episode_reward,
+        'success_rate_per_day': success_rate_per_day or {},
+        'losses': losses,
+        'steps_per_sec': steps_per_sec,
+    }
+
+class ProgressReporter:
+    """Trainer-side helper that numbers iterations and measures steps/sec.
+
+    Frames go to the shared spool file unless a broadcaster in the same
+    process is given.
+    """
+
+    def __init__(self, broadcaster: Optional[ProgressBroadcaster] = None, spool_path: Optional[str] = None):
+        self.broadcaster = broadcaster or ProgressSpool(spool_path or training_progress.spool_path
+                                                        or DEFAULT_SPOOL_PATH)
+        self.iteration = 0
+        self._last = time.perf_counter()
+
+    def report(self, losses: Dict[str, float], steps: int, episode_reward: Optional[float] = None,
+               success_rate_per_day: Optional[Dict[str, float]] = None) -> int:
+        """Publish one iteration covering ``steps`` environment steps"""
+        now = time.perf_counter()
+        elapsed, self._last = now - self._last, now
+        self.iteration += 1
+        frame = iteration_frame(self.iteration, losses, episode_reward, success_rate_per_day,
+                                steps / elapsed if elapsed > 0 else None)
+        return self.broadcaster.publish('iteration', frame)
+
+# Global training progress broadcaster; trainers append to the same spool
+training_progress = ProgressBroadcaster(
+    int(os.environ.get('TRAINING_STREAM_BUFFER', DEFAULT_BUFFER_FRAMES)),
+    int(os.environ.get('TRAINING_STREAM_MAX_SUBSCRIBERS', DEFAULT_MAX_SUBSCRIBERS)),
+    os.environ.get('TRAINING_PROGRESS_SPOOL', DEFAULT_SPOOL_PATH)
+)
+
+def get_training_progress() -> ProgressBroadcaster:
+    """Get the global training progress broadcaster"""
+    return training_progress